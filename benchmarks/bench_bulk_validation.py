@@ -0,0 +1,75 @@
+"""
+Compare the per-row and bulk ways of building the service models, in rows per second.
+
+    python benchmarks/bench_bulk_validation.py
+    python benchmarks/bench_bulk_validation.py --rows 100000
+
+Rows (dicts, as from a manifest) are validated one model_validate at a time
+and through the list TypeAdapters of rs109m.driver_service.bulk. Images are
+converted with driver_config_to_rs109m_config (validated), trusted_configs
+(model_construct, not validated) and lazy_configs (one field read per view).
+"""
+import argparse
+import time
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver_service.bulk import (
+    lazy_configs,
+    trusted_configs,
+    validate_configs,
+    validate_write_requests,
+)
+from rs109m.driver_service.config_util import driver_config_to_rs109m_config
+from rs109m.driver_service.models import RS109mConfig, RS109mWriteConfigRequest
+
+
+def make_rows(count: int):
+    return [
+        {
+            "device": f"/dev/ttyUSB{i % 8}",
+            "config": {"mmsi": 503000000 + i, "name": f"BUOY{i}", "interval": 60, "ship_type": 36, "sernum": i},
+        }
+        for i in range(count)
+    ]
+
+
+def make_images(count: int):
+    images = []
+    for i in range(count):
+        config = RS109mRawConfig()
+        config.mmsi = 503000000 + i
+        config.sernum = i
+        images.append(config)
+    return images
+
+
+def report(label: str, rows: int, elapsed: float) -> None:
+    print(f"{label:<28} {rows} in {elapsed:.3f}s ({rows / elapsed:.0f} rows/s)")
+
+
+def timed(label: str, rows: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    report(label, rows, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    configs = [row["config"] for row in rows]
+    images = make_images(args.rows)
+
+    timed("config model_validate:", args.rows, lambda: [RS109mConfig.model_validate(row) for row in configs])
+    timed("config TypeAdapter:", args.rows, lambda: validate_configs(configs))
+    timed("request model_validate:", args.rows, lambda: [RS109mWriteConfigRequest.model_validate(row) for row in rows])
+    timed("request TypeAdapter:", args.rows, lambda: validate_write_requests(rows))
+    timed("image validated:", args.rows, lambda: [driver_config_to_rs109m_config(image) for image in images])
+    timed("image trusted:", args.rows, lambda: trusted_configs(images))
+    timed("image lazy (one field):", args.rows, lambda: [view.mmsi for view in lazy_configs(images)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Replay a recorded DeviceIO trace through RS109mDriver and report throughput and latency.
+
+    python benchmarks/bench_driver_replay.py capture.trace --iterations 1000
+    python benchmarks/bench_driver_replay.py --synthetic
+
+Traces are recorded by wrapping a device io in RecordingDeviceIO. The first
+session of the trace is replayed as a read_config (or read_modify_write with
+--write, which must match what was recorded). --synthetic records a session
+against MockDeviceIO first.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import MockDeviceIO, RecordingDeviceIO, ReplayDeviceIO
+
+
+def record_synthetic(path: Path, write: bool) -> None:
+    device_io = RecordingDeviceIO(MockDeviceIO(), path)
+    driver = RS109mDriver(device_io)
+    if write:
+        driver.read_modify_write(lambda config: setattr(config, "interval", 300), password=None)
+    else:
+        driver.read_config(password=None)
+    device_io.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", nargs="?", type=Path, help="trace file recorded with RecordingDeviceIO")
+    parser.add_argument("--synthetic", action="store_true", help="record a session against MockDeviceIO first")
+    parser.add_argument("--write", action="store_true", help="replay a read_modify_write instead of a read_config")
+    parser.add_argument("--password", default=None, help="password used in the recording")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--realtime", action="store_true", help="replay at recorded speed")
+    args = parser.parse_args()
+
+    trace = args.trace
+    if args.synthetic or trace is None:
+        trace = Path(tempfile.mkdtemp()) / "synthetic.trace"
+        record_synthetic(trace, args.write)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        driver = RS109mDriver(ReplayDeviceIO(trace, realtime=args.realtime))
+        op_start = time.perf_counter()
+        if args.write:
+            driver.read_modify_write(lambda config: setattr(config, "interval", 300), password=args.password)
+        else:
+            driver.read_config(password=args.password)
+        latencies.append(time.perf_counter() - op_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"trace:       {trace}")
+    print(f"operations:  {args.iterations} in {elapsed:.3f}s ({args.iterations / elapsed:,.0f} ops/s)")
+    print(f"latency:     median {statistics.median(latencies) * 1e6:.1f}us, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e6:.1f}us, "
+          f"max {latencies[-1] * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
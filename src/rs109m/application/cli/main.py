@@ -10,6 +10,8 @@ from rs109m.driver_service.models import (
 )
 from rs109m.driver_service.ship_type import ShipType
 from rs109m.driver_service.service import RS109mConfigurationService
+from rs109m.driver_service.provisioning import RS109mProvisioningEngine
+from rs109m.driver_service.discovery import RS109mDeviceDiscovery
 from rs109m.application.cli.validate import (
     validate_interval, validate_vendorid, validate_unitmodel, 
     validate_sernum, validate_refa, validate_refb, 
@@ -30,7 +32,7 @@ def read_config(
         ...,
         "--device",
         "-d",
-        help="Serial port (e.g. /dev/ttyUSB0)"
+        help="Serial port (e.g. /dev/ttyUSB0, or socket://host:port / rfc2217://host:port for a network bridge)"
     ),
     password: Optional[str] = typer.Option(
         None,
@@ -73,7 +75,7 @@ def write_config(
         ...,
         "--device",
         "-d",
-        help="Serial port device (e.g. /dev/ttyUSB0) (leave blank for default config)",
+        help="Serial port device (e.g. /dev/ttyUSB0, or socket://host:port / rfc2217://host:port) (leave blank for default config)",
     ),
     password: Optional[str] = typer.Option(
         None,
@@ -207,5 +209,61 @@ def write_config(
     typer.prompt("Press Enter to exit...", default="", show_default=False)
 
 
+@app.command("provision")
+def provision(
+    manifest: str = typer.Argument(
+        ...,
+        help="Manifest file (.csv or .jsonl) mapping devices to configurations",
+    ),
+    workers: int = typer.Option(
+        8,
+        "--workers",
+        "-w",
+        help="Number of devices to write concurrently (ideally the number of serial ports)",
+    ),
+):
+    engine = RS109mProvisioningEngine(service, max_workers=workers)
+
+    failed = 0
+    for result in engine.run_manifest(manifest):
+        if result.success:
+            typer.echo(f"[{result.index}] {result.device}: {result.status.value} (verified={result.verified}, {result.timings.get('total', 0):.2f}s)")
+        else:
+            failed += 1
+            typer.echo(f"[{result.index}] {result.device}: FAILED ({result.error})")
+
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("discover")
+def discover(
+    password: Optional[str] = typer.Option(
+        None,
+        "--password",
+        "-P",
+        help="Password (leave blank for default)",
+        callback=validate_password,
+        show_default=False,
+    ),
+    timeout: float = typer.Option(
+        0.5,
+        "--timeout",
+        "-t",
+        help="Seconds to wait for each port to answer",
+    ),
+):
+    results = RS109mDeviceDiscovery(password=password, timeout=timeout).scan()
+    if not results:
+        typer.echo("No serial ports found.")
+
+    for result in results:
+        if result.identity is not None:
+            identity = result.identity
+            typer.echo(f"{result.port.device}: MMSI {identity.mmsi}, serial {identity.sernum}, vendor {identity.vendorid}")
+        else:
+            typer.echo(f"{result.port.device}: no buoy ({result.error})")
+
+
 if __name__ == "__main__":
     app()
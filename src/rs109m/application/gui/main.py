@@ -70,7 +70,8 @@ class DeviceMonitor(QThread):
                     device=self.device,
                     password=self.password,
                     mock=self.mock,
-                    extended=self.extended
+                    extended=self.extended,
+                    fresh=True,
                 )
                 config = self.service.read_config(req)
                 if not self._was_connected:
@@ -113,7 +114,7 @@ class MainWindow(QMainWindow):
         # Load your icon from relative path
         self.setWindowIcon(QIcon(resource_path("assets/icon.ico")))
 
-        # The stateless service
+        # The service, which keeps the device port open between reads/writes
         self.config_service = RS109mConfigurationService()
 
         # We'll store the currently-running monitor, if any
@@ -136,6 +137,7 @@ class MainWindow(QMainWindow):
         When the window is closed, stop the monitor thread cleanly (if running).
         """
         self._stop_monitor()
+        self.config_service.close()
         super().closeEvent(event)
 
     def _stop_monitor(self) -> None:
@@ -453,6 +455,7 @@ class MainWindow(QMainWindow):
             # Attempt to disconnect
             self._set_device_state(DeviceState.DISCONNECTING)
             self._stop_monitor()  # blocks until done
+            self.config_service.close()  # release the port
             self._set_device_state(DeviceState.DISCONNECTED)
 
         elif self.device_state == DeviceState.DISCONNECTING:
@@ -1,2 +1,6 @@
-from .driver import RS109mDriver
+from .driver import RS109mDriver, RS109mTransactionResult
+from .async_driver import AsyncRS109mDriver
 from .config import RS109mRawConfig
+from .protocol import RS109mProtocol, RS109mProtocolError
+from .diff import RS109mConfigDiff, RS109mFieldDelta, changed_fields, diff_configs
+from .patch import RS109mPatch
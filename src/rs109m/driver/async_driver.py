@@ -0,0 +1,123 @@
+import time
+import logging
+
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+from .device_io.async_base import AsyncDeviceIO
+from .constants import DEFAULT_OPERATION_TIMEOUT
+from .config import RS109mRawConfig
+from .operations import Operation, RS109mDriverCore, RS109mTransactionResult, ReadFrame, T, Write
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRS109mDriver(RS109mDriverCore):
+    """
+    asyncio version of RS109mDriver, running the same operations over an AsyncDeviceIO.
+    One event loop can drive many devices concurrently, one driver per device.
+    """
+
+    def __init__(
+        self,
+        device_io: AsyncDeviceIO,
+        *,
+        timeout: float = DEFAULT_OPERATION_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+        pipeline: bool = False,
+        pipeline_supported: Optional[bool] = None,
+    ):
+        """
+        device_io: an instance of AsyncDeviceIO (e.g. AsyncSerialDeviceIO or AsyncMockDeviceIO).
+        timeout, clock, pipeline, pipeline_supported: see RS109mDriverCore.
+        """
+        super().__init__(timeout=timeout, clock=clock, pipeline=pipeline, pipeline_supported=pipeline_supported)
+        self.device_io = device_io
+
+    async def _run(self, operation: Operation[T]) -> T:
+        """Run an operation (see rs109m.driver.operations) against the device io."""
+        device_io = self.device_io
+        result, error = None, None
+        while True:
+            try:
+                request = operation.send(result) if error is None else operation.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            result, error = None, None
+            try:
+                if type(request) is ReadFrame:
+                    result = await device_io.read_frame(request.num_bytes, request.timeout)
+                elif type(request) is Write:
+                    await device_io.write(request.frame)
+                else:
+                    await device_io.reset()
+            except BaseException as e:
+                error = e
+
+    @asynccontextmanager
+    async def handshake(
+        self,
+        password: str,
+        timeout: Optional[float] = None,
+        *,
+        prefetch: Optional[int] = None,
+    ):
+        """
+        Async context manager to perform and validate handshake.
+        All reads within the context share one deadline of `timeout` seconds
+        (the driver default if None).
+        After exiting, it calls device_io.reset().
+        """
+        if self.handshook:
+            yield
+            return
+        try:
+            await self._run(self._open_handshake(password, timeout, prefetch))
+            yield
+        finally:
+            await self._run(self._close_handshake())
+
+    async def read_config(
+        self,
+        *,
+        password: str,
+        extended: bool = False,
+        timeout: Optional[float] = None,
+    ) -> RS109mRawConfig:
+        """
+        Handles the handshake with the device and reads the configuration,
+        within `timeout` seconds.
+        """
+        return await self._run(self._read_config_operation(password, extended, timeout))
+
+    async def write_config(
+        self,
+        config: RS109mRawConfig,
+        *,
+        password: str,
+        extended: bool = False,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Writes the configuration to the device, within `timeout` seconds.
+        """
+        return await self._run(self._write_config_operation(config, password, extended, timeout))
+
+    async def read_modify_write(
+        self,
+        patch: Callable[[RS109mRawConfig], None],
+        *,
+        password: str,
+        extended: bool = False,
+        force: bool = False,
+        timeout: Optional[float] = None,
+    ) -> RS109mTransactionResult:
+        """
+        Reads the configuration, applies `patch` to it, writes it back and reads
+        it again to verify, all under a single handshake.
+        If the patch leaves the configuration unchanged the write and verify
+        are skipped, unless `force` is set.
+        The whole transaction must complete within `timeout` seconds, by default
+        three times the driver timeout (one per exchange).
+        """
+        return await self._run(self._read_modify_write_operation(patch, password, extended, force, timeout))
@@ -0,0 +1,262 @@
+"""
+Columnar codec for many configuration images at once, using NumPy.
+
+decode_images turns an (N, 64) or (N, 255) uint8 array of images into one
+array per field, encode_images writes columns back into images. Both are
+driven by the layout table (layout.py) and give the same values as the
+RS109mRawConfig properties, with vectorised bit operations instead of a
+Python call per field per image.
+
+    columns = decode_images(images)
+    columns["mmsi"]      # int64 array of N MMSIs
+    columns["callsign"]  # <U6 array of N callsigns
+
+    changed = changed_field_columns(current, intended)
+    changed["sernum"]    # bool array, True where the sernum differs
+
+    apply_patch(images, RS109mPatch.compile({"interval": 60}))
+
+Requires the optional numpy dependency (pip install rs109m[batch]).
+"""
+from typing import Dict, Mapping
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("rs109m.driver.batch_codec requires numpy, install rs109m[batch]") from e
+
+from .config import RS109mRawConfig
+from .diff import FIELD_MASKS, MAPPED_MASK
+from .patch import RS109mPatch
+from .layout import (
+    FIELDS_BY_NAME,
+    RS109M_FIELDS,
+    SIXBIT_ALPHA_DECODE,
+    SIXBIT_DECODE,
+    FieldEncoding,
+    RS109mField,
+)
+from .xbitconverter import AIS_TRANSLATE
+
+# 6-bit value -> ASCII code, 0 where the character is dropped when decoding
+_SIXBIT_LUT = np.array([ord(c) if c else 0 for c in SIXBIT_DECODE], dtype=np.uint8)
+_SIXBIT_ALPHA_LUT = np.array([ord(c) if c else 0 for c in SIXBIT_ALPHA_DECODE], dtype=np.uint8)
+
+# byte -> code point, as decoded by bytes.decode("ascii", "replace")
+_ASCII_LUT = np.where(np.arange(256) < 0x80, np.arange(256), 0xfffd).astype(np.uint32)
+
+# ASCII code -> whether the callsign setter keeps it
+_ALNUM = np.array([chr(i).isalnum() for i in range(256)], dtype=bool)
+_ALNUM[128:] = False
+
+
+def _as_images(images) -> "np.ndarray":
+    images = np.asarray(images, dtype=np.uint8)
+    if images.ndim != 2:
+        raise ValueError(f"Expected an (N, bytes) array of images, got shape {images.shape}")
+    last = max(field.offset + field.size for field in RS109M_FIELDS)
+    if images.shape[1] < last:
+        raise ValueError(f"Images must be at least {last} bytes wide, got {images.shape[1]}")
+    return images
+
+
+def _read_word(images: "np.ndarray", field: RS109mField) -> "np.ndarray":
+    word = np.zeros(len(images), dtype=np.uint64)
+    for i in range(field.size):
+        shift = 8 * i if field.byteorder == "little" else 8 * (field.size - 1 - i)
+        word |= images[:, field.offset + i].astype(np.uint64) << np.uint64(shift)
+    return word
+
+
+def _write_word(images: "np.ndarray", field: RS109mField, word: "np.ndarray") -> None:
+    for i in range(field.size):
+        shift = 8 * i if field.byteorder == "little" else 8 * (field.size - 1 - i)
+        images[:, field.offset + i] = (word >> np.uint64(shift)) & np.uint64(0xff)
+
+
+def _compact(codes: "np.ndarray", align: str) -> "np.ndarray":
+    """Move the non zero codes of every row to the left (or right), keeping their order."""
+    keys = codes == 0 if align == "left" else codes != 0
+    order = np.argsort(keys, axis=1, kind="stable")
+    return np.take_along_axis(codes, order, axis=1)
+
+
+def _to_strings(codes: "np.ndarray") -> "np.ndarray":
+    width = codes.shape[1]
+    return np.ascontiguousarray(codes).view(f"S{width}").ravel().astype(f"U{width}")
+
+
+def _decode_ascii(raw: "np.ndarray") -> "np.ndarray":
+    """The text of an ASCII field, decoded and stripped like the scalar decoder."""
+    size = raw.shape[1]
+    codes = np.ascontiguousarray(_ASCII_LUT[raw])
+    text = np.char.strip(codes.view(f"U{size}").ravel())
+    # Fixed width unicode arrays drop trailing NULs, which str.strip keeps,
+    # so text holding NULs is decoded per row into an object array
+    has_nul = (raw == 0).any(axis=1)
+    if has_nul.any():
+        text = text.astype(object)
+        for row in np.flatnonzero(has_nul):
+            text[row] = bytes(raw[row]).decode("ascii", "replace").strip()
+    return text
+
+
+def _decode_field(images: "np.ndarray", field: RS109mField, words: Dict) -> "np.ndarray":
+    if field.encoding == FieldEncoding.ASCII:
+        return _decode_ascii(images[:, field.offset:field.offset + field.size])
+
+    word = words.get(field.word)
+    if word is None:
+        word = words[field.word] = _read_word(images, field)
+
+    if field.encoding in (FieldEncoding.SIXBIT, FieldEncoding.SIXBIT_ALPHA):
+        lut = _SIXBIT_LUT if field.encoding == FieldEncoding.SIXBIT else _SIXBIT_ALPHA_LUT
+        shifts = np.array([field.shift + 6 * i for i in reversed(range(field.chars))], dtype=np.uint64)
+        values = (word[:, None] >> shifts) & np.uint64(0x3f)
+        return _to_strings(_compact(lut[values], "left"))
+
+    value = (word >> np.uint64(field.shift)) & np.uint64(field.mask)
+    return value.astype(np.int64) * field.scale
+
+
+def decode_images(images) -> Dict[str, "np.ndarray"]:
+    """
+    Decode every field of N images.
+    images: (N, 64) or (N, 255) uint8 array (anything convertible to one).
+    Returns {field name: array of N values}, integers as int64 and text as
+    fixed width unicode arrays (an object array for names when one holds a
+    NUL character, which fixed width arrays cannot keep at the end).
+    """
+    images = _as_images(images)
+    words: Dict = {}
+    return {field.name: _decode_field(images, field, words) for field in RS109M_FIELDS}
+
+
+def _encode_ascii(values, size: int) -> "np.ndarray":
+    data = np.char.encode(np.char.translate(np.asarray(values, dtype=str), AIS_TRANSLATE), "ascii", "ignore")
+    data = np.char.ljust(data, size).astype(f"S{size}")
+    return data.view(np.uint8).reshape(-1, size)
+
+
+def _encode_sixbit(values, field: RS109mField) -> "np.ndarray":
+    data = np.char.upper(np.char.encode(np.asarray(values, dtype=str), "ascii", "ignore"))
+    width = max(data.dtype.itemsize, 1)
+    codes = np.ascontiguousarray(data.astype(f"S{width}")).view(np.uint8).reshape(-1, width)
+    chars = field.chars
+
+    if field.encoding == FieldEncoding.SIXBIT:
+        codes = np.where(_ALNUM[codes], codes, 0).astype(np.uint8)
+    if field.keep == "tail":
+        codes = _compact(codes, "right")
+        codes = codes[:, -chars:]
+        if codes.shape[1] < chars:
+            codes = np.pad(codes, ((0, 0), (chars - codes.shape[1], 0)))
+    else:
+        codes = codes[:, :chars]
+        if codes.shape[1] < chars:
+            codes = np.pad(codes, ((0, 0), (0, chars - codes.shape[1])))
+
+    value = np.zeros(len(codes), dtype=np.uint64)
+    for i in range(chars):
+        value = (value << np.uint64(6)) | (codes[:, i] & 0x3f).astype(np.uint64)
+    return value
+
+
+def _encode_uint(values, field: RS109mField) -> "np.ndarray":
+    values = np.asarray(values).astype(np.int64)
+    if field.bounds is not None:
+        low, high = field.bounds
+        bad = (values < low) | (values > high)
+        if bad.any():
+            raise ValueError(f"{field.name} must be {low} <= {field.name} <= {high}, got {values[bad][0]}")
+    if field.clamp is not None:
+        values = np.clip(values, *field.clamp)
+    if field.scale != 1:
+        values = values // field.scale
+    return values.astype(np.uint64) & np.uint64(field.mask)
+
+
+def encode_images(
+    columns: Mapping[str, object],
+    images=None,
+    *,
+    num_bytes: int = RS109mRawConfig.default_len,
+) -> "np.ndarray":
+    """
+    Encode columns into images, with the validation of the RS109mRawConfig setters.
+    columns: {field name: N values}, fields which are missing are left as they are.
+    images: (N, bytes) images to write into (modified in place), by default N
+            copies of the default configuration of num_bytes bytes.
+    Returns the images.
+    """
+    unknown = set(columns) - set(FIELDS_BY_NAME)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    if images is None:
+        rows = len(next(iter(columns.values()))) if columns else 0
+        default = np.frombuffer(bytes(RS109mRawConfig.default_config[:num_bytes]), dtype=np.uint8)
+        images = np.tile(default, (rows, 1))
+    else:
+        images = _as_images(images)
+
+    prepared: Dict = {}
+    for name, values in columns.items():
+        field = FIELDS_BY_NAME[name]
+        if field.encoding == FieldEncoding.ASCII:
+            images[:, field.offset:field.offset + field.size] = _encode_ascii(values, field.size)
+        elif field.encoding in (FieldEncoding.SIXBIT, FieldEncoding.SIXBIT_ALPHA):
+            prepared.setdefault(field.word, []).append((field, _encode_sixbit(values, field)))
+        else:
+            prepared.setdefault(field.word, []).append((field, _encode_uint(values, field)))
+
+    # every word read and written once, whatever the number of fields it holds
+    for members in prepared.values():
+        first = members[0][0]
+        used = 0
+        for field, _ in members:
+            used |= field.mask << field.shift
+        word = _read_word(images, first) & np.uint64(((1 << (first.size * 8)) - 1) & ~used)
+        for field, values in members:
+            word |= values << np.uint64(field.shift)
+        _write_word(images, first, word)
+
+    return images
+
+
+def _byte_masks(mask: int, width: int) -> "np.ndarray":
+    return np.frombuffer(mask.to_bytes((max(mask.bit_length(), 1) + 7) // 8, "little").ljust(width, b"\x00")[:width], dtype=np.uint8)
+
+
+def changed_field_columns(old, new) -> Dict[str, "np.ndarray"]:
+    """
+    Which fields differ between N pairs of images, see diff.changed_fields.
+    old, new: (N, bytes) uint8 arrays of the same shape.
+    Returns {field name: bool array of N}, plus "unmapped" for changed bits outside every field.
+    """
+    old, new = _as_images(old), _as_images(new)
+    if old.shape != new.shape:
+        raise ValueError(f"Image arrays differ in shape: {old.shape} and {new.shape}")
+    xor = old ^ new
+    width = xor.shape[1]
+    changed = {name: (xor & _byte_masks(mask, width)).any(axis=1) for name, mask, _ in FIELD_MASKS}
+    unmapped = _byte_masks(MAPPED_MASK, width) ^ np.uint8(0xff)
+    changed["unmapped"] = (xor & unmapped).any(axis=1)
+    return changed
+
+
+def apply_patch(images, patch: RS109mPatch) -> "np.ndarray":
+    """
+    Apply a compiled patch to every image of an (N, bytes) uint8 array, in place.
+    Returns the images.
+    """
+    images = _as_images(images)
+    if patch:
+        if images.shape[1] < patch.stop:
+            raise ValueError(f"Images must be at least {patch.stop} bytes wide, got {images.shape[1]}")
+        mask = np.frombuffer(patch.mask, dtype=np.uint8)
+        value = np.frombuffer(patch.value, dtype=np.uint8)
+        region = images[:, patch.start:patch.stop]
+        region &= ~mask
+        region |= value
+    return images
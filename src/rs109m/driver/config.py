@@ -1,7 +1,33 @@
-from .xbitconverter import fromxbit, toxbit
+from typing import Optional
+
+from .layout import DECODERS, ENCODERS, RS109mFieldValues, decode_config, encode_config
+
+
+def _field_property(name: str) -> property:
+    decode = DECODERS[name]
+    encode = ENCODERS[name]
+    return property(
+        lambda self: decode(self._config),
+        lambda self, value: encode(self._writable(), value),
+    )
 
 
 class RS109mRawConfig:
+    """
+    A configuration image. Kept compact, so millions of them fit in memory:
+
+    - Fresh configs share one read-only default image, and configs set from
+      bytes keep those bytes; a private copy is made on the first write
+      (copy-on-write), so reading never copies.
+    - wrap() uses an externally owned buffer (e.g. a row of a memory mapped
+      fleet store or of a NumPy array) in place, without copying it.
+    - view() gives memoryview slices for the wire path.
+
+    The `config` buffer may be read-only or shared: modify it through
+    set_config or the field properties, not in place.
+    """
+    __slots__ = ("_config",)
+
     default_config = bytearray([
         0x04, 0x2d, 0xd2, 0x7f, 0x06, 0x31, 0x30, 0x39, 0x30, 0x34, 0x30, 0x31, 0x37, 0x33, 0x20, 0x20,
         0x20, 0x20, 0x20, 0x20, 0x20, 0x20, 0x20, 0x20, 0x20, 0x01, 0x00, 0x00, 0xe0, 0x24, 0x01, 0x00,
@@ -21,192 +47,96 @@ class RS109mRawConfig:
         0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff
     ])
     default_len = 0x40
+    max_len = 0xff
 
-    def __init__(self):
-        self.set_config([])
+    def __init__(self, config=None):
+        """
+        config: initial image, shorter images are completed from default_config.
+                The default configuration if None.
+        """
+        self.set_config(config)
+
+    @classmethod
+    def wrap(cls, buffer) -> "RS109mRawConfig":
+        """
+        A config backed by `buffer` itself, without copying: writes go to the
+        buffer if it is writable (else they copy first). The buffer must hold
+        at least the 42 bytes of fields; it is not completed from default_config.
+        """
+        view = memoryview(buffer)
+        if view.format != "B":
+            view = view.cast("B")
+        if len(view) < 42:
+            raise ValueError(f"Buffer too small for a configuration: {len(view)} bytes")
+        config = cls.__new__(cls)
+        config._config = view
+        return config
+
+    def _writable(self):
+        """The buffer to write fields into, made private on the first write."""
+        buf = self._config
+        if isinstance(buf, bytearray) or (isinstance(buf, memoryview) and not buf.readonly):
+            return buf
+        buf = self._config = bytearray(buf)
+        return buf
 
     def get_config(self):
         return self._config
 
     def set_config(self, config):
-        # TODO: implement differently, as setting config as slices config[34:38] might be convenient
-        if config == []:
-            # self._config = self.default_config[:self.default_len]
-            self._config = self.default_config[:]  # [:] creates a copy, ensuring data doesn't persistent across multiple objects
+        if config is None or len(config) == 0:
+            self._config = _DEFAULT_IMAGE
+            return
+
+        if not isinstance(config, (bytes, bytearray, memoryview)):
+            config = bytes(config)
+        clen = min(len(config), self.max_len)
+        if clen == self.max_len and isinstance(config, bytes) and len(config) == clen:
+            # immutable, so it can be shared as it is
+            self._config = config
         else:
-            clen = 0xff if (len(config) > 0xff) else len(config)
-            self._config = bytearray(
-                config[0:clen] + self.default_config[clen:])
+            self._config = b"".join((memoryview(config)[:clen], _DEFAULT_VIEW[clen:]))
 
     config = property(get_config, set_config)
 
-    def get_mmsi(self):
-        mmsi = self._config[1] + (self._config[2] << 8) + \
-            (self._config[3] << 16) + ((self._config[4] & 0xff) << 24)
-        return mmsi
-
-    def set_mmsi(self, mmsi):
-        mmsi = int(mmsi)
-        self._config[1] = mmsi & 0xff
-        self._config[2] = (mmsi >> 8) & 0xff
-        self._config[3] = (mmsi >> 16) & 0xff
-        self._config[4] = (mmsi >> 24) & 0xff
-
-    mmsi = property(get_mmsi, set_mmsi)
+    def view(self, num_bytes: Optional[int] = None) -> memoryview:
+        """A read-only view of the first num_bytes of the image (all of it if None), without copying."""
+        view = memoryview(self._config).toreadonly()
+        return view if num_bytes is None else view[:num_bytes]
 
-    def get_name(self):
-        name = bytes(self._config[5:25]).decode('ascii').strip()
-        return name
-
-    def set_name(self, name):
-        # TODO: check for invalid chars, this one is incomplete
-        safe_name = name.encode('ascii', 'ignore').decode(
-        ).upper().ljust(20, ' ').encode('ascii')
-        self._config[5:25] = safe_name
-
-    name = property(get_name, set_name)
+    def copy(self) -> "RS109mRawConfig":
+        """An independent config with the same image, sharing it until either is written."""
+        config = RS109mRawConfig.__new__(RS109mRawConfig)
+        buf = self._config
+        config._config = buf if isinstance(buf, bytes) else bytes(buf)
+        return config
 
     def __repr__(self):
-        return '[ 0x' + self._config.hex('#').replace('#', ', 0x') + ' ]'
-
-    def get_interval(self):
-        return self._config[0] * 30
-
-    def set_interval(self, seconds):
-        seconds = int(seconds)
-        if seconds > 600:
-            seconds = 600
-        if seconds < 30:
-            seconds = 30
-        self._config[0] = seconds//30
-
-    interval = property(get_interval, set_interval)
-
-    def get_shipncargo(self):
-        return int(self._config[31])
-
-    def set_shipncargo(self, shiptype):
-        self._config[31] = int(shiptype) & 0xff
-
-    shipncargo = property(get_shipncargo, set_shipncargo)
-
-    def get_vendorid(self):
-        vid = [(self._config[29] >> 4) | ((self._config[30] & 0x03) << 4) | 0x40,
-               (self._config[28] >> 6) | (
-                   (self.config[29] & 0x07) << 2) | 0x40,
-               (self._config[28] & 0x3f) | 0x40]
-        return ''.join(c if c.isalnum() else '' for c in bytes(vid).decode())
-
-    def set_vendorid(self, vid):
-        # TODO: check for invalid chars, this one is incomplete
-        safe_vid = vid.encode('ascii', 'ignore').decode(
-        ).upper().ljust(3, '\x00')[:3].encode('ascii')
-        print(safe_vid)
-        self._config[28] = (safe_vid[2] & 0x3f) | ((safe_vid[1] << 6) & 0xff)
-        self._config[29] = ((safe_vid[1] >> 2) & 0x0f) | (
-            (safe_vid[0] << 4) & 0xff)
-        self._config[30] = (self._config[30] & ~0x0f) | (
-            (safe_vid[0] & 0x3f) >> 4)
-
-    vendorid = property(get_vendorid, set_vendorid)
-
-    def get_unitmodel(self):
-        unitmodel = self._config[27] >> 4
-        return unitmodel
-
-    def set_unitmodel(self, unitmodel):
-        unitmodel = int(unitmodel)
-        if unitmodel < 0 or unitmodel > 15:
-            raise ValueError("UnitModel must be 0 < unitmodel <= 15")
-        self._config[27] = (self._config[27] & 0xf0) | (
-            (int(unitmodel) & 0x0f) << 4)
-
-    unitmodel = property(get_unitmodel, set_unitmodel)
-
-    def get_sernum(self):
-        sernum = self._config[25] + (self._config[26]
-                                     << 8) + ((self._config[27] & 0x0f) << 16)
-        return sernum
-
-    def set_sernum(self, sernum):
-        sernum = int(sernum)
-        if sernum < 0 or sernum > ((1 << 20) - 1):
-            raise ValueError(
-                "UnitSernum must be 0 <= sernum <=", ((1 << 20) - 1))
-        self._config[25] = sernum & 0xff
-        self._config[26] = (sernum >> 8) & 0xff
-        self._config[27] = (self._config[27] & 0xf0) | ((sernum >> 16) & 0x0f)
-
-    sernum = property(get_sernum, set_sernum)
-
-    def get_callsign(self):
-        # TODO: check if it is 32:37 or 32:38
-        s = fromxbit(self._config[32:37], 6, True).decode('ascii')[::-1]
-        return ''.join(c if c.isalnum() else '' for c in s)
-
-    def set_callsign(self, cs):
-        safe_cs = ''.join(c if c.isalnum() else '' for c in cs)
-        self._config[32:37] = toxbit(safe_cs[::-1])
-
-    callsign = property(get_callsign, set_callsign)
-
-    def get_refa(self):
-        return (self._config[39] >> 5) | ((self.config[38] & ((1 << 6) - 1)) << 3)
-
-    def set_refa(self, a):
-        if int(a) > (1 << 9):
-            raise ValueError("Reference a must be <= 511")
-        if int(a) < 0:
-            raise ValueError("Reference a must be >= 0")
-        self._config[39] = (self._config[39] & ((1 << 5) - 1)
-                            ) | (((int(a) & ((1 << 6) - 1)) << 5) & 0xff)
-        self._config[38] = (self._config[38] & ~(
-            (1 << 4) - 1)) | ((int(a) & ((1 << 9) - 1)) >> 3)
-
-    refa = property(get_refa, set_refa)
-
-    def get_refb(self):
-        return (self._config[40] >> 4) | ((self._config[39] & ((1 << 5) - 1)) << 4)
-
-    def set_refb(self, b):
-        if int(b) > (1 << 9):
-            raise ValueError("Reference b must be <= 511")
-        if int(b) < 0:
-            raise ValueError("Reference b must be >= 0")
-        self._config[40] = (self._config[40] & ((1 << 4) - 1)
-                            ) | (((int(b) & ((1 << 6) - 1)) << 4) & 0xff)
-        self._config[39] = (self._config[39] & ~(
-            (1 << 5) - 1)) | ((int(b) & ((1 << 9) - 1)) >> 4)
-
-    refb = property(get_refb, set_refb)
-
-    def get_refc(self):
-        return (self._config[41] >> 6) | ((self._config[40] & ((1 << 4) - 1)) << 2)
-
-    def set_refc(self, c):
-        if int(c) > (1 << 6):
-            raise ValueError("Reference c must be <= 63")
-        if int(c) < 0:
-            raise ValueError("Reference c must be >= 0")
-        self._config[41] = (self._config[41] & ((1 << 6) - 1)
-                            ) | (((int(c) & ((1 << 6) - 1)) << 6) & 0xff)
-        self._config[40] = (self._config[40] & ~(
-            (1 << 4) - 1)) | ((int(c) & ((1 << 6) - 1)) >> 2)
-
-    refc = property(get_refc, set_refc)
-
-    def get_refd(self):
-        return self._config[41] & ((1 << 6) - 1)
-
-    def set_refd(self, d):
-        if int(d) > (1 << 6):
-            raise ValueError("Reference d must be <= 63")
-        if int(d) < 0:
-            raise ValueError("Reference d must be >= 0")
-        self._config[41] = (self._config[41] & ~(
-            (1 << 6) - 1)) | (int(d) & ((1 << 6) - 1))
-
-    refd = property(get_refd, set_refd)
+        return '[ 0x' + self.view().hex('#').replace('#', ', 0x') + ' ]'
+
+    def get_fields(self) -> RS109mFieldValues:
+        """Every field decoded in one pass."""
+        return decode_config(self._config)
+
+    def set_fields(self, values) -> None:
+        """Encode every field (a sequence in FIELD_NAMES order) in one pass."""
+        encode_config(self._writable(), values)
+
+    fields = property(get_fields, set_fields)
+
+    # Field accessors generated from the declarative layout (see layout.py)
+    mmsi = _field_property("mmsi")
+    name = _field_property("name")
+    interval = _field_property("interval")
+    shipncargo = _field_property("shipncargo")
+    vendorid = _field_property("vendorid")
+    unitmodel = _field_property("unitmodel")
+    sernum = _field_property("sernum")
+    callsign = _field_property("callsign")
+    refa = _field_property("refa")
+    refb = _field_property("refb")
+    refc = _field_property("refc")
+    refd = _field_property("refd")
 
     def get_config_str(
         self,
@@ -219,20 +149,25 @@ class RS109mRawConfig:
         if extended:
             num_bytes = 0xff
 
+        fields = self.fields
         out = []
-        out.append(f"  MMSI: {self.mmsi}")
-        out.append(f"  Name: {self.name}")
-        out.append(f"  TX interval (s): {self.interval}")
-        out.append(f"  Ship type: {self.shipncargo}")
-        out.append(f"  Callsign: {self.callsign}")
-        out.append(f"  VendorID: {self.vendorid}")
-        out.append(f"  UnitModel: {self.unitmodel}")
-        out.append(f"  UnitSerial: {self.sernum}")
-        out.append(f"  Reference point A (m): {self.refa} (read-only battery voltage {self.refa/10.0:.1f}V)")
-        out.append(f"  Reference point B (m): {self.refb}")
-        out.append(f"  Reference point C (m): {self.refc}")
-        out.append(f"  Reference point D (m): {self.refd}")
+        out.append(f"  MMSI: {fields.mmsi}")
+        out.append(f"  Name: {fields.name}")
+        out.append(f"  TX interval (s): {fields.interval}")
+        out.append(f"  Ship type: {fields.shipncargo}")
+        out.append(f"  Callsign: {fields.callsign}")
+        out.append(f"  VendorID: {fields.vendorid}")
+        out.append(f"  UnitModel: {fields.unitmodel}")
+        out.append(f"  UnitSerial: {fields.sernum}")
+        out.append(f"  Reference point A (m): {fields.refa} (read-only battery voltage {fields.refa/10.0:.1f}V)")
+        out.append(f"  Reference point B (m): {fields.refb}")
+        out.append(f"  Reference point C (m): {fields.refc}")
+        out.append(f"  Reference point D (m): {fields.refd}")
         out.append("")
-        out.append("[ 0x" + self.config[:num_bytes].hex('#').replace('#', ', 0x') + " ]")
+        out.append("[ 0x" + self.view(num_bytes).hex('#').replace('#', ', 0x') + " ]")
 
         return "\n".join(out)
+
+
+_DEFAULT_IMAGE = bytes(RS109mRawConfig.default_config)
+_DEFAULT_VIEW = memoryview(_DEFAULT_IMAGE)
@@ -2,4 +2,5 @@ DEFAULT_PASSWORD = '000000'
 BAUDRATE = 115200
 PASSWORD_MAXLEN = 6
 SERIAL_TIMEOUT = 1
-SERIAL_WRITE_TIMEOUT = 3
\ No newline at end of file
+SERIAL_WRITE_TIMEOUT = 3
+DEFAULT_OPERATION_TIMEOUT = 2.0
@@ -0,0 +1,30 @@
+import time
+from typing import Callable, Optional
+
+
+class Deadline:
+    """
+    A point in time by which an operation must complete, shared by all the
+    reads of that operation so the whole operation is bounded, not each read.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        timeout: seconds from now, None for no deadline.
+        clock: monotonic clock in seconds.
+        """
+        self.clock = clock
+        self.expires_at = None if timeout is None else clock() + timeout
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), None if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.clock() >= self.expires_at
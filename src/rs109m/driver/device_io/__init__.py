@@ -1,2 +1,6 @@
 from .serial_device_io import SerialDeviceIO
 from .mock_device_io import MockDeviceIO
+from .async_serial_device_io import AsyncSerialDeviceIO
+from .async_mock_device_io import AsyncMockDeviceIO
+from .recording_device_io import RecordingDeviceIO, ReplayDeviceIO, TraceMismatchError
+from .network_device_io import NetworkDeviceIO, is_network_url
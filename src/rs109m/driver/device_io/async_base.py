@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class AsyncDeviceIO(ABC):
+    """asyncio counterpart of DeviceIO, for use with AsyncRS109mDriver."""
+
+    @abstractmethod
+    async def write(self, data) -> None:
+        """Write data to the device."""
+        ...
+
+    @abstractmethod
+    async def read(self, num_bytes: int) -> bytes:
+        """Read data from the device."""
+        ...
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Reset the input buffer"""
+        ...
+
+    async def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        """
+        Read exactly num_bytes, returning as soon as they have arrived.
+        Returns fewer bytes if the timeout (seconds, None to wait forever) expires first.
+        Defaults to read().
+        """
+        return await self.read(num_bytes)
+
+    async def drain(self) -> None:
+        """Discard any stale input without blocking. Defaults to reset()."""
+        await self.reset()
+
+    async def close(self) -> None:
+        """Release the underlying device. Defaults to a no-op."""
+        return None
+
+    def is_open(self) -> bool:
+        """Whether the device is still usable. Defaults to True."""
+        return True
@@ -0,0 +1,35 @@
+from typing import Optional, override
+
+from .async_base import AsyncDeviceIO
+from .mock_device_io import MockDeviceIO
+
+
+class AsyncMockDeviceIO(AsyncDeviceIO):
+    """
+    Async wrapper around MockDeviceIO, simulating an RS-109M device
+    for AsyncRS109mDriver. The simulated device state is shared with
+    the wrapped mock, available as `mock`.
+    """
+
+    def __init__(self, extended: bool = False, mock: Optional[MockDeviceIO] = None):
+        self.mock = mock if mock is not None else MockDeviceIO(extended)
+
+    @property
+    def device_config(self):
+        return self.mock.device_config
+
+    @override
+    async def write(self, data) -> None:
+        self.mock.write(data)
+
+    @override
+    async def read(self, num_bytes: int) -> bytes:
+        return self.mock.read(num_bytes)
+
+    @override
+    async def reset(self) -> None:
+        self.mock.reset()
+
+    def get_written_data(self) -> bytes:
+        """For debugging: the entire sequence that was written to the mock device."""
+        return self.mock.get_written_data()
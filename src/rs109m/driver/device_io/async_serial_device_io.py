@@ -0,0 +1,114 @@
+import os
+import asyncio
+import serial
+from typing import Optional, override
+
+from rs109m.driver.constants import BAUDRATE, SERIAL_TIMEOUT, SERIAL_WRITE_TIMEOUT
+
+from .async_base import AsyncDeviceIO
+
+
+class AsyncSerialDeviceIO(AsyncDeviceIO):
+    """
+    Non-blocking serial device io, reading and writing the tty file descriptor
+    through the event loop, so many ports can be serviced from one thread.
+    POSIX only, as it relies on loop.add_reader/add_writer.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        timeout: float = SERIAL_TIMEOUT,
+        write_timeout: float = SERIAL_WRITE_TIMEOUT,
+    ):
+        if os.name != "posix":
+            raise NotImplementedError("AsyncSerialDeviceIO requires a POSIX tty")
+
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+
+        # pyserial configures the tty and opens it with O_NONBLOCK
+        self.ser = serial.Serial()
+        self.ser.port = port
+        self.ser.baudrate = BAUDRATE
+        self.ser.bytesize = serial.EIGHTBITS
+        self.ser.parity = serial.PARITY_NONE
+        self.ser.stopbits = serial.STOPBITS_ONE
+        self.ser.timeout = 0
+        self.ser.open()
+
+        # Discard any leftover data without waiting for the line to go quiet
+        self.ser.reset_input_buffer()
+        self.fd = self.ser.fileno()
+
+    async def _wait(self, add, remove, timeout: Optional[float]) -> bool:
+        """Wait until the fd is ready using add/remove reader or writer. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        add(self.fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            remove(self.fd)
+
+    @override
+    async def write(self, data) -> None:
+        # Accept either a list of integers or a bytes-like object.
+        view = memoryview(bytes(data))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.write_timeout
+        while view:
+            try:
+                written = os.write(self.fd, view)
+                view = view[written:]
+                continue
+            except BlockingIOError:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self._wait(loop.add_writer, loop.remove_writer, remaining):
+                raise serial.SerialTimeoutException("Write timeout")
+
+    @override
+    async def read(self, num_bytes: int) -> bytes:
+        return await self.read_frame(num_bytes, self.timeout)
+
+    @override
+    async def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        """Read up to num_bytes, returning early once they have arrived or after the timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        data = bytearray()
+        woken = False
+        while len(data) < num_bytes:
+            try:
+                chunk = os.read(self.fd, num_bytes - len(data))
+            except BlockingIOError:
+                chunk = None
+            if chunk:
+                data += chunk
+                woken = False
+                continue
+            if chunk == b"" and woken:
+                # readable but nothing to read: the device went away (same check as pyserial)
+                raise serial.SerialException("Device disconnected")
+            remaining = None if deadline is None else deadline - loop.time()
+            if (remaining is not None and remaining <= 0) or \
+                    not await self._wait(loop.add_reader, loop.remove_reader, remaining):
+                break
+            woken = True
+        return bytes(data)
+
+    @override
+    async def reset(self) -> None:
+        self.ser.reset_input_buffer()
+
+    @override
+    async def close(self) -> None:
+        self.ser.close()
+
+    @override
+    def is_open(self) -> bool:
+        return self.ser.is_open
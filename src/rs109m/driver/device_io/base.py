@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class DeviceIO(ABC):
     @abstractmethod
@@ -15,3 +16,23 @@ class DeviceIO(ABC):
     def reset(self) -> None:
         """Reset the input buffer"""
         ...
+
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        """
+        Read exactly num_bytes, returning as soon as they have arrived.
+        Returns fewer bytes if the timeout (seconds, None to wait forever) expires first.
+        Defaults to read().
+        """
+        return self.read(num_bytes)
+
+    def drain(self) -> None:
+        """Discard any stale input without blocking. Defaults to reset()."""
+        self.reset()
+
+    def close(self) -> None:
+        """Release the underlying device. Defaults to a no-op."""
+        return None
+
+    def is_open(self) -> bool:
+        """Whether the device is still usable. Defaults to True."""
+        return True
@@ -0,0 +1,93 @@
+import socket
+import serial
+from typing import Optional, override
+
+from .serial_device_io import SerialDeviceIO
+
+NETWORK_URL_SCHEMES = ("socket://", "rfc2217://")
+
+
+def is_network_url(device: Optional[str]) -> bool:
+    """Whether the device is a network serial port url rather than a local port."""
+    return device is not None and device.lower().startswith(NETWORK_URL_SCHEMES)
+
+
+class NetworkDeviceIO(SerialDeviceIO):
+    """
+    A serial port exposed over the network, either by a raw TCP serial bridge
+    (socket://host:port, e.g. ser2net in raw mode) or by an RFC 2217 server
+    (rfc2217://host:port).
+
+    - TCP keep-alive is enabled so idle pooled connections are kept open and
+      dead ones are detected.
+    - Writes are pipelined: they are buffered and sent as a single segment
+      when the response is read, so a command and its payload cost one round trip.
+    """
+
+    def __init__(self, url: str):
+        if not is_network_url(url):
+            raise ValueError(f"Unsupported network serial url {url!r}, expected one of {NETWORK_URL_SCHEMES}")
+        self._pending = bytearray()
+        super().__init__(url)
+
+        sock = self._socket
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    @override
+    def _create_serial(self, port: str) -> serial.SerialBase:
+        return serial.serial_for_url(port, do_not_open=True)
+
+    @property
+    def _socket(self) -> Optional[socket.socket]:
+        # Both the socket:// and rfc2217:// implementations of pyserial keep their socket here
+        return getattr(self.ser, "_socket", None)
+
+    def flush(self) -> None:
+        """Send any buffered writes."""
+        if self._pending:
+            data, self._pending = bytes(self._pending), bytearray()
+            self.ser.write(data)
+
+    @override
+    def write(self, data) -> None:
+        self._pending += bytes(data)
+
+    @override
+    def read(self, num_bytes: int) -> bytes:
+        self.flush()
+        return super().read(num_bytes)
+
+    @override
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        self.flush()
+        return super().read_frame(num_bytes, timeout)
+
+    @override
+    def reset(self) -> None:
+        self.flush()
+        super().reset()
+
+    @override
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            super().close()
+
+    @override
+    def is_open(self) -> bool:
+        """Open and the remote end has not closed the connection."""
+        sock = self._socket
+        if not self.ser.is_open or sock is None:
+            return False
+        if not hasattr(socket, "MSG_DONTWAIT"):
+            # no non-blocking peek on this platform, rely on keep-alive and read errors
+            return True
+        try:
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) != b""
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,180 @@
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Union, override
+
+from .base import DeviceIO
+from .trace import SESSION_PAYLOAD, TraceOp, TraceRecord, TraceWriter, iter_trace
+
+
+class TraceMismatchError(Exception):
+    pass
+
+
+class RecordingDeviceIO(DeviceIO):
+    """
+    Wraps another DeviceIO and records every write/read/reset to a binary
+    trace file (see trace.py), timestamped with a monotonic clock.
+    Recording appends, so one file can hold many sessions.
+    """
+
+    def __init__(self, device_io: DeviceIO, path: Union[str, Path]):
+        self.device_io = device_io
+        self.writer = TraceWriter(path)
+        self._last = time.monotonic_ns()
+        self.writer.write(TraceOp.SESSION, 0, SESSION_PAYLOAD.pack(time.time_ns()))
+
+    def _record(self, op: TraceOp, payload: bytes = b"", arg: int = 0) -> None:
+        now = time.monotonic_ns()
+        self.writer.write(op, (now - self._last) // 1000, payload, arg)
+        self._last = now
+
+    @override
+    def write(self, data) -> None:
+        self.device_io.write(data)
+        self._record(TraceOp.WRITE, bytes(data))
+
+    @override
+    def read(self, num_bytes: int) -> bytes:
+        data = self.device_io.read(num_bytes)
+        self._record(TraceOp.READ, bytes(data), num_bytes)
+        return data
+
+    @override
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        data = self.device_io.read_frame(num_bytes, timeout)
+        self._record(TraceOp.READ, bytes(data), num_bytes)
+        return data
+
+    @override
+    def reset(self) -> None:
+        self.device_io.reset()
+        self._record(TraceOp.RESET)
+        # the end of every operation, a good point to make the trace durable
+        self.writer.flush()
+
+    @override
+    def drain(self) -> None:
+        self.device_io.drain()
+        self._record(TraceOp.DRAIN)
+
+    @override
+    def close(self) -> None:
+        self._record(TraceOp.CLOSE)
+        self.writer.close()
+        self.device_io.close()
+
+    @override
+    def is_open(self) -> bool:
+        return self.device_io.is_open()
+
+
+class ReplayDeviceIO(DeviceIO):
+    """
+    Serves a recorded trace back to a driver, either as fast as possible or
+    at the recorded speed (realtime=True).
+
+    Writes are checked against the recorded writes as a byte stream (so
+    differently chunked writes still match), raising TraceMismatchError on a
+    difference when strict. Reads are served from the recorded reads.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        session: int = 0,
+        realtime: bool = False,
+        strict: bool = True,
+    ):
+        """
+        path: trace file to replay.
+        session: index of the recording session within the file.
+        realtime: sleep so responses arrive with their recorded timing.
+        strict: raise TraceMismatchError if the writes differ from the recording.
+        """
+        self.realtime = realtime
+        self.strict = strict
+        self._records = self._session_records(path, session)
+        self._next: Optional[TraceRecord] = None
+        self._expected_writes = bytearray()
+        self._pending_reads = bytearray()
+        self._recorded_at = 0
+        self._started = time.monotonic_ns()
+
+    @staticmethod
+    def _session_records(path: Union[str, Path], session: int) -> Iterator[TraceRecord]:
+        current = -1
+        for record in iter_trace(path):
+            if record.op == TraceOp.SESSION:
+                current += 1
+                if current > session:
+                    return
+                continue
+            if current == session:
+                yield record
+
+    def _peek(self) -> Optional[TraceRecord]:
+        if self._next is None:
+            self._next = next(self._records, None)
+        return self._next
+
+    def _take(self) -> TraceRecord:
+        record = self._peek()
+        self._next = None
+        self._recorded_at += record.delta_us * 1000
+        if self.realtime:
+            delay = (self._started + self._recorded_at - time.monotonic_ns()) / 1e9
+            if delay > 0:
+                time.sleep(delay)
+        return record
+
+    def _take_while(self, op: TraceOp, buffer: bytearray, num_bytes: int) -> None:
+        while len(buffer) < num_bytes:
+            record = self._peek()
+            if record is None or record.op != op:
+                return
+            buffer += self._take().payload
+
+    def _skip(self, *ops: TraceOp) -> None:
+        record = self._peek()
+        if record is not None and record.op in ops:
+            self._take()
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every recorded record has been replayed."""
+        return self._peek() is None and not self._expected_writes and not self._pending_reads
+
+    @override
+    def write(self, data) -> None:
+        data = bytes(data)
+        self._take_while(TraceOp.WRITE, self._expected_writes, len(data))
+        expected = bytes(self._expected_writes[:len(data)])
+        del self._expected_writes[:len(data)]
+        if self.strict and expected != data:
+            raise TraceMismatchError(f"Expected write {expected.hex(' ')}, got {data.hex(' ')}")
+
+    @override
+    def read(self, num_bytes: int) -> bytes:
+        self._take_while(TraceOp.READ, self._pending_reads, num_bytes)
+        data = bytes(self._pending_reads[:num_bytes])
+        del self._pending_reads[:num_bytes]
+        return data
+
+    @override
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        return self.read(num_bytes)
+
+    @override
+    def reset(self) -> None:
+        self._pending_reads.clear()
+        self._skip(TraceOp.RESET)
+
+    @override
+    def drain(self) -> None:
+        self._pending_reads.clear()
+        self._skip(TraceOp.DRAIN, TraceOp.RESET)
+
+    @override
+    def close(self) -> None:
+        self._skip(TraceOp.CLOSE)
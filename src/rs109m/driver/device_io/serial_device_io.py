@@ -1,16 +1,22 @@
+import math
 import serial
-from typing import override
+from typing import Optional, override
 
 from rs109m.driver.constants import BAUDRATE, SERIAL_TIMEOUT, SERIAL_WRITE_TIMEOUT
 
 from .base import DeviceIO
 
+# Frame read timeouts are rounded up to a multiple of this (seconds). The
+# driver passes what is left of its deadline, which differs on every read,
+# and every change of the pyserial timeout reconfigures the port (a termios
+# call on POSIX); rounded, consecutive reads mostly share one timeout.
+TIMEOUT_RESOLUTION = 0.05
+
 
 class SerialDeviceIO(DeviceIO):
     def __init__(self, port: str):
         # Set up the serial device with the desired configuration
-        self.ser = serial.Serial()
-        self.ser.port = port
+        self.ser = self._create_serial(port)
         self.ser.baudrate = BAUDRATE
         self.ser.bytesize = serial.EIGHTBITS
         self.ser.parity = serial.PARITY_NONE
@@ -21,7 +27,7 @@ class SerialDeviceIO(DeviceIO):
         self.ser.open()
 
         # Flush any leftover data to stabilize the connection
-        self.ser.read(0xffff)
+        self.drain()
 
     @override
     def write(self, data) -> None:
@@ -30,10 +36,53 @@ class SerialDeviceIO(DeviceIO):
             data = bytes(data)
         self.ser.write(data)
 
+    def _create_serial(self, port: str) -> serial.SerialBase:
+        """Create the (unopened) pyserial instance for the port."""
+        ser = serial.Serial()
+        ser.port = port
+        return ser
+
+    def _set_timeout(self, timeout: Optional[float]) -> None:
+        # Changing the timeout reconfigures the port, so only do it when the rounded value changes
+        if timeout is not None:
+            timeout = math.ceil(timeout / TIMEOUT_RESOLUTION) * TIMEOUT_RESOLUTION
+        if self.ser.timeout != timeout:
+            self.ser.timeout = timeout
+
     @override
     def read(self, num_bytes: int) -> bytes:
+        self._set_timeout(SERIAL_TIMEOUT)
         return self.ser.read(num_bytes)
 
+    @override
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        # pyserial returns as soon as num_bytes have arrived, the timeout only bounds
+        # the wait (and may exceed the requested one by up to TIMEOUT_RESOLUTION)
+        self._set_timeout(timeout)
+        return self.ser.read(num_bytes)
+
+    @override
+    def drain(self) -> None:
+        self.ser.reset_input_buffer()
+        waiting = self.ser.in_waiting
+        if waiting:
+            self.ser.read(waiting)
+
     @override
     def reset(self) -> None:
         self.ser.reset_input_buffer()
+
+    @override
+    def close(self) -> None:
+        self.ser.close()
+
+    @override
+    def is_open(self) -> bool:
+        if not self.ser.is_open:
+            return False
+        # An unplugged USB adapter still reports open, but querying the port fails
+        try:
+            self.ser.in_waiting
+        except (OSError, serial.SerialException):
+            return False
+        return True
@@ -0,0 +1,84 @@
+"""
+Compact, appendable binary trace of DeviceIO traffic.
+
+    file    := MAGIC VERSION record*
+    record  := op:u8 delta_us:u32 arg:u16 length:u16 payload[length]   (little endian)
+
+`delta_us` is the time since the previous record of the same session
+(saturating at ~71 minutes). Every recording session starts with a SESSION
+record whose payload is the wall clock time (ns since epoch, i64), so
+several sessions can be appended to the same file.
+"""
+import struct
+from enum import IntEnum
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+MAGIC = b"RS9TRACE"
+VERSION = 1
+
+RECORD_HEADER = struct.Struct("<BIHH")
+SESSION_PAYLOAD = struct.Struct("<q")
+
+MAX_DELTA_US = 0xffffffff
+
+
+class TraceOp(IntEnum):
+    SESSION = 0  # start of a recording session, payload: wall clock ns
+    WRITE = 1  # payload: bytes written
+    READ = 2  # arg: bytes requested, payload: bytes returned
+    RESET = 3
+    DRAIN = 4
+    CLOSE = 5
+
+
+class TraceRecord(NamedTuple):
+    op: TraceOp
+    delta_us: int
+    arg: int
+    payload: bytes
+
+
+class TraceFormatError(Exception):
+    pass
+
+
+class TraceWriter:
+    """Appends records to a trace file, writing the file header if it is new."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.fh: BinaryIO = open(path, "ab")
+        if self.fh.tell() == 0:
+            self.fh.write(MAGIC + bytes([VERSION]))
+
+    def write(self, op: TraceOp, delta_us: int, payload: bytes = b"", arg: int = 0) -> None:
+        self.fh.write(RECORD_HEADER.pack(op, min(delta_us, MAX_DELTA_US), arg, len(payload)))
+        self.fh.write(payload)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+def iter_trace(path: Union[str, Path]) -> Iterator[TraceRecord]:
+    """Stream the records of a trace file."""
+    with open(path, "rb") as fh:
+        header = fh.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise TraceFormatError(f"{path} is not a trace file")
+        if header[len(MAGIC)] != VERSION:
+            raise TraceFormatError(f"Unsupported trace version {header[len(MAGIC)]}")
+
+        while True:
+            raw = fh.read(RECORD_HEADER.size)
+            if not raw:
+                return
+            if len(raw) < RECORD_HEADER.size:
+                raise TraceFormatError("Truncated record header")
+            op, delta_us, arg, length = RECORD_HEADER.unpack(raw)
+            payload = fh.read(length)
+            if len(payload) < length:
+                raise TraceFormatError("Truncated record payload")
+            yield TraceRecord(TraceOp(op), delta_us, arg, payload)
@@ -0,0 +1,156 @@
+"""
+Field level differences between configuration images.
+
+Images are compared as integers: one XOR gives every changed bit, which is
+then tested against a precomputed bit mask per field (built from the layout
+table, so packed fields like sernum/unitmodel or refa..refd are told apart).
+Only the fields which changed are decoded.
+
+    diff = diff_configs(current, intended)
+    diff.changed        # ("sernum", "refc")
+    diff["sernum"]      # RS109mFieldDelta(name="sernum", old=1, new=42)
+
+Bits which differ outside every field (unused or unknown bytes) are
+reported as byte offsets in `unmapped`.
+"""
+import operator
+from functools import reduce
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .config import RS109mRawConfig
+from .layout import DECODERS, RS109M_FIELDS, FieldEncoding, RS109mField
+
+Image = Union[RS109mRawConfig, bytes, bytearray, memoryview]
+
+
+def _field_mask(field: RS109mField) -> int:
+    """The bits of a field within an image read as a little endian integer."""
+    if field.encoding == FieldEncoding.ASCII:
+        return ((1 << (8 * field.size)) - 1) << (8 * field.offset)
+    word_mask = field.mask << field.shift
+    mask = 0
+    for i in range(field.size):
+        shift = 8 * i if field.byteorder == "little" else 8 * (field.size - 1 - i)
+        byte_mask = (word_mask >> shift) & 0xff
+        mask |= byte_mask << (8 * (field.offset + i))
+    return mask
+
+
+# (name, mask, decoder) for every field
+FIELD_MASKS: Tuple[Tuple[str, int, object], ...] = tuple(
+    (field.name, _field_mask(field), DECODERS[field.name]) for field in RS109M_FIELDS
+)
+MAPPED_MASK = reduce(operator.or_, (mask for _, mask, _ in FIELD_MASKS))
+
+
+class RS109mFieldDelta(NamedTuple):
+    name: str
+    old: object
+    new: object
+
+
+class RS109mConfigDiff:
+    """
+    The differences between two images: a delta per changed field, in
+    layout order, and the offsets of changed bytes outside every field.
+    A delta may have equal old and new values when only bits the decoder
+    ignores changed (e.g. a 6-bit character outside letters and digits).
+    """
+    __slots__ = ("deltas", "unmapped")
+
+    def __init__(self, deltas: Tuple[RS109mFieldDelta, ...] = (), unmapped: Tuple[int, ...] = ()):
+        self.deltas = deltas
+        self.unmapped = unmapped
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RS109mConfigDiff):
+            return NotImplemented
+        return self.deltas == other.deltas and self.unmapped == other.unmapped
+
+    def __repr__(self) -> str:
+        return f"RS109mConfigDiff(deltas={self.deltas!r}, unmapped={self.unmapped!r})"
+
+    def __bool__(self) -> bool:
+        return bool(self.deltas or self.unmapped)
+
+    @property
+    def changed(self) -> Tuple[str, ...]:
+        return tuple(delta.name for delta in self.deltas)
+
+    def __getitem__(self, name: str) -> RS109mFieldDelta:
+        for delta in self.deltas:
+            if delta.name == name:
+                return delta
+        raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return any(delta.name == name for delta in self.deltas)
+
+    def __str__(self) -> str:
+        lines = [f"  {delta.name}: {delta.old!r} -> {delta.new!r}" for delta in self.deltas]
+        if self.unmapped:
+            lines.append(f"  unmapped bytes: {', '.join(str(offset) for offset in self.unmapped)}")
+        return "\n".join(lines)
+
+
+NO_DIFF = RS109mConfigDiff()
+
+
+def _buffer(image: Image):
+    return image.config if isinstance(image, RS109mRawConfig) else image
+
+
+def _xor(old, new, num_bytes: Optional[int]) -> int:
+    if num_bytes is None and len(old) == len(new):
+        return int.from_bytes(old, "little") ^ int.from_bytes(new, "little")
+    if num_bytes is None:
+        num_bytes = min(len(old), len(new))
+    return int.from_bytes(old[:num_bytes], "little") ^ int.from_bytes(new[:num_bytes], "little")
+
+
+def changed_fields(old: Image, new: Image, num_bytes: Optional[int] = None) -> Tuple[str, ...]:
+    """
+    The names of the fields which differ, without decoding anything.
+    num_bytes: bytes to compare, the length of the shorter image if None.
+    """
+    xor = _xor(_buffer(old), _buffer(new), num_bytes)
+    if not xor:
+        return ()
+    return tuple([name for name, mask, _ in FIELD_MASKS if xor & mask])
+
+
+def diff_configs(old: Image, new: Image, num_bytes: Optional[int] = None) -> RS109mConfigDiff:
+    """
+    The field level differences from `old` to `new` (RS109mRawConfig or raw images).
+    num_bytes: bytes to compare, the length of the shorter image if None.
+    """
+    old, new = _buffer(old), _buffer(new)
+    xor = _xor(old, new, num_bytes)
+    if not xor:
+        return NO_DIFF
+
+    deltas = tuple([
+        RS109mFieldDelta(name, decode(old), decode(new))
+        for name, mask, decode in FIELD_MASKS
+        if xor & mask
+    ])
+    unmapped: Tuple[int, ...] = ()
+    rest = xor & ~MAPPED_MASK
+    if rest:
+        data = rest.to_bytes((rest.bit_length() + 7) // 8, "little")
+        unmapped = tuple(offset for offset, byte in enumerate(data) if byte)
+    return RS109mConfigDiff(deltas, unmapped)
+
+
+def diff_many(pairs: Iterable[Tuple[Image, Image]], num_bytes: Optional[int] = None) -> Iterator[RS109mConfigDiff]:
+    """diff_configs for many (old, new) pairs, lazily."""
+    for old, new in pairs:
+        yield diff_configs(old, new, num_bytes)
+
+
+def changed_fields_many(
+    pairs: Iterable[Tuple[Image, Image]],
+    num_bytes: Optional[int] = None,
+) -> List[Tuple[str, ...]]:
+    """changed_fields for many (old, new) pairs."""
+    return [changed_fields(old, new, num_bytes) for old, new in pairs]
@@ -1,86 +1,92 @@
-import re
+import time
 import logging
 
 from contextlib import contextmanager
+from typing import Callable, Optional
 
 from .device_io.base import DeviceIO
-from .constants import DEFAULT_PASSWORD, PASSWORD_MAXLEN
+from .constants import DEFAULT_OPERATION_TIMEOUT
 from .config import RS109mRawConfig
+from .operations import Operation, RS109mDriverCore, RS109mTransactionResult, ReadFrame, T, Write
 
 logger = logging.getLogger(__name__)
 
 
-class RS109mDriver:
+class RS109mDriver(RS109mDriverCore):
     def __init__(
         self,
         device_io: DeviceIO,
+        *,
+        timeout: float = DEFAULT_OPERATION_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+        pipeline: bool = False,
+        pipeline_supported: Optional[bool] = None,
     ):
         """
         device_io: an instance of DeviceIO (e.g. SerialDeviceIO or MockDeviceIO).
                    Can be None if no device is supplied.
+        timeout, clock, pipeline, pipeline_supported: see RS109mDriverCore.
         """
+        super().__init__(timeout=timeout, clock=clock, pipeline=pipeline, pipeline_supported=pipeline_supported)
         self.device_io = device_io
-        self.handshook = False
+
+    def _run(self, operation: Operation[T]) -> T:
+        """Run an operation (see rs109m.driver.operations) against the device io."""
+        device_io = self.device_io
+        result, error = None, None
+        while True:
+            try:
+                request = operation.send(result) if error is None else operation.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            result, error = None, None
+            try:
+                if type(request) is ReadFrame:
+                    result = device_io.read_frame(request.num_bytes, request.timeout)
+                elif type(request) is Write:
+                    device_io.write(request.frame)
+                else:
+                    device_io.reset()
+            except BaseException as e:
+                error = e
 
     @contextmanager
     def handshake(
         self,
         password: str,
+        timeout: Optional[float] = None,
+        *,
+        prefetch: Optional[int] = None,
     ):
-        if self.handshook:
-            yield
-            return
-
         """
         Context manager to perform and validate handshake.
+        All reads within the context share one deadline of `timeout` seconds
+        (the driver default if None).
+        If `prefetch` is set, a read of that many bytes is sent along with the
+        handshake and answered by the next read.
         After exiting, it calls device_io.reset().
         """
-        if password is not None:
-            if not re.match(f"^[0-9]{{0,{PASSWORD_MAXLEN}}}$", password):
-                raise ValueError(f"Password incorrect: should match [0-9]{{0,{PASSWORD_MAXLEN}}}")
-            password_prepared = (password.encode() + DEFAULT_PASSWORD.encode())[:PASSWORD_MAXLEN]
-            self.device_io.write([0x59, 0x01, 0x42, PASSWORD_MAXLEN])
-            self.device_io.write(password_prepared)
-        else:
-            self.device_io.write([0x59, 0x01, 0x42, 0x00])
-
-        r = self.device_io.read(2)
-        if r != b'\x95\x20':
-            raise Exception("Could not initialize with password.")
-
+        if self.handshook:
+            yield
+            return
         try:
-            self.handshook = True
+            self._run(self._open_handshake(password, timeout, prefetch))
             yield
         finally:
-            self.device_io.reset()
+            self._run(self._close_handshake())
 
     def read_config(
         self,
         *,
         password: str,
         extended: bool = False,
+        timeout: Optional[float] = None,
     ) -> RS109mRawConfig:
         """
         Handles the handshake with the device and loads configuration data
-        into the provided config object.
+        into the provided config object, within `timeout` seconds.
         """
-        config = RS109mRawConfig()
-
-        num_bytes = config.default_len
-        if extended:
-            num_bytes = 0xff
-
-        with self.handshake(password):
-            self.device_io.write([0x51, num_bytes])
-            r = self.device_io.read(2)
-            if r != bytes([0x25, num_bytes]):
-                raise Exception("Could not read config header, got: " + r.hex(' '))
-            data = self.device_io.read(num_bytes)
-            if len(data) != num_bytes:
-                raise Exception("Incomplete config data.")
-            config.config = data
-
-        return config
+        return self._run(self._read_config_operation(password, extended, timeout))
 
     def write_config(
         self,
@@ -88,20 +94,28 @@ class RS109mDriver:
         *,
         password: str,
         extended: bool = False,
+        timeout: Optional[float] = None,
     ) -> None:
         """
-        Writes the current configuration to the device.
+        Writes the current configuration to the device, within `timeout` seconds.
         """
-        num_bytes = config.default_len
-        if extended:
-            num_bytes = 0xff
-
-        with self.handshake(password):
-            self.device_io.write([0x55, num_bytes])
-            self.device_io.write(config.config[:num_bytes])
-            r = self.device_io.read(2)
-            if r != bytes([0x75, num_bytes]):
-                raise Exception("Write failed.")
-            logger.info("Config written successfully!")
+        return self._run(self._write_config_operation(config, password, extended, timeout))
 
-        return None
+    def read_modify_write(
+        self,
+        patch: Callable[[RS109mRawConfig], None],
+        *,
+        password: str,
+        extended: bool = False,
+        force: bool = False,
+        timeout: Optional[float] = None,
+    ) -> RS109mTransactionResult:
+        """
+        Reads the configuration, applies `patch` to it, writes it back and reads
+        it again to verify, all under a single handshake.
+        If the patch leaves the configuration unchanged the write and verify
+        are skipped, unless `force` is set.
+        The whole transaction must complete within `timeout` seconds, by default
+        three times the driver timeout (one per exchange).
+        """
+        return self._run(self._read_modify_write_operation(patch, password, extended, force, timeout))
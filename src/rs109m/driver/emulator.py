@@ -0,0 +1,96 @@
+import logging
+from typing import Optional
+
+from .config import RS109mRawConfig
+from .constants import DEFAULT_PASSWORD, PASSWORD_MAXLEN
+
+logger = logging.getLogger(__name__)
+
+
+class RS109mDeviceEmulator:
+    """
+    The device side of the RS-109M protocol, fed with the raw byte stream a
+    host sends and returning the bytes the device answers with. Commands may
+    arrive split or coalesced in any way, as they would over a serial line.
+
+    - Handshake [0x59, 0x01, 0x42, len] + password => [0x95, 0x20]
+    - Read      [0x51, len]                        => [0x25, len] + config[:len]
+    - Write     [0x55, len] + config[:len]         => [0x75, len]
+    """
+
+    def __init__(
+        self,
+        device_config: Optional[RS109mRawConfig] = None,
+        password: Optional[str] = None,
+    ):
+        """
+        device_config: the "on-device" configuration, a default one if None.
+        password: if set, handshakes with another password are not answered.
+        """
+        self.device_config = device_config if device_config is not None else RS109mRawConfig()
+        self.password = password
+        self._buffer = bytearray()
+
+    def reset(self) -> None:
+        """Forget any partially received command."""
+        self._buffer.clear()
+
+    def feed(self, data) -> bytes:
+        """Consume bytes sent by the host, returning the device's response (possibly empty)."""
+        self._buffer += bytes(data)
+        response = bytearray()
+        while self._buffer:
+            consumed = self._process(response)
+            if consumed == 0:
+                break
+            del self._buffer[:consumed]
+        return bytes(response)
+
+    def _process(self, response: bytearray) -> int:
+        """Handle the command at the start of the buffer. Returns the number of bytes consumed, 0 if incomplete."""
+        buf = self._buffer
+        command = buf[0]
+
+        if command == 0x59:
+            if len(buf) < 4:
+                return 0
+            if buf[1] != 0x01 or buf[2] != 0x42:
+                return 1
+            length = buf[3]
+            if len(buf) < 4 + length:
+                return 0
+            if self._password_ok(bytes(buf[4:4 + length])):
+                response += b"\x95\x20"
+            return 4 + length
+
+        if command == 0x51:
+            if len(buf) < 2:
+                return 0
+            length = buf[1]
+            response += bytes([0x25, length])
+            config_bytes = self.device_config.config[:length]
+            response += config_bytes
+            # If length is bigger than actual config, fill with dummy to match length
+            response += b"\xAA" * (length - len(config_bytes))
+            return 2
+
+        if command == 0x55:
+            if len(buf) < 2:
+                return 0
+            length = buf[1]
+            if len(buf) < 2 + length:
+                return 0
+            existing = self.device_config.config
+            config_len = min(length, len(existing))
+            self.device_config.config = bytes(buf[2:2 + config_len]) + bytes(existing[config_len:])
+            response += bytes([0x75, length])
+            return 2 + length
+
+        logger.debug(f"Emulator ignoring unexpected byte 0x{command:02x}")
+        return 1
+
+    def _password_ok(self, password: bytes) -> bool:
+        if self.password is None:
+            return True
+        expected = (self.password.encode() + DEFAULT_PASSWORD.encode())[:PASSWORD_MAXLEN]
+        return password == expected
@@ -0,0 +1,233 @@
+"""
+Declarative layout of the RS-109M configuration image.
+
+RS109M_FIELDS describes every field once (offset, bit position, encoding,
+bounds). At import time the table is compiled into specialised functions
+doing straight-line byte arithmetic:
+
+- DECODERS[name](buf) and ENCODERS[name](buf, value) for a single field,
+- decode_config(buf) returning every field in one pass as RS109mFieldValues,
+- encode_config(buf, values) writing every field in one pass.
+
+Fields sharing bytes (sernum/unitmodel in 25-27, refa..refd in 38-41) are
+grouped into words which a pass reads and writes once.
+"""
+from collections import namedtuple
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .xbitconverter import SIXBIT_ALPHA_DECODE, SIXBIT_DECODE, pack_sixbit, sanitize
+
+
+class FieldEncoding(str, Enum):
+    UINT = "uint"
+    ASCII = "ascii"  # space padded text in the AIS charset, bytes above 0x7f decode as U+FFFD
+    SIXBIT = "sixbit"  # 6-bit AIS characters, digits and letters
+    SIXBIT_ALPHA = "sixbit_alpha"  # 6-bit characters, always decoded as letters
+
+
+@dataclass(frozen=True)
+class RS109mField:
+    name: str
+    offset: int  # first byte of the word holding the field
+    size: int  # bytes in that word
+    shift: int = 0  # bit position within the word
+    width: Optional[int] = None  # bits, the whole word if None
+    encoding: FieldEncoding = FieldEncoding.UINT
+    byteorder: str = "little"
+    bounds: Optional[Tuple[int, int]] = None  # ValueError outside these (inclusive), before masking
+    clamp: Optional[Tuple[int, int]] = None  # values are clamped to these (inclusive)
+    scale: int = 1  # stored value = value // scale
+    keep: str = "head"  # 6-bit text longer than the field: keep its "head" or its "tail"
+
+    @property
+    def bits(self) -> int:
+        return self.width if self.width is not None else self.size * 8
+
+    @property
+    def mask(self) -> int:
+        return (1 << self.bits) - 1
+
+    @property
+    def chars(self) -> int:
+        return self.bits // 6
+
+    @property
+    def word(self) -> Tuple[int, int, str]:
+        return (self.offset, self.size, self.byteorder)
+
+
+# The historic bounds of refa..refd accept 2**width, which is then masked (so refc = 64 stores 0).
+RS109M_FIELDS: Tuple[RS109mField, ...] = (
+    RS109mField("interval", 0, 1, scale=30, clamp=(30, 600)),
+    RS109mField("mmsi", 1, 4),
+    RS109mField("name", 5, 20, encoding=FieldEncoding.ASCII),
+    RS109mField("sernum", 25, 3, 0, 20, bounds=(0, (1 << 20) - 1)),
+    RS109mField("unitmodel", 25, 3, 20, 4, bounds=(0, 15)),
+    RS109mField("vendorid", 28, 3, 0, 18, encoding=FieldEncoding.SIXBIT_ALPHA),
+    RS109mField("shipncargo", 31, 1),
+    RS109mField("callsign", 32, 5, 0, 36, encoding=FieldEncoding.SIXBIT, keep="tail"),
+    RS109mField("refa", 38, 4, 21, 9, byteorder="big", bounds=(0, 1 << 9)),
+    RS109mField("refb", 38, 4, 12, 9, byteorder="big", bounds=(0, 1 << 9)),
+    RS109mField("refc", 38, 4, 6, 6, byteorder="big", bounds=(0, 1 << 6)),
+    RS109mField("refd", 38, 4, 0, 6, byteorder="big", bounds=(0, 1 << 6)),
+)
+
+FIELD_NAMES: Tuple[str, ...] = tuple(field.name for field in RS109M_FIELDS)
+FIELDS_BY_NAME: Dict[str, RS109mField] = {field.name: field for field in RS109M_FIELDS}
+
+RS109mFieldValues = namedtuple("RS109mFieldValues", FIELD_NAMES)
+
+
+def _encode_ascii(text, size: int) -> bytes:
+    return sanitize(text).encode("ascii").ljust(size)[:size]
+
+
+def _encode_sixbit(text, chars: int, keep: str, alnum: bool) -> int:
+    return pack_sixbit(text, chars, keep=keep, alnum=alnum)
+
+
+def _check_bounds(name: str, value: int, low: int, high: int) -> None:
+    if value < low or value > high:
+        raise ValueError(f"{name} must be {low} <= {name} <= {high}")
+
+
+def _word_read(offset: int, size: int, byteorder: str, buf: str = "c") -> str:
+    terms = []
+    for i in range(size):
+        shift = 8 * i if byteorder == "little" else 8 * (size - 1 - i)
+        terms.append(f"{buf}[{offset + i}] << {shift}" if shift else f"{buf}[{offset + i}]")
+    return " | ".join(terms)
+
+
+def _word_write(offset: int, size: int, byteorder: str, word: str, buf: str = "c") -> List[str]:
+    lines = []
+    for i in range(size):
+        shift = 8 * i if byteorder == "little" else 8 * (size - 1 - i)
+        lines.append(f"{buf}[{offset + i}] = ({word} >> {shift}) & 0xff" if shift else f"{buf}[{offset + i}] = {word} & 0xff")
+    return lines
+
+
+def _decode_expr(field: RS109mField, word: str) -> str:
+    if field.encoding == FieldEncoding.ASCII:
+        return f"bytes(c[{field.offset}:{field.offset + field.size}]).decode('ascii', 'replace').strip()"
+
+    if field.encoding in (FieldEncoding.SIXBIT, FieldEncoding.SIXBIT_ALPHA):
+        table = "SIXBIT_DECODE" if field.encoding == FieldEncoding.SIXBIT else "SIXBIT_ALPHA_DECODE"
+        chars = [f"{table}[({word} >> {field.shift + 6 * i}) & 0x3f]" for i in reversed(range(field.chars))]
+        return "(" + " + ".join(chars) + ")"
+
+    value = f"({word} >> {field.shift})" if field.shift else word
+    if field.bits < field.size * 8 or field.shift:
+        value = f"({value} & {field.mask:#x})"
+
+    if field.scale != 1:
+        value = f"{value} * {field.scale}"
+    return value
+
+
+def _prepare_lines(field: RS109mField, value: str) -> List[str]:
+    """Statements turning the user supplied `value` into the stored integer (or bytes)."""
+    if field.encoding == FieldEncoding.ASCII:
+        return [f"{value} = _encode_ascii({value}, {field.size})"]
+    if field.encoding in (FieldEncoding.SIXBIT, FieldEncoding.SIXBIT_ALPHA):
+        alnum = field.encoding == FieldEncoding.SIXBIT
+        return [f"{value} = _encode_sixbit({value}, {field.chars}, {field.keep!r}, {alnum})"]
+
+    lines = [f"{value} = int({value})"]
+    if field.bounds is not None:
+        low, high = field.bounds
+        lines.append(f"_check_bounds({field.name!r}, {value}, {low}, {high})")
+    if field.clamp is not None:
+        low, high = field.clamp
+        lines.append(f"{value} = {low} if {value} < {low} else {high} if {value} > {high} else {value}")
+    if field.scale != 1:
+        lines.append(f"{value} = {value} // {field.scale}")
+    lines.append(f"{value} &= {field.mask:#x}")
+    return lines
+
+
+def _words(fields: Sequence[RS109mField]) -> Dict[Tuple[int, int, str], List[RS109mField]]:
+    words: Dict[Tuple[int, int, str], List[RS109mField]] = {}
+    for field in fields:
+        if field.encoding != FieldEncoding.ASCII:
+            words.setdefault(field.word, []).append(field)
+    return words
+
+
+def _generate(fields: Sequence[RS109mField]) -> str:
+    """Python source of the decoders and encoders for a layout."""
+    words = _words(fields)
+    word_names = {word: f"w{i}" for i, word in enumerate(words)}
+    src: List[str] = []
+
+    # decode_config: every word read once
+    src.append("def decode_config(c):")
+    for word, name in word_names.items():
+        src.append(f"    {name} = {_word_read(*word)}")
+    src.append("    return RS109mFieldValues(")
+    for field in fields:
+        src.append(f"        {_decode_expr(field, word_names.get(field.word, ''))},")
+    src.append("    )")
+    src.append("")
+
+    # encode_config: every value prepared, then every word written once
+    src.append("def encode_config(c, values):")
+    src.append(f"    ({', '.join(f'v_{field.name}' for field in fields)},) = values")
+    for field in fields:
+        src += ["    " + line for line in _prepare_lines(field, f"v_{field.name}")]
+    for field in fields:
+        if field.encoding == FieldEncoding.ASCII:
+            src.append(f"    c[{field.offset}:{field.offset + field.size}] = v_{field.name}")
+    for word, members in words.items():
+        used = 0
+        for field in members:
+            used |= field.mask << field.shift
+        keep = ((1 << (word[1] * 8)) - 1) & ~used
+        terms = [f"v_{field.name} << {field.shift}" if field.shift else f"v_{field.name}" for field in members]
+        if keep:
+            terms.insert(0, f"(({_word_read(*word)}) & {keep:#x})")
+        src.append(f"    w = {' | '.join(terms)}")
+        src += ["    " + line for line in _word_write(*word, "w")]
+    src.append("")
+
+    # single field accessors
+    for field in fields:
+        word = word_names.get(field.word, "")
+        src.append(f"def decode_{field.name}(c):")
+        if word:
+            src.append(f"    {word} = {_word_read(*field.word)}")
+        src.append(f"    return {_decode_expr(field, word)}")
+        src.append("")
+
+        src.append(f"def encode_{field.name}(c, value):")
+        src += ["    " + line for line in _prepare_lines(field, "value")]
+        if field.encoding == FieldEncoding.ASCII:
+            src.append(f"    c[{field.offset}:{field.offset + field.size}] = value")
+        else:
+            keep = ((1 << (field.size * 8)) - 1) & ~(field.mask << field.shift)
+            shifted = f"value << {field.shift}" if field.shift else "value"
+            src.append(f"    w = (({_word_read(*field.word)}) & {keep:#x}) | {shifted}" if keep else f"    w = {shifted}")
+            src += ["    " + line for line in _word_write(*field.word, "w")]
+        src.append("")
+
+    return "\n".join(src)
+
+
+LAYOUT_SOURCE = _generate(RS109M_FIELDS)
+
+_namespace = {
+    "RS109mFieldValues": RS109mFieldValues,
+    "SIXBIT_DECODE": SIXBIT_DECODE,
+    "SIXBIT_ALPHA_DECODE": SIXBIT_ALPHA_DECODE,
+    "_encode_ascii": _encode_ascii,
+    "_encode_sixbit": _encode_sixbit,
+    "_check_bounds": _check_bounds,
+}
+exec(compile(LAYOUT_SOURCE, "<rs109m layout>", "exec"), _namespace)
+
+decode_config: Callable[[bytearray], RS109mFieldValues] = _namespace["decode_config"]
+encode_config: Callable[[bytearray, Sequence], None] = _namespace["encode_config"]
+DECODERS: Dict[str, Callable] = {name: _namespace[f"decode_{name}"] for name in FIELD_NAMES}
+ENCODERS: Dict[str, Callable] = {name: _namespace[f"encode_{name}"] for name in FIELD_NAMES}
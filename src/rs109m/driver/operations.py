@@ -0,0 +1,292 @@
+"""
+The driver operations, written once over the sans-IO RS109mProtocol and
+shared by RS109mDriver and AsyncRS109mDriver.
+
+An operation is a generator which yields the IO it needs and is resumed
+with the result (or has the IO error thrown into it):
+
+    Write(frame)                   -> None
+    ReadFrame(num_bytes, timeout)  -> bytes
+    Reset()                        -> None
+
+Handshakes, deadlines, pipelining, the no-op skip and verification live
+here, so both drivers behave the same; a driver only runs operations
+against its DeviceIO (see RS109mDriver._run and AsyncRS109mDriver._run).
+"""
+import time
+import logging
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generator, NamedTuple, Optional, TypeVar, Union
+
+from .constants import DEFAULT_OPERATION_TIMEOUT
+from .config import RS109mRawConfig
+from .deadline import Deadline
+from .protocol import RS109mProtocol, RS109mProtocolError, RS109mReply
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Write(NamedTuple):
+    frame: bytes
+
+
+class ReadFrame(NamedTuple):
+    num_bytes: int
+    timeout: Optional[float]
+
+
+class Reset(NamedTuple):
+    pass
+
+
+IoRequest = Union[Write, ReadFrame, Reset]
+Operation = Generator[IoRequest, Any, T]
+
+
+class _PipelineRejected(Exception):
+    """A pipelined handshake + read failed before the read reply arrived."""
+
+
+@dataclass
+class RS109mTransactionResult:
+    """Outcome of RS109mDriver.read_modify_write."""
+    original: RS109mRawConfig  # configuration as read before patching
+    written: RS109mRawConfig  # configuration that was written
+    verified_config: RS109mRawConfig  # configuration read back after writing
+    verified: bool  # whether the read back matches what was written
+    changed: bool = True  # False if the patch was a no-op and nothing was written
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per phase
+
+
+class RS109mDriverCore:
+    """
+    State and operations shared by the sync and async drivers.
+    Subclasses set `device_io` and run the operations against it.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = DEFAULT_OPERATION_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+        pipeline: bool = False,
+        pipeline_supported: Optional[bool] = None,
+    ):
+        """
+        timeout: default seconds allowed for a whole operation (handshake included).
+        clock: monotonic clock used for deadlines and timings.
+        pipeline: send the read command straight after the handshake, without
+                  waiting for the handshake ACK, saving one turnaround per operation.
+                  If the device does not answer a pipelined read, the operation is
+                  retried without pipelining and pipelining is disabled for this device.
+        pipeline_supported: whether the device is known to handle pipelining
+                            (True/False), None to find out on the first operation.
+        """
+        self.handshook = False
+        self.timeout = timeout
+        self.clock = clock
+        self.pipeline = pipeline
+        self.pipeline_supported = pipeline_supported
+        self.deadline: Optional[Deadline] = None
+        self.protocol = RS109mProtocol()
+
+    @staticmethod
+    def _num_bytes(extended: bool) -> int:
+        return 0xff if extended else RS109mRawConfig.default_len
+
+    def _open_handshake(
+        self,
+        password: str,
+        timeout: Optional[float],
+        prefetch: Optional[int],
+    ) -> Operation[None]:
+        """
+        Perform and validate the handshake, starting a deadline of `timeout`
+        seconds (the driver default if None) shared by every read until
+        _close_handshake. If `prefetch` is set, a read of that many bytes is
+        sent along with the handshake and answered by the next _read_config.
+        """
+        # Validates the password before anything is sent
+        frame = self.protocol.send_handshake(password)
+        if prefetch is not None:
+            frame += self.protocol.send_read(prefetch)
+
+        self.deadline = Deadline(self.timeout if timeout is None else timeout, self.clock)
+        yield Write(frame)
+        try:
+            yield from self._receive()
+        except (TimeoutError, RS109mProtocolError) as e:
+            if prefetch is None:
+                raise
+            raise _PipelineRejected() from e
+        self.handshook = True
+
+    def _close_handshake(self) -> Operation[None]:
+        # The device expects a fresh handshake for every operation, which
+        # matters once a driver outlives a single call (see session pooling).
+        self.handshook = False
+        self.deadline = None
+        self.protocol.reset()
+        yield Reset()
+
+    def _in_handshake(
+        self,
+        password: str,
+        timeout: Optional[float],
+        prefetch: Optional[int],
+        body: Callable[[], Operation[T]],
+    ) -> Operation[T]:
+        """Run `body` within a handshake (the current one, if any)."""
+        if self.handshook:
+            return (yield from body())
+        try:
+            yield from self._open_handshake(password, timeout, prefetch)
+            return (yield from body())
+        finally:
+            yield from self._close_handshake()
+
+    def _receive(self) -> Operation[RS109mReply]:
+        """Read until the protocol can return the next expected reply, within the current deadline."""
+        while True:
+            reply = self.protocol.next_reply()
+            if reply is not None:
+                return reply
+            needed = self.protocol.bytes_needed
+            timeout = self.deadline.remaining() if self.deadline is not None else None
+            data = yield ReadFrame(needed, timeout)
+            if len(data) < needed and self.deadline is not None and self.deadline.expired():
+                raise TimeoutError(f"Timed out waiting for {needed} bytes from device, got {len(data)}")
+            self.protocol.receive_data(data)
+            if len(data) < needed:
+                # a wrong header is reported as such, anything else as incomplete
+                self.protocol.next_reply()
+                raise self.protocol.incomplete()
+
+    def _read_config(self, num_bytes: int) -> Operation[RS109mRawConfig]:
+        """Read the configuration. Must be run within a handshake."""
+        config = RS109mRawConfig()
+        if self.protocol.pending:
+            # the read was pipelined with the handshake
+            try:
+                config.config = (yield from self._receive()).data
+            except (TimeoutError, RS109mProtocolError) as e:
+                raise _PipelineRejected() from e
+            return config
+
+        yield Write(self.protocol.send_read(num_bytes))
+        config.config = (yield from self._receive()).data
+        return config
+
+    def _write_config(self, config: RS109mRawConfig, num_bytes: int) -> Operation[None]:
+        """Write the configuration. Must be run within a handshake."""
+        yield Write(self.protocol.send_write(config.view(num_bytes), num_bytes))
+        yield from self._receive()
+        logger.info("Config written successfully!")
+
+    def _pipelined(self, operation: Callable[[Optional[int]], Operation[T]], num_bytes: int) -> Operation[T]:
+        """
+        Run operation(prefetch) pipelined if enabled, falling back to a plain
+        operation if the device rejects it. The outcome is remembered in
+        pipeline_supported, so the probe happens once per device.
+        """
+        if not self.pipeline or self.pipeline_supported is False:
+            return (yield from operation(None))
+
+        try:
+            result = yield from operation(num_bytes)
+        except _PipelineRejected as e:
+            logger.info(f"Pipelined read failed ({e.__cause__}), retrying without pipelining")
+            result = yield from operation(None)
+            # only blame pipelining once the device has answered without it
+            self.pipeline_supported = False
+            return result
+
+        self.pipeline_supported = True
+        return result
+
+    def _read_config_operation(
+        self,
+        password: str,
+        extended: bool,
+        timeout: Optional[float],
+    ) -> Operation[RS109mRawConfig]:
+        num_bytes = self._num_bytes(extended)
+
+        def operation(prefetch: Optional[int]) -> Operation[RS109mRawConfig]:
+            return self._in_handshake(password, timeout, prefetch, lambda: self._read_config(num_bytes))
+
+        return self._pipelined(operation, num_bytes)
+
+    def _write_config_operation(
+        self,
+        config: RS109mRawConfig,
+        password: str,
+        extended: bool,
+        timeout: Optional[float],
+    ) -> Operation[None]:
+        num_bytes = self._num_bytes(extended)
+        return self._in_handshake(password, timeout, None, lambda: self._write_config(config, num_bytes))
+
+    def _read_modify_write_operation(
+        self,
+        patch: Callable[[RS109mRawConfig], None],
+        password: str,
+        extended: bool,
+        force: bool,
+        timeout: Optional[float],
+    ) -> Operation[RS109mTransactionResult]:
+        if timeout is None:
+            timeout = 3 * self.timeout
+        num_bytes = self._num_bytes(extended)
+
+        def operation(prefetch: Optional[int]):
+            timings = {}
+            start = mark = self.clock()
+
+            def lap(phase: str) -> None:
+                nonlocal mark
+                now = self.clock()
+                timings[phase] = now - mark
+                mark = now
+
+            def body():
+                lap("handshake")
+
+                original = yield from self._read_config(num_bytes)
+                config = original.copy()
+                patch(config)
+                lap("read")
+
+                changed = force or config.view(num_bytes) != original.view(num_bytes)
+                if changed:
+                    yield from self._write_config(config, num_bytes)
+                    lap("write")
+
+                    verified_config = yield from self._read_config(num_bytes)
+                    lap("verify")
+                else:
+                    logger.info("Configuration unchanged, skipping write.")
+                    verified_config = original
+                return original, config, verified_config, changed
+
+            result = yield from self._in_handshake(password, timeout, prefetch, body)
+            timings["total"] = self.clock() - start
+            return result + (timings,)
+
+        original, config, verified_config, changed, timings = yield from self._pipelined(operation, num_bytes)
+
+        verified = verified_config.view(num_bytes) == config.view(num_bytes)
+        if not verified:
+            logger.warning("Read back configuration differs from the written configuration.")
+
+        return RS109mTransactionResult(
+            original=original,
+            written=config,
+            verified_config=verified_config,
+            verified=verified,
+            changed=changed,
+            timings=timings,
+        )
@@ -0,0 +1,107 @@
+"""
+Partial configurations compiled into byte patches.
+
+RS109mPatch.compile({"interval": 60, "shipncargo": 36}) runs the field
+encoders (with their validation and clamping) once, and keeps the result
+as a (mask, value) pair over the bytes the fields occupy. Applying the
+patch to an image is then one integer operation,
+
+    image = (image & ~mask) | value
+
+whatever the number of fields, so stamping the same change onto a fleet
+costs no per-field work per device. batch_codec.apply_patch applies a
+patch to a whole NumPy array of images at once.
+"""
+from typing import Any, Iterable, List, Mapping, Tuple
+
+from .config import RS109mRawConfig
+from .diff import FIELD_MASKS
+from .layout import ENCODERS, FIELDS_BY_NAME
+
+_MASKS = {name: mask for name, mask, _ in FIELD_MASKS}
+
+
+class RS109mPatch:
+    """
+    A compiled partial configuration: the bits of bytes [start, stop) set in
+    `mask` are replaced by those of `value`, every other bit is kept.
+    """
+    __slots__ = ("fields", "start", "stop", "mask", "value", "_keep", "_value")
+
+    def __init__(self, fields: Tuple[str, ...], start: int, stop: int, mask: bytes, value: bytes):
+        self.fields = fields
+        self.start = start
+        self.stop = stop
+        self.mask = mask
+        self.value = value
+        mask_int = int.from_bytes(mask, "little")
+        self._keep = ~mask_int & ((1 << (8 * len(mask))) - 1)
+        self._value = int.from_bytes(value, "little")
+
+    @classmethod
+    def compile(cls, values: Mapping[str, Any]) -> "RS109mPatch":
+        """
+        Compile field values (RS109mRawConfig property names) into a patch.
+        None values are skipped. Raises ValueError for unknown fields or values
+        the field setters reject.
+        """
+        values = {name: value for name, value in values.items() if value is not None}
+        unknown = set(values) - set(FIELDS_BY_NAME)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not values:
+            return cls((), 0, 0, b"", b"")
+
+        scratch = bytearray(RS109mRawConfig.max_len)
+        mask = 0
+        for name, value in values.items():
+            ENCODERS[name](scratch, value)
+            mask |= _MASKS[name]
+        value_int = int.from_bytes(scratch, "little") & mask
+
+        start = ((mask & -mask).bit_length() - 1) // 8
+        stop = (mask.bit_length() + 7) // 8
+        size = stop - start
+        return cls(
+            tuple(name for name in FIELDS_BY_NAME if name in values),
+            start,
+            stop,
+            (mask >> (8 * start)).to_bytes(size, "little"),
+            (value_int >> (8 * start)).to_bytes(size, "little"),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.fields)
+
+    def __repr__(self) -> str:
+        return f"RS109mPatch(fields={self.fields}, bytes={self.start}..{self.stop})"
+
+    def _patched(self, image) -> bytes:
+        old = int.from_bytes(image[self.start:self.stop], "little")
+        return ((old & self._keep) | self._value).to_bytes(self.stop - self.start, "little")
+
+    def changes(self, image) -> bool:
+        """Whether applying the patch would change the image (RS109mRawConfig or raw bytes)."""
+        if not self.fields:
+            return False
+        image = image.config if isinstance(image, RS109mRawConfig) else image
+        return bytes(image[self.start:self.stop]) != self._patched(image)
+
+    def apply(self, config: RS109mRawConfig) -> RS109mRawConfig:
+        """Apply the patch to a config (copy-on-write, like the field setters). Returns the config."""
+        if self.fields:
+            image = config.config
+            if isinstance(image, bytearray) or (isinstance(image, memoryview) and not image.readonly):
+                image[self.start:self.stop] = self._patched(image)
+            else:
+                config.set_config(b"".join((image[:self.start], self._patched(image), image[self.stop:])))
+        return config
+
+    def apply_to_buffer(self, buffer) -> None:
+        """Apply the patch in place to a writable image buffer (bytearray, writable memoryview, ...)."""
+        if self.fields:
+            buffer[self.start:self.stop] = self._patched(buffer)
+
+    def apply_many(self, configs: Iterable[RS109mRawConfig]) -> List[RS109mRawConfig]:
+        """apply() to many configs."""
+        return [self.apply(config) for config in configs]
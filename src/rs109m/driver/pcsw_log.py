@@ -0,0 +1,289 @@
+"""
+Streaming parser for the serial monitor captures of the vendor tool (PCSW),
+like bin/logs/rs1*.txt:
+
+    [06/08/2021 00:07:56] - Open port ttyUSB0 (RS_10xM_SETTING.exe)
+    [06/08/2021 00:07:56] Written data (ttyUSB0)
+        51 40                                             Q@
+    [06/08/2021 00:07:56] Read data (ttyUSB0)
+        25 40 08 2f d2 7f 06 42 4c 41 48 20 20 20 20 20   %@./Ò.BLAH
+        ...
+    [06/08/2021 00:07:57] - Close port ttyUSB0
+
+iter_pcsw_log turns a capture into PcswEvents: port open/close and the
+protocol frames (handshake, 0x51 read, 0x55 write and the replies), with
+the configuration images decoded. Files are read line by line and the bytes
+of each port and direction are reassembled into frames in a buffer of at
+most one frame, so memory stays constant whatever the size of the capture.
+
+PcswLogIndex records the file offsets of block starts by timestamp, so a
+large capture can be read from any point in time without parsing what
+comes before it.
+"""
+import bisect
+import re
+from array import array
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .config import RS109mRawConfig
+
+DEFAULT_TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+_EVENT_LINE = re.compile(rb"^\[([^\]]+)\] (?:- (Open|Close) port (\S+)|(Written|Read) data \(([^)]*)\))")
+_HEX_LINE = re.compile(rb"^ {4}((?:[0-9a-fA-F]{2} ){0,15}[0-9a-fA-F]{2})")
+
+
+class PcswEventKind(str, Enum):
+    OPEN = "open"
+    CLOSE = "close"
+    HANDSHAKE = "handshake"  # arg: command, 1 login, 2 clear password, 3 set password
+    HANDSHAKE_REPLY = "handshake_reply"  # arg: status, 0x20 accepted
+    READ_REQUEST = "read_request"  # arg: bytes requested
+    READ_REPLY = "read_reply"  # arg: bytes, config: the image read
+    WRITE_REQUEST = "write_request"  # arg: bytes, config: the image written
+    WRITE_ACK = "write_ack"  # arg: bytes
+    UNKNOWN = "unknown"  # bytes which are not a known (or complete) frame
+
+
+class PcswEvent(NamedTuple):
+    timestamp: datetime
+    kind: PcswEventKind
+    port: str
+    data: bytes = b""  # the whole frame
+    arg: int = 0
+    config: Optional[RS109mRawConfig] = None
+    offset: int = 0  # file offset of the line starting the block the frame started in
+
+
+def _frame_length(data: bytes, written: bool) -> Optional[int]:
+    """Length of the frame at the start of `data`, None if not known yet, 0 if not a frame."""
+    if len(data) < 2:
+        return None
+    command, second = data[0], data[1]
+    if written:
+        if command == 0x59:
+            if len(data) < 4:
+                return None
+            # set password sends the old and the new password
+            return 4 + data[3] * (2 if second == 0x03 else 1)
+        if command == 0x51:
+            return 2
+        if command == 0x55:
+            return 2 + second
+    else:
+        if command in (0x95, 0x75):
+            return 2
+        if command == 0x25:
+            return 2 + second
+    return 0
+
+
+def _frame_event(timestamp: datetime, port: str, frame: bytes, written: bool, offset: int) -> PcswEvent:
+    command = frame[0]
+    if written:
+        if command == 0x59:
+            return PcswEvent(timestamp, PcswEventKind.HANDSHAKE, port, frame, frame[1], None, offset)
+        if command == 0x51:
+            return PcswEvent(timestamp, PcswEventKind.READ_REQUEST, port, frame, frame[1], None, offset)
+        return PcswEvent(timestamp, PcswEventKind.WRITE_REQUEST, port, frame, frame[1], RS109mRawConfig(frame[2:]), offset)
+    if command == 0x95:
+        return PcswEvent(timestamp, PcswEventKind.HANDSHAKE_REPLY, port, frame, frame[1], None, offset)
+    if command == 0x75:
+        return PcswEvent(timestamp, PcswEventKind.WRITE_ACK, port, frame, frame[1], None, offset)
+    return PcswEvent(timestamp, PcswEventKind.READ_REPLY, port, frame, frame[1], RS109mRawConfig(frame[2:]), offset)
+
+
+class _Framer:
+    """Reassembles the frames of one port and direction, which may span several blocks."""
+    __slots__ = ("written", "buffer", "timestamp", "offset")
+
+    def __init__(self, written: bool):
+        self.written = written
+        self.buffer = b""
+        self.timestamp: Optional[datetime] = None
+        self.offset = 0
+
+    def feed(self, timestamp: datetime, port: str, data: bytes, offset: int) -> Iterator[PcswEvent]:
+        if not self.buffer:
+            self.timestamp, self.offset = timestamp, offset
+        self.buffer += data
+        while self.buffer:
+            length = _frame_length(self.buffer, self.written)
+            if length is None or length > len(self.buffer):
+                return
+            if length == 0:
+                # not a known frame, give up on the rest of the block
+                yield PcswEvent(self.timestamp, PcswEventKind.UNKNOWN, port, self.buffer, 0, None, self.offset)
+                self.buffer = b""
+                return
+            frame, self.buffer = self.buffer[:length], self.buffer[length:]
+            yield _frame_event(self.timestamp, port, frame, self.written, self.offset)
+            self.timestamp, self.offset = timestamp, offset
+
+    def flush(self, port: str) -> Iterator[PcswEvent]:
+        if self.buffer:
+            yield PcswEvent(self.timestamp, PcswEventKind.UNKNOWN, port, self.buffer, 0, None, self.offset)
+            self.buffer = b""
+
+
+class _TimestampParser:
+    """strptime with a one entry cache, consecutive lines mostly share their timestamp."""
+
+    def __init__(self, timestamp_format: str):
+        self.format = timestamp_format
+        self.last: Tuple[bytes, Optional[datetime]] = (b"", None)
+
+    def __call__(self, text: bytes) -> datetime:
+        if text != self.last[0]:
+            self.last = (text, datetime.strptime(text.decode("ascii"), self.format))
+        return self.last[1]
+
+
+class _PcswParser:
+    def __init__(self, timestamp_format: str):
+        self.parse_timestamp = _TimestampParser(timestamp_format)
+        self.framers: Dict[Tuple[str, bool], _Framer] = {}
+
+    def idle(self) -> bool:
+        """Whether no frame is partially received, so parsing could restart here."""
+        return not any(framer.buffer for framer in self.framers.values())
+
+    def _framer(self, port: str, written: bool) -> _Framer:
+        framer = self.framers.get((port, written))
+        if framer is None:
+            framer = self.framers[(port, written)] = _Framer(written)
+        return framer
+
+    def flush(self, port: Optional[str] = None) -> Iterator[PcswEvent]:
+        for (framer_port, _), framer in list(self.framers.items()):
+            if port is None or framer_port == port:
+                yield from framer.flush(framer_port)
+
+    def parse(self, fh: BinaryIO, offset: int) -> Iterator[Tuple[int, Optional[datetime], List[PcswEvent]]]:
+        """(offset, timestamp, events) for every line, the timestamp is that of block start lines."""
+        block: Optional[Tuple[datetime, str, bool, int]] = None
+        for line in fh:
+            line_offset = offset
+            offset += len(line)
+
+            if block is not None:
+                match = _HEX_LINE.match(line)
+                if match:
+                    timestamp, port, written, block_offset = block
+                    data = bytes.fromhex(match.group(1).decode("ascii"))
+                    framer = self._framer(port, written)
+                    yield line_offset, None, list(framer.feed(timestamp, port, data, block_offset))
+                    continue
+                block = None
+
+            match = _EVENT_LINE.match(line)
+            if not match:
+                continue
+            timestamp = self.parse_timestamp(match.group(1))
+            open_close, open_close_port, direction, data_port = match.group(2, 3, 4, 5)
+            if open_close:
+                port = open_close_port.decode("utf-8", "replace")
+                events = [] if open_close == b"Open" else list(self.flush(port))
+                kind = PcswEventKind.OPEN if open_close == b"Open" else PcswEventKind.CLOSE
+                events.append(PcswEvent(timestamp, kind, port, offset=line_offset))
+                yield line_offset, timestamp, events
+            else:
+                block = (timestamp, data_port.decode("utf-8", "replace"), direction == b"Written", line_offset)
+                yield line_offset, timestamp, []
+
+
+def iter_pcsw_log(
+    path: Union[str, Path],
+    *,
+    start: int = 0,
+    timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+) -> Iterator[PcswEvent]:
+    """
+    Stream the events of a capture.
+    start: file offset to start from, the start of a line (see PcswLogIndex).
+    timestamp_format: strptime format of the timestamps (the tool follows the
+                      locale of the machine it runs on).
+    """
+    parser = _PcswParser(timestamp_format)
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        for _, _, events in parser.parse(fh, start):
+            yield from events
+        yield from parser.flush()
+
+
+class PcswLogIndex:
+    """
+    Timestamp -> file offset index of a capture, one entry per `stride` blocks.
+    Only blocks where no frame is partially received are indexed, so parsing
+    can restart at any entry. Captures are assumed to be in time order.
+    """
+
+    def __init__(self, path: Union[str, Path], timestamps: array, offsets: array, timestamp_format: str):
+        self.path = Path(path)
+        self.timestamps = timestamps  # seconds since epoch ("d")
+        self.offsets = offsets  # ("Q")
+        self.timestamp_format = timestamp_format
+
+    @classmethod
+    def build(
+        cls,
+        path: Union[str, Path],
+        *,
+        stride: int = 1,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+    ) -> "PcswLogIndex":
+        """Index a capture in one streaming pass."""
+        timestamps, offsets = array("d"), array("Q")
+        parser = _PcswParser(timestamp_format)
+        blocks = 0
+        with open(path, "rb") as fh:
+            for offset, timestamp, _ in parser.parse(fh, 0):
+                if timestamp is None:
+                    continue
+                if blocks % stride == 0 and parser.idle():
+                    timestamps.append(timestamp.timestamp())
+                    offsets.append(offset)
+                blocks += 1
+        return cls(path, timestamps, offsets, timestamp_format)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def offset(self, timestamp: datetime) -> int:
+        """
+        Offset of the last indexed block before `timestamp` (0 if there is none),
+        every event at or after `timestamp` comes after it.
+        """
+        position = bisect.bisect_left(self.timestamps, timestamp.timestamp()) - 1
+        return self.offsets[position] if position >= 0 else 0
+
+    def events(self, since: datetime, until: Optional[datetime] = None) -> Iterator[PcswEvent]:
+        """The events from `since` (inclusive) up to `until` (exclusive)."""
+        for event in iter_pcsw_log(self.path, start=self.offset(since), timestamp_format=self.timestamp_format):
+            if until is not None and event.timestamp >= until:
+                return
+            if event.timestamp >= since:
+                yield event
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the index to a file, e.g. <capture>.idx."""
+        with open(path, "wb") as fh:
+            header = f"{len(self)}\n{self.timestamp_format}\n".encode("utf-8")
+            fh.write(header)
+            self.timestamps.tofile(fh)
+            self.offsets.tofile(fh)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], log_path: Union[str, Path]) -> "PcswLogIndex":
+        """Read an index written by save() for the capture at `log_path`."""
+        with open(path, "rb") as fh:
+            count = int(fh.readline())
+            timestamp_format = fh.readline().decode("utf-8").rstrip("\n")
+            timestamps, offsets = array("d"), array("Q")
+            timestamps.fromfile(fh, count)
+            offsets.fromfile(fh, count)
+        return cls(log_path, timestamps, offsets, timestamp_format)
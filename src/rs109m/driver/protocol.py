@@ -0,0 +1,145 @@
+"""
+Transport independent (sans-IO) implementation of the RS-109M host protocol.
+
+RS109mProtocol builds complete outbound frames and parses the device's
+replies from bytes fed to it in any chunking. It never touches a DeviceIO,
+so the sync and async drivers share it and only move bytes around.
+
+    Handshake [0x59, 0x01, 0x42, len] + password => [0x95, 0x20]
+    Read      [0x51, len]                        => [0x25, len] + config[:len]
+    Write     [0x55, len] + config[:len]         => [0x75, len]
+"""
+import re
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Deque, Optional
+
+from .constants import DEFAULT_PASSWORD, PASSWORD_MAXLEN
+
+HANDSHAKE_ACK = b"\x95\x20"
+
+
+class RS109mProtocolError(Exception):
+    pass
+
+
+class RS109mReplyKind(Enum):
+    HANDSHAKE = "handshake"
+    READ = "read"
+    WRITE = "write"
+
+
+@dataclass
+class RS109mReply:
+    kind: RS109mReplyKind
+    data: bytes = b""  # the configuration bytes of a READ reply
+
+
+@dataclass
+class _Expectation:
+    kind: RS109mReplyKind
+    header: bytes
+    payload_len: int
+    error: str
+
+
+def prepare_password(password: Optional[str]) -> Optional[bytes]:
+    """Validate a password and pad it to PASSWORD_MAXLEN with the default password."""
+    if password is None:
+        return None
+    if not re.match(f"^[0-9]{{0,{PASSWORD_MAXLEN}}}$", password):
+        raise ValueError(f"Password incorrect: should match [0-9]{{0,{PASSWORD_MAXLEN}}}")
+    return (password.encode() + DEFAULT_PASSWORD.encode())[:PASSWORD_MAXLEN]
+
+
+class RS109mProtocol:
+    """
+    The host side of the RS-109M protocol as a state machine.
+
+    Every send_* method returns one coalesced frame for the caller to write
+    and queues the reply it expects, so several commands may be outstanding.
+    Received bytes are passed to receive_data and replies taken, in order,
+    with next_reply. bytes_needed tells a transport how much to read next.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._expected: Deque[_Expectation] = deque()
+
+    def reset(self) -> None:
+        """Forget buffered bytes and outstanding replies."""
+        self._buffer.clear()
+        self._expected.clear()
+
+    @property
+    def pending(self) -> int:
+        """Number of replies still expected."""
+        return len(self._expected)
+
+    def send_handshake(self, password: Optional[str]) -> bytes:
+        prepared = prepare_password(password)
+        if prepared is None:
+            frame = bytes([0x59, 0x01, 0x42, 0x00])
+        else:
+            frame = bytes([0x59, 0x01, 0x42, PASSWORD_MAXLEN]) + prepared
+        self._expect(RS109mReplyKind.HANDSHAKE, HANDSHAKE_ACK, 0, "Could not initialize with password.")
+        return frame
+
+    def send_read(self, num_bytes: int) -> bytes:
+        self._expect(RS109mReplyKind.READ, bytes([0x25, num_bytes]), num_bytes, "Could not read config header, got: {}")
+        return bytes([0x51, num_bytes])
+
+    def send_write(self, config: bytes, num_bytes: int) -> bytes:
+        self._expect(RS109mReplyKind.WRITE, bytes([0x75, num_bytes]), 0, "Write failed.")
+        # one copy of the payload, straight into the frame
+        return b"".join((bytes([0x55, num_bytes]), memoryview(config)[:num_bytes]))
+
+    def _expect(self, kind: RS109mReplyKind, header: bytes, payload_len: int, error: str) -> None:
+        self._expected.append(_Expectation(kind, header, payload_len, error))
+
+    def receive_data(self, data: bytes) -> None:
+        self._buffer += data
+
+    @property
+    def bytes_needed(self) -> int:
+        """
+        Bytes to read before the next parsing step can make progress: the
+        header of the next reply first (so a bad header fails fast), then its
+        payload. 0 if a reply can already be taken or none is expected.
+        """
+        if not self._expected:
+            return 0
+        expectation = self._expected[0]
+        header_len = len(expectation.header)
+        if len(self._buffer) < header_len:
+            return header_len - len(self._buffer)
+        return max(0, header_len + expectation.payload_len - len(self._buffer))
+
+    def next_reply(self) -> Optional[RS109mReply]:
+        """
+        The next complete reply, None if more bytes are needed.
+        Raises RS109mProtocolError if the device answered unexpectedly.
+        """
+        if not self._expected:
+            return None
+        expectation = self._expected[0]
+        header_len = len(expectation.header)
+        if len(self._buffer) < header_len:
+            return None
+        header = bytes(self._buffer[:header_len])
+        if header != expectation.header:
+            raise RS109mProtocolError(expectation.error.format(header.hex(' ')))
+        end = header_len + expectation.payload_len
+        if len(self._buffer) < end:
+            return None
+
+        data = bytes(self._buffer[header_len:end])
+        del self._buffer[:end]
+        self._expected.popleft()
+        return RS109mReply(expectation.kind, data)
+
+    def incomplete(self) -> RS109mProtocolError:
+        """The error for a transport which ran out of bytes mid reply."""
+        kind = self._expected[0].kind.value if self._expected else "reply"
+        return RS109mProtocolError(f"Incomplete {kind} response from device, {self.bytes_needed} bytes missing.")
@@ -1,53 +1,180 @@
-def fromxbit(ba, x=6, digitalphaencoding=True):
-    if ((x < 1) or (x > 7)):
+"""
+x-bit character packing, as used for the AIS 6-bit text fields.
+
+fromxbit/toxbit convert between packed bytes and one value per character.
+The 6-bit helpers below work on whole fields and, in bulk, on lists of
+fields. Packing reads the characters as one integer (int.from_bytes after
+a bytes.translate masking table) and closes the gaps between the codes
+with precomputed masks, in log2(characters) steps; nothing loops per
+character, and inputs are never modified.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# The AIS 6-bit character set, in code order
+AIS_CHARSET = "@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !\"#$%&'()*+,-./0123456789:;<=>?"
+
+
+def _digitalpha(value: int) -> int:
+    if (value & 0x20) != 0x20 and value != 0:
+        # not a digit, is alpha
+        return (value & 0x1f) | 0x40
+    return value
+
+
+# bytes.translate tables
+_DIGITALPHA_TABLE = bytes(_digitalpha(value) for value in range(256))
+_MASK_TABLES = {x: bytes(value & ((1 << x) - 1) for value in range(256)) for x in range(1, 8)}
+
+
+def _sixbit_char(value: int, alpha: bool) -> str:
+    char = chr(value | 0x40) if alpha else chr(_digitalpha(value))
+    return char if char.isalnum() else ""
+
+
+# 6-bit value -> character, "" for characters which are dropped when decoding
+SIXBIT_DECODE = tuple(_sixbit_char(value, False) for value in range(64))
+SIXBIT_ALPHA_DECODE = tuple(_sixbit_char(value, True) for value in range(64))
+
+# str.translate table: lower case to upper case, characters outside the AIS
+# charset removed (non ASCII characters are dropped when encoding)
+AIS_TRANSLATE = {code: None for code in range(128)}
+AIS_TRANSLATE.update({ord(c): c for c in AIS_CHARSET})
+AIS_TRANSLATE.update({ord(c.lower()): c for c in AIS_CHARSET if c.isalpha()})
+
+_ALNUM_TRANSLATE = {code: None for code in range(128) if not chr(code).isalnum()}
+
+
+# (count, x) -> squeeze steps, see _squeeze_steps
+_SQUEEZE_STEPS: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+
+
+def _squeeze_steps(count: int, x: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    (mask, shift) steps which move `count` x-bit codes spread 8 bits apart
+    (code i at bit 8i) to x bits apart (code i at bit xi): step k shifts the
+    codes whose index has bit k set, so log2(count) steps close every gap.
+    Computed once per (count, x).
+    """
+    steps = _SQUEEZE_STEPS.get((count, x))
+    if steps is not None:
+        return steps
+    gap = 8 - x
+    steps = []
+    k = 0
+    while (1 << k) < count:
+        mask = 0
+        for i in range(count):
+            if (i >> k) & 1:
+                # position of code i once the gaps of the previous steps are closed
+                mask |= ((1 << x) - 1) << (8 * i - gap * (i & ((1 << k) - 1)))
+        steps.append((mask, gap << k))
+        k += 1
+    steps = _SQUEEZE_STEPS[(count, x)] = tuple(steps)
+    return steps
+
+
+def _check_bits(x: int) -> None:
+    if (x < 1) or (x > 7):
         raise ValueError("BitLen must between 1 and 7")
+
+
+def fromxbit(ba, x=6, digitalphaencoding=True):
+    _check_bits(x)
     if len(ba) < 1:
         raise ValueError("Must supply non-empty array")
 
     n = len(ba) * 8 // x
-    b = bytearray([0 for i in range(n)])
-
-    for i in range(n):
-        pos = i * x // 8
-        shift = i * x % 8
-
-        b[i] = (ba[pos] >> shift) & ((1 << x) - 1)
-        remaining = shift + x - 8
-        if remaining > 0:
-            b[i] |= (ba[pos + 1] << (8 - shift)) & ((1 << x) - 1)
-        if digitalphaencoding and (b[i] & 0x20) != 0x20 and b[i] != 0:
-            # not a digit, is alpha
-            b[i] = (b[i] & 0x1f) | 0x40
-
+    value = int.from_bytes(ba, "little")
+    mask = (1 << x) - 1
+    b = bytearray((value >> shift) & mask for shift in range(0, n * x, x))
+    if digitalphaencoding:
+        b = b.translate(_DIGITALPHA_TABLE)
     return b
 
 
 def toxbit(ba, x=6, digitalphaencoding=True):
-    if ((x < 1) or (x > 7)):
-        raise ValueError("BitLen must between 1 and 7")
+    _check_bits(x)
     if len(ba) < 1:
         return [0xff, 0xff, 0xff, 0xff, 0xff, 0xff]
 
     if digitalphaencoding:
-        ba = bytearray(
-            ba.encode('ascii', 'ignore').decode().upper().encode('ascii'))
-
-    n = len(ba) * x // 8
-    if (len(ba) * x % 8) > 0:
-        n += 1
-    if n == 0:
-        n = 1
-    b = bytearray([0 for i in range(n)])
-
-    for i in range(len(ba)):
-        pos = i * x // 8
-        shift = i * x % 8
-
-        ba[i] = ba[i] & ((1 << x) - 1)
-
-        b[pos] |= (ba[i] << shift) & 0xff
-        remaining = shift + x - 8
-        # print(ba[i], " i=", i, " pos=", pos, " shift=", shift, " remaining=", remaining)
-        if remaining > 0:
-            b[pos + 1] |= (ba[i] >> (8 - shift))
-    return b
+        ba = ba.encode('ascii', 'ignore').upper()
+    data = bytes(ba).translate(_MASK_TABLES[x])
+
+    n = max(1, (len(data) * x + 7) // 8)
+    value = int.from_bytes(data, "little")
+    for mask, shift in _SQUEEZE_STEPS.get((len(data), x)) or _squeeze_steps(len(data), x):
+        value = (value & ~mask) | ((value & mask) >> shift)
+    return bytearray(value.to_bytes(n, "little"))
+
+
+def sanitize(text: str) -> str:
+    """Upper case `text` and drop the characters which are not in the AIS 6-bit charset."""
+    return str(text).translate(AIS_TRANSLATE).encode("ascii", "ignore").decode("ascii")
+
+
+def pack_sixbit(text: str, chars: int, *, keep: str = "head", alnum: bool = False) -> int:
+    """
+    Pack text into a `chars` character 6-bit field, first character in the
+    highest bits. Text longer than the field keeps its "head" (padded at the
+    end) or its "tail" (padded at the start). With `alnum` only letters and
+    digits are kept.
+    """
+    text = str(text)
+    if alnum:
+        text = text.translate(_ALNUM_TRANSLATE)
+    data = text.encode("ascii", "ignore").upper()
+    data = data[-chars:].rjust(chars, b"\x00") if keep == "tail" else data[:chars].ljust(chars, b"\x00")
+    # the 6-bit codes spread 8 bits apart, then the gaps squeezed out
+    value = int.from_bytes(data.translate(_MASK_TABLES[6]), "big")
+    for mask, shift in _SQUEEZE_STEPS.get((chars, 6)) or _squeeze_steps(chars, 6):
+        value = (value & ~mask) | ((value & mask) >> shift)
+    return value
+
+
+def unpack_sixbit(value: int, chars: int, *, alpha: bool = False) -> str:
+    """Decode a `chars` character 6-bit field, dropping padding and non alphanumeric characters."""
+    table = SIXBIT_ALPHA_DECODE if alpha else SIXBIT_DECODE
+    return "".join([table[(value >> shift) & 0x3f] for shift in range(6 * (chars - 1), -1, -6)])
+
+
+def pack_sixbit_many(texts: Iterable[str], chars: int, *, keep: str = "head", alnum: bool = False) -> List[int]:
+    """pack_sixbit for many texts."""
+    return [pack_sixbit(text, chars, keep=keep, alnum=alnum) for text in texts]
+
+
+def unpack_sixbit_many(values: Iterable[int], chars: int, *, alpha: bool = False) -> List[str]:
+    """unpack_sixbit for many values."""
+    table = SIXBIT_ALPHA_DECODE if alpha else SIXBIT_DECODE
+    shifts = range(6 * (chars - 1), -1, -6)
+    return ["".join([table[(value >> shift) & 0x3f] for shift in shifts]) for value in values]
+
+
+CALLSIGN_BYTES = 5
+CALLSIGN_CHARS = 6
+
+
+def encode_callsigns(callsigns: Iterable[str]) -> List[bytes]:
+    """The 5-byte callsign fields (as stored at bytes 32-36) of many callsigns."""
+    return [
+        pack_sixbit(callsign, CALLSIGN_CHARS, keep="tail", alnum=True).to_bytes(CALLSIGN_BYTES, "little")
+        for callsign in callsigns
+    ]
+
+
+def decode_callsigns(fields: Iterable[Sequence[int]]) -> List[str]:
+    """The callsigns of many 5-byte callsign fields."""
+    return unpack_sixbit_many(
+        (int.from_bytes(field[:CALLSIGN_BYTES], "little") for field in fields),
+        CALLSIGN_CHARS,
+    )
+
+
+def encode_names(names: Iterable[str], size: int = 20) -> List[bytes]:
+    """Many names as space padded `size` byte fields, sanitised to the AIS charset."""
+    return [sanitize(name).encode("ascii").ljust(size)[:size] for name in names]
+
+
+def decode_names(fields: Iterable[Sequence[int]]) -> List[str]:
+    """The names of many name fields."""
+    return [bytes(field).decode("ascii", "replace").strip() for field in fields]
@@ -0,0 +1,121 @@
+"""
+Bulk conversion between manifest rows, configuration images and the models.
+
+- validate_configs / validate_write_requests validate a whole list of rows
+  in one call, through a TypeAdapter compiled once at import, instead of a
+  model_validate per row.
+- trusted_config(s) build RS109mConfig models from images read from a
+  device with model_construct, without validation: the bytes were already
+  checked by the protocol. Values outside the model's constraints (e.g.
+  the MMSI of a blank buoy) are kept as they are.
+- RS109mConfigView is a lazy, read-only stand-in for RS109mConfig over an
+  image: a field is decoded the first time it is accessed.
+"""
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Union
+
+from pydantic import TypeAdapter
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver.layout import DECODERS, RS109mFieldValues, decode_config
+
+from .config_util import _DRIVER_FIELDS
+from .models import RS109mConfig, RS109mWriteConfigRequest
+from .ship_type import ShipType
+
+Image = Union[RS109mRawConfig, bytes, bytearray, memoryview]
+
+CONFIG_LIST_ADAPTER = TypeAdapter(List[RS109mConfig])
+WRITE_REQUEST_LIST_ADAPTER = TypeAdapter(List[RS109mWriteConfigRequest])
+
+DEFAULT_CHUNK_SIZE = 1024
+
+_SHIP_TYPES = {ship_type.value: ship_type for ship_type in ShipType}
+
+_DRIVER_NAMES = dict(_DRIVER_FIELDS)
+# (RS109mConfig field, position in RS109mFieldValues)
+_POSITIONS = tuple((name, RS109mFieldValues._fields.index(driver_name)) for name, driver_name in _DRIVER_FIELDS)
+# every field is set from the image
+_FIELDS_SET = frozenset(name for name, _ in _DRIVER_FIELDS)
+
+
+def validate_configs(rows: Sequence[Mapping[str, Any]]) -> List[RS109mConfig]:
+    """Validate many RS109mConfig rows at once. Raises pydantic.ValidationError naming the failing rows."""
+    return CONFIG_LIST_ADAPTER.validate_python(rows)
+
+
+def validate_write_requests(rows: Sequence[Any]) -> List[RS109mWriteConfigRequest]:
+    """Validate many write request rows (e.g. from iter_manifest) at once."""
+    return WRITE_REQUEST_LIST_ADAPTER.validate_python(rows)
+
+
+def iter_validate_write_requests(
+    rows: Iterable[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[RS109mWriteConfigRequest]:
+    """validate_write_requests over a stream of rows, `chunk_size` rows at a time."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield from WRITE_REQUEST_LIST_ADAPTER.validate_python(chunk)
+
+
+def _buffer(image: Image):
+    return image.config if isinstance(image, RS109mRawConfig) else image
+
+
+def _model_values(fields: RS109mFieldValues) -> Dict[str, Any]:
+    values = {name: fields[position] for name, position in _POSITIONS}
+    ship_type = values["ship_type"]
+    values["ship_type"] = _SHIP_TYPES.get(ship_type, ship_type)
+    return values
+
+
+def trusted_config(image: Image) -> RS109mConfig:
+    """An RS109mConfig of an image read from a device, built without validation."""
+    values = _model_values(decode_config(_buffer(image)))
+    return RS109mConfig.model_construct(_fields_set=set(_FIELDS_SET), **values)
+
+
+def trusted_configs(images: Iterable[Image]) -> List[RS109mConfig]:
+    """trusted_config for many images."""
+    return [trusted_config(image) for image in images]
+
+
+class RS109mConfigView:
+    """
+    Read-only view of an image with the attributes of RS109mConfig, each
+    decoded on first access. The image must not change while the view is used.
+    """
+    __slots__ = ("_buffer", "_values")
+
+    def __init__(self, image: Image):
+        self._buffer = _buffer(image)
+        self._values: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        driver_name = _DRIVER_NAMES.get(name)
+        if driver_name is None:
+            raise AttributeError(name)
+        values = self._values
+        if name not in values:
+            value = DECODERS[driver_name](self._buffer)
+            values[name] = _SHIP_TYPES.get(value, value) if name == "ship_type" else value
+        return values[name]
+
+    def model(self) -> RS109mConfig:
+        """The view as an RS109mConfig (built without validation)."""
+        return trusted_config(self._buffer)
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name, _ in _DRIVER_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"RS109mConfigView(mmsi={self.mmsi!r}, name={self.name!r})"
+
+
+def lazy_configs(images: Iterable[Image]) -> List[RS109mConfigView]:
+    """RS109mConfigView of many images, nothing is decoded up front."""
+    return [RS109mConfigView(image) for image in images]
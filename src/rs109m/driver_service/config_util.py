@@ -1,6 +1,46 @@
+from functools import lru_cache
+from operator import attrgetter
+from typing import Tuple
+
 from .models import RS109mConfig
 
-from rs109m.driver import RS109mRawConfig
+from rs109m.driver import RS109mPatch, RS109mRawConfig
+
+
+# RS109mConfig fields -> RS109mRawConfig fields
+_DRIVER_FIELDS = (
+    ("mmsi", "mmsi"),
+    ("name", "name"),
+    ("interval", "interval"),
+    ("ship_type", "shipncargo"),
+    ("callsign", "callsign"),
+    ("vendorid", "vendorid"),
+    ("unitmodel", "unitmodel"),
+    ("sernum", "sernum"),
+    ("refa", "refa"),
+    ("refb", "refb"),
+    ("refc", "refc"),
+    ("refd", "refd"),
+)
+
+_get_fields = attrgetter(*(name for name, _ in _DRIVER_FIELDS))
+
+
+@lru_cache(maxsize=256)
+def _compile_patch(values: Tuple) -> RS109mPatch:
+    return RS109mPatch.compile({
+        driver_name: value
+        for (_, driver_name), value in zip(_DRIVER_FIELDS, values)
+    })
+
+
+def compile_rs109m_config_patch(config: RS109mConfig) -> RS109mPatch:
+    """
+    The set fields of a pydantic RS109mConfig as a driver patch. Patches are
+    cached, so rows sharing a partial config compile it once.
+    """
+    # ShipType is an int enum, so it encodes (and caches) as its value
+    return _compile_patch(_get_fields(config))
 
 
 def apply_rs109m_config_to_driver_config(
@@ -8,45 +48,23 @@ def apply_rs109m_config_to_driver_config(
     driver_config: RS109mRawConfig
 ) -> None:
     """Apply values from pydantic RS109mConfig to one that is understood by the RS109m driver"""
-    if config.mmsi is not None:
-        driver_config.mmsi = config.mmsi
-    if config.name is not None:
-        driver_config.name = config.name
-    if config.interval is not None:
-        driver_config.interval = config.interval
-    if config.ship_type is not None:
-        driver_config.shipncargo = config.ship_type.value
-    if config.callsign is not None:
-        driver_config.callsign = config.callsign
-    if config.vendorid is not None:
-        driver_config.vendorid = config.vendorid
-    if config.unitmodel is not None:
-        driver_config.unitmodel = config.unitmodel
-    if config.sernum is not None:
-        driver_config.sernum = config.sernum
-    if config.refa is not None:
-        driver_config.refa = config.refa
-    if config.refb is not None:
-        driver_config.refb = config.refb
-    if config.refc is not None:
-        driver_config.refc = config.refc
-    if config.refd is not None:
-        driver_config.refd = config.refd
+    compile_rs109m_config_patch(config).apply(driver_config)
     return None
 
 def driver_config_to_rs109m_config(config: RS109mRawConfig) -> RS109mConfig:
     """Convert the RS109m driver read configuration back to pydantic schema version"""
+    fields = config.fields
     return RS109mConfig(
-        mmsi=config.mmsi,
-        name=config.name,
-        interval=config.interval,
-        ship_type=config.shipncargo,
-        callsign=config.callsign,
-        vendorid=config.vendorid,
-        unitmodel=config.unitmodel,
-        sernum=config.sernum,
-        refa=config.refa,
-        refb=config.refb,
-        refc=config.refc,
-        refd=config.refd,
+        mmsi=fields.mmsi,
+        name=fields.name,
+        interval=fields.interval,
+        ship_type=fields.shipncargo,
+        callsign=fields.callsign,
+        vendorid=fields.vendorid,
+        unitmodel=fields.unitmodel,
+        sernum=fields.sernum,
+        refa=fields.refa,
+        refb=fields.refb,
+        refc=fields.refc,
+        refd=fields.refd,
     )
@@ -0,0 +1,236 @@
+import sys
+import json
+import fnmatch
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+from serial.tools import list_ports
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import SerialDeviceIO
+from rs109m.driver.device_io.base import DeviceIO
+
+logger = logging.getLogger(__name__)
+
+# On Linux only USB serial adapters are probed, on other platforms every port is
+LINUX_PORT_PATTERNS = ("/dev/ttyUSB*", "/dev/ttyACM*")
+
+DEFAULT_CACHE_PATH = Path.home() / ".rs109m" / "device_cache.json"
+DEFAULT_PROBE_TIMEOUT = 0.5
+DEFAULT_MAX_WORKERS = 16
+
+
+class RS109mPortInfo(BaseModel):
+    """
+    A serial port which may have an RS-109M attached.
+    """
+    device: str = Field(..., description="Serial port (e.g. /dev/ttyUSB0)")
+    serial_number: Optional[str] = Field(None, description="USB serial number of the adapter")
+    location: Optional[str] = Field(None, description="USB bus location (e.g. 1-1.2)")
+    sysfs_path: Optional[str] = Field(None, description="sysfs path of the USB device")
+    vid: Optional[int] = Field(None, description="USB vendor id")
+    pid: Optional[int] = Field(None, description="USB product id")
+    description: Optional[str] = Field(None, description="Human readable port description")
+
+    @property
+    def key(self) -> str:
+        """
+        Stable identifier of the physical adapter, which survives the device
+        path changing after a replug where possible.
+        """
+        if self.serial_number:
+            return f"usb-serial:{self.serial_number}"
+        if self.sysfs_path:
+            return f"sysfs:{self.sysfs_path}"
+        if self.location:
+            return f"location:{self.location}"
+        return f"device:{self.device}"
+
+
+class RS109mIdentity(BaseModel):
+    """
+    Fields which identify a buoy.
+    """
+    mmsi: int
+    sernum: int
+    vendorid: str
+
+
+class RS109mDiscoveredDevice(BaseModel):
+    """
+    The result of probing a single port.
+    """
+    port: RS109mPortInfo
+    identity: Optional[RS109mIdentity] = Field(None, description="Identity of the buoy, None if none answered")
+    error: Optional[str] = Field(None, description="Why the probe failed")
+
+
+def list_candidate_ports(
+    patterns: Optional[Sequence[str]] = None,
+) -> List[RS109mPortInfo]:
+    """
+    List the serial ports which may have a buoy attached, with their USB metadata.
+    patterns: glob patterns the device path must match, by default
+              LINUX_PORT_PATTERNS on Linux and anything elsewhere.
+    """
+    if patterns is None and sys.platform.startswith("linux"):
+        patterns = LINUX_PORT_PATTERNS
+
+    ports = []
+    for port in list_ports.comports():
+        if patterns and not any(fnmatch.fnmatch(port.device, pattern) for pattern in patterns):
+            continue
+        ports.append(RS109mPortInfo(
+            device=port.device,
+            serial_number=port.serial_number,
+            location=port.location,
+            sysfs_path=getattr(port, "usb_device_path", None),
+            vid=port.vid,
+            pid=port.pid,
+            description=port.description,
+        ))
+    return sorted(ports, key=lambda port: port.device)
+
+
+class RS109mDeviceDiscovery:
+    """
+    Finds buoys by probing serial ports in parallel (handshake plus a short
+    config read), and caches which adapter each buoy was found on. Finding a
+    known buoy after a replug is then a port listing, a cache lookup and a
+    probe of that one port to confirm the buoy is still on it.
+    """
+
+    def __init__(
+        self,
+        *,
+        password: Optional[str] = None,
+        timeout: float = DEFAULT_PROBE_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+        port_lister: Callable[[], List[RS109mPortInfo]] = list_candidate_ports,
+        device_io_factory: Callable[[str], DeviceIO] = SerialDeviceIO,
+    ):
+        """
+        password: password used for the probe handshake.
+        timeout: seconds allowed per probe.
+        max_workers: number of ports probed at once.
+        cache_path: json file the identity cache is persisted to, None to keep it in memory.
+        port_lister: lists the candidate ports.
+        device_io_factory: opens a port by device path.
+        """
+        self.password = password
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.port_lister = port_lister
+        self.device_io_factory = device_io_factory
+        self._lock = threading.Lock()
+        self.cache: Dict[str, RS109mIdentity] = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, RS109mIdentity]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            return {key: RS109mIdentity.model_validate(value) for key, value in data.items()}
+        except Exception:
+            logger.warning(f"Ignoring unreadable device cache {self.cache_path}")
+            return {}
+
+    def _save_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {key: identity.model_dump() for key, identity in self.cache.items()}
+        self.cache_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def probe(self, port: RS109mPortInfo) -> RS109mDiscoveredDevice:
+        """Probe a single port for a buoy."""
+        try:
+            device_io = self.device_io_factory(port.device)
+        except Exception as e:
+            return RS109mDiscoveredDevice(port=port, error=str(e))
+
+        try:
+            config = RS109mDriver(device_io).read_config(password=self.password, timeout=self.timeout)
+            identity = RS109mIdentity(mmsi=config.mmsi, sernum=config.sernum, vendorid=config.vendorid)
+        except Exception as e:
+            return RS109mDiscoveredDevice(port=port, error=str(e))
+        finally:
+            device_io.close()
+
+        return RS109mDiscoveredDevice(port=port, identity=identity)
+
+    def scan(
+        self,
+        ports: Optional[List[RS109mPortInfo]] = None,
+    ) -> List[RS109mDiscoveredDevice]:
+        """Probe every candidate port in parallel and update the cache."""
+        if ports is None:
+            ports = self.port_lister()
+        if not ports:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ports))) as executor:
+            found = list(executor.map(self.probe, ports))
+
+        self._update_cache(found)
+        return found
+
+    def _update_cache(self, results: List[RS109mDiscoveredDevice]) -> None:
+        """Record what was found on the probed ports, forgetting ports without a buoy."""
+        with self._lock:
+            for result in results:
+                if result.identity is not None:
+                    self.cache[result.port.key] = result.identity
+                else:
+                    self.cache.pop(result.port.key, None)
+            self._save_cache()
+
+    def find(
+        self,
+        *,
+        mmsi: Optional[int] = None,
+        sernum: Optional[int] = None,
+        rescan: bool = True,
+    ) -> Optional[str]:
+        """
+        Return the device path of the buoy with the given MMSI and/or serial number.
+        The cache is consulted first: a port it points to is probed to confirm
+        the buoy is still there (it may have been swapped since), and the
+        other ports are only probed if it is not (and rescan is set).
+        """
+        if mmsi is None and sernum is None:
+            raise ValueError("Must specify mmsi or sernum")
+
+        def matches(identity: Optional[RS109mIdentity]) -> bool:
+            return identity is not None and \
+                (mmsi is None or identity.mmsi == mmsi) and (sernum is None or identity.sernum == sernum)
+
+        ports = self.port_lister()
+        with self._lock:
+            cached = [port for port in ports if matches(self.cache.get(port.key))]
+
+        checked = []
+        for port in cached:
+            result = self.probe(port)
+            checked.append(result)
+            if matches(result.identity):
+                self._update_cache(checked)
+                return port.device
+            logger.info(f"Cached buoy is no longer on {port.device}")
+        if checked:
+            self._update_cache(checked)
+
+        if not rescan:
+            return None
+
+        checked_devices = {port.device for port in cached}
+        for result in self.scan([port for port in ports if port.device not in checked_devices]):
+            if matches(result.identity):
+                return result.port.device
+        return None
@@ -1,5 +1,6 @@
+from enum import Enum
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Dict, Optional
 
 from .ship_type import ShipType
 
@@ -51,8 +52,8 @@ class RS109mConfig(BaseModel):
 
 
 class DeviceConnectionMixIn(BaseModel):
-    device: str = Field(..., description="Serial port (e.g. /dev/ttyUSB0)"),
-    mock: bool = Field(False, description="Use the mock device IO instead of a real device"),
+    device: str = Field(..., description="Serial port (e.g. /dev/ttyUSB0, socket://host:port or rfc2217://host:port)")
+    mock: bool = Field(False, description="Use the mock device IO instead of a real device")
     password: Optional[str] = Field(None, pattern=r"^[0-9]{0,6}$", description="Password (0 to 6 digits)")
     extended: bool = Field(False, description="Operate on extended config size")
 
@@ -60,13 +61,35 @@ class DeviceConnectionMixIn(BaseModel):
 class RS109mReadConfigRequest(DeviceConnectionMixIn):
     """
     A request object for reading the configuration.
-    (Add fields if needed; otherwise, leave empty.)
     """
-    # No additional fields needed for now.
-    ...
+    fresh: bool = Field(False, description="Read from the device even if the service has a cached configuration")
+
+
+class RS109mReadConfigResult(BaseModel):
+    """
+    A configuration read from a device, or from the service's read cache.
+    """
+    config: RS109mConfig = Field(..., description="Configuration of the device")
+    cached: bool = Field(False, description="Whether the configuration came from the read cache")
+    age: float = Field(0.0, description="Seconds since the configuration was read from the device")
 
 class RS109mWriteConfigRequest(DeviceConnectionMixIn):
     """
     A request object for writing a new configuration.
     """
     config: RS109mConfig
+
+
+class RS109mWriteStatus(str, Enum):
+    WRITTEN = "written"  # the configuration was written and read back
+    UNCHANGED = "unchanged"  # the device already had the configuration, nothing was written
+
+
+class RS109mWriteConfigResult(BaseModel):
+    """
+    The outcome of writing a configuration to a device.
+    """
+    config: RS109mConfig = Field(..., description="Configuration read back from the device after writing")
+    status: RS109mWriteStatus = Field(RS109mWriteStatus.WRITTEN, description="Whether anything had to be written")
+    verified: bool = Field(..., description="Whether the read back configuration matches what was written")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent per phase")
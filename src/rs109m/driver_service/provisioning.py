@@ -0,0 +1,248 @@
+import csv
+import json
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field
+
+from rs109m.fleet.conflicts import (
+    EntrySource,
+    FleetConflict,
+    FleetConflictError,
+    RS109mConflictChecker,
+    manifest_entries,
+)
+
+from .models import RS109mConfig, RS109mWriteConfigRequest, RS109mWriteStatus
+from .service import RS109mConfigurationService
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_FIELDS = ("device", "mock", "password", "extended")
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 4
+
+ManifestRow = Union[RS109mWriteConfigRequest, Dict[str, Any]]
+
+
+class RS109mProvisioningResult(BaseModel):
+    """
+    The outcome of provisioning a single manifest row.
+    """
+    index: int = Field(..., description="Position of the row in the manifest")
+    device: Optional[str] = Field(None, description="Serial port the row was written to")
+    success: bool = Field(..., description="Whether the configuration was written")
+    status: Optional[RS109mWriteStatus] = Field(None, description="Whether anything had to be written, None on failure")
+    config: Optional[RS109mConfig] = Field(None, description="Configuration read back from the device")
+    verified: bool = Field(False, description="Whether the read back configuration matches what was written")
+    error: Optional[str] = Field(None, description="Error message if the row failed")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent per phase")
+
+
+def _manifest_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a flat manifest row (connection and config fields side by side) as a write request."""
+    if "config" in row:
+        shaped = dict(row)
+    else:
+        shaped = {key: row[key] for key in CONNECTION_FIELDS if key in row}
+        shaped["config"] = {key: value for key, value in row.items() if key not in CONNECTION_FIELDS}
+    shaped.setdefault("mock", False)
+    shaped.setdefault("extended", False)
+    return shaped
+
+
+def iter_manifest(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of a provisioning manifest, one at a time.
+
+    - .csv: a header row of device/password/mock/extended and RS109mConfig field
+      names, empty cells leave the field unchanged on the device.
+    - .jsonl/.ndjson: one object per line, either flat like the csv or shaped
+      like RS109mWriteConfigRequest (with a nested "config").
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    with path.open(newline="", encoding="utf-8") as fh:
+        if suffix == ".csv":
+            for row in csv.DictReader(fh):
+                yield _manifest_row({
+                    key.strip(): value.strip()
+                    for key, value in row.items()
+                    if key and value is not None and value.strip() != ""
+                })
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in fh:
+                if line.strip():
+                    yield _manifest_row(json.loads(line))
+        else:
+            raise ValueError(f"Unsupported manifest format: {path.suffix!r} (expected .csv or .jsonl)")
+
+
+class RS109mProvisioningEngine:
+    """
+    Writes configurations to many devices concurrently.
+
+    Rows are streamed into one bounded queue per worker. Every device is
+    pinned to a single worker, so each serial port is only ever driven by one
+    thread and rows for the same port are written in manifest order. Memory
+    stays bounded by max_workers * queue_size rows regardless of manifest size.
+    """
+
+    def __init__(
+        self,
+        service: Optional[RS109mConfigurationService] = None,
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        conflict_checker: Optional[RS109mConflictChecker] = None,
+        known_units: Sequence[EntrySource] = (),
+    ):
+        """
+        service: the configuration service to write through (pooled sessions are reused).
+        max_workers: number of worker threads, ideally the number of serial ports.
+        queue_size: rows buffered per worker.
+        conflict_checker: the checker used by the preflight check.
+        known_units: entry sources of units already deployed (e.g. lambda: store_entries(store))
+                     which the preflight check also compares the rows against.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self.service = service or RS109mConfigurationService()
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.conflict_checker = conflict_checker or RS109mConflictChecker()
+        self.known_units = tuple(known_units)
+
+    def check_conflicts(
+        self,
+        rows: Callable[[], Iterable[ManifestRow]],
+        source: str = "manifest",
+    ) -> List[FleetConflict]:
+        """
+        Duplicate MMSIs, serial numbers and callsigns among the rows and the known units.
+        rows: returns a fresh iterable of the rows, it may be called twice.
+        """
+        return self.conflict_checker.check(lambda: manifest_entries(rows(), source), *self.known_units)
+
+    def _preflight(self, rows: Callable[[], Iterable[ManifestRow]], source: str) -> None:
+        conflicts = self.check_conflicts(rows, source)
+        if conflicts:
+            logger.error(f"Preflight check of {source} found {len(conflicts)} conflict(s)")
+            raise FleetConflictError(conflicts)
+
+    def run_manifest(self, path: Union[str, Path], *, preflight: bool = False) -> Iterator[RS109mProvisioningResult]:
+        """
+        Provision every row of a manifest file, see iter_manifest.
+        preflight: check the manifest for conflicts first (reading it an extra
+                   time or two), raising FleetConflictError before anything is written.
+        """
+        if preflight:
+            self._preflight(lambda: iter_manifest(path), str(path))
+        return self._run(iter_manifest(path))
+
+    def run(self, rows: Iterable[ManifestRow], *, preflight: bool = False) -> Iterator[RS109mProvisioningResult]:
+        """
+        Provision every row, yielding results as they complete.
+        Rows may be write requests or dicts shaped like one.
+        preflight: check the rows for conflicts first, raising FleetConflictError
+                   before anything is written. Needs a sequence of rows.
+        """
+        if preflight:
+            if not isinstance(rows, Sequence):
+                raise ValueError("A preflight check needs a sequence of rows, use run_manifest for files")
+            self._preflight(lambda: rows, "rows")
+        return self._run(rows)
+
+    def _run(self, rows: Iterable[ManifestRow]) -> Iterator[RS109mProvisioningResult]:
+        stop = threading.Event()
+        lanes: List[queue.Queue] = [queue.Queue(self.queue_size) for _ in range(self.max_workers)]
+        results: queue.Queue = queue.Queue(self.max_workers * self.queue_size)
+        done = object()
+
+        def put(target: queue.Queue, item) -> bool:
+            # Blocking put which gives up once the run is stopped.
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def feed() -> None:
+            device_lanes: Dict[Optional[str], int] = {}
+            try:
+                for index, row in enumerate(rows):
+                    if stop.is_set():
+                        break
+                    device = row.device if isinstance(row, RS109mWriteConfigRequest) else row.get("device")
+                    if device not in device_lanes:
+                        device_lanes[device] = len(device_lanes) % self.max_workers
+                    if not put(lanes[device_lanes[device]], (index, row)):
+                        break
+            except Exception as e:
+                logger.exception("Failed to read provisioning rows")
+                put(results, RS109mProvisioningResult(index=-1, success=False, error=str(e)))
+            finally:
+                for lane in lanes:
+                    put(lane, done)
+
+        def work(lane: queue.Queue) -> None:
+            try:
+                while not stop.is_set():
+                    try:
+                        item = lane.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is done:
+                        break
+                    if not put(results, self._provision(*item)):
+                        break
+            finally:
+                put(results, done)
+
+        threads = [threading.Thread(target=feed, name="rs109m-provision-feed", daemon=True)]
+        threads += [
+            threading.Thread(target=work, args=(lane,), name=f"rs109m-provision-{i}", daemon=True)
+            for i, lane in enumerate(lanes)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            remaining = len(lanes)
+            while remaining:
+                result = results.get()
+                if result is done:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            # Also reached when the caller stops iterating early.
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _provision(self, index: int, row: ManifestRow) -> RS109mProvisioningResult:
+        device = row.device if isinstance(row, RS109mWriteConfigRequest) else row.get("device")
+        try:
+            request = row if isinstance(row, RS109mWriteConfigRequest) else RS109mWriteConfigRequest.model_validate(row)
+            result = self.service.write_config_with_result(request)
+        except Exception as e:
+            logger.error(f"Provisioning row {index} on {device!r} failed: {e}")
+            return RS109mProvisioningResult(index=index, device=device, success=False, error=str(e))
+
+        return RS109mProvisioningResult(
+            index=index,
+            device=device,
+            success=True,
+            status=result.status,
+            config=result.config,
+            verified=result.verified,
+            timings=result.timings,
+        )
@@ -0,0 +1,128 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+from .models import RS109mConfig
+
+logger = logging.getLogger(__name__)
+
+# device, mock, extended, password
+ReadCacheKey = Tuple[str, bool, bool, Optional[str]]
+# mmsi, sernum
+BuoyIdentity = Tuple[Optional[int], Optional[int]]
+
+DEFAULT_TTL = 5.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+class RS109mCachedRead(NamedTuple):
+    config: RS109mConfig
+    read_at: float  # clock time of the read
+
+
+class RS109mReadCache:
+    """
+    Recently read configurations, per device.
+
+    Entries are keyed by the device and the read parameters (including the
+    password, so a cached read never skips authentication the device would
+    do) and expire `ttl` seconds after the read. At most `max_entries` are
+    kept, the least recently used are evicted first. The identity of the
+    buoy an entry was read from (MMSI, sernum) is tracked, so every entry of
+    a buoy can be dropped at once, whichever port it was read through.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        ttl: seconds an entry stays valid.
+        max_entries: bound on the number of entries.
+        clock: time source, time.monotonic by default.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[ReadCacheKey, RS109mCachedRead]" = OrderedDict()
+        self._identities: Dict[BuoyIdentity, Set[ReadCacheKey]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(device: Optional[str], mock: bool, extended: bool, password: Optional[str]) -> ReadCacheKey:
+        return (device or "", bool(mock), bool(extended), password)
+
+    @staticmethod
+    def _identity(config: RS109mConfig) -> BuoyIdentity:
+        return (config.mmsi, config.sernum)
+
+    def _drop(self, key: ReadCacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            identity = self._identity(entry.config)
+            keys = self._identities.get(identity)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._identities[identity]
+
+    def get(self, key: ReadCacheKey, max_age: Optional[float] = None) -> Optional[RS109mCachedRead]:
+        """
+        The entry for a key, None if there is none, it expired or it is older
+        than max_age seconds.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = self.clock() - entry.read_at
+            if age > self.ttl:
+                self._drop(key)
+                return None
+            if max_age is not None and age > max_age:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: ReadCacheKey, config: RS109mConfig) -> RS109mCachedRead:
+        """Store a configuration just read from the device."""
+        entry = RS109mCachedRead(config, self.clock())
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = entry
+            self._identities.setdefault(self._identity(config), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, device: Optional[str], mock: Optional[bool] = None) -> int:
+        """Drop every entry of a device (of both mock and real devices if mock is None). Returns the number dropped."""
+        device = device or ""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == device and (mock is None or key[1] == bool(mock))]
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def invalidate_buoy(self, mmsi: Optional[int], sernum: Optional[int]) -> int:
+        """Drop every entry read from a buoy, whichever port it was read through. Returns the number dropped."""
+        with self._lock:
+            keys = list(self._identities.get((mmsi, sernum), ()))
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._identities.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
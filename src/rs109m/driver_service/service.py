@@ -1,49 +1,134 @@
 import logging
 from typing import Optional
 
-from rs109m.driver import RS109mDriver
+from rs109m.driver import RS109mRawConfig, diff_configs
 from rs109m.driver.constants import DEFAULT_PASSWORD
-from rs109m.driver.device_io import SerialDeviceIO, MockDeviceIO
-
-from .models import RS109mConfig, RS109mReadConfigRequest, RS109mWriteConfigRequest
+from rs109m.driver.device_io import SerialDeviceIO, MockDeviceIO, NetworkDeviceIO, is_network_url
+from rs109m.driver.device_io.base import DeviceIO
+
+from .models import (
+    RS109mConfig,
+    RS109mReadConfigRequest,
+    RS109mReadConfigResult,
+    RS109mWriteConfigRequest,
+    RS109mWriteConfigResult,
+    RS109mWriteStatus,
+)
 from .config_util import apply_rs109m_config_to_driver_config, driver_config_to_rs109m_config
+from .read_cache import RS109mReadCache
+from .session_pool import RS109mSessionPool
 
 logger = logging.getLogger(__name__)
 
 
 class RS109mConfigurationService:
-    def _get_driver(
+    def __init__(
+        self,
+        session_pool: Optional[RS109mSessionPool] = None,
+        *,
+        read_cache: Optional[RS109mReadCache] = None,
+        keep_mock_state: bool = False,
+    ):
+        """
+        session_pool: pool of open device sessions. By default a pool is created
+                      which opens devices with _get_device_io.
+        read_cache: cache of recently read configurations, reads always go to
+                    the device if None.
+        keep_mock_state: keep the mock device of each path between calls (so a
+                         written config is read back by the next call), for the
+                         default pool. By default every call gets a fresh mock.
+        """
+        self.session_pool = session_pool if session_pool is not None else RS109mSessionPool(
+            self._get_device_io,
+            keep_mock_sessions=keep_mock_state,
+        )
+        self.read_cache = read_cache
+
+    def _get_device_io(
         self,
         device: Optional[str],
         mock: bool
-    ) -> RS109mDriver:
-        """Get the driver for communicating with the rs109m device"""
+    ) -> DeviceIO:
+        """Open the device io for communicating with the rs109m device"""
         if not mock and not device:
             raise ValueError("Must specify device if not using mock")
-        device_io = MockDeviceIO() if mock else SerialDeviceIO(device)
-        return RS109mDriver(device_io)
+        if mock:
+            return MockDeviceIO()
+        if is_network_url(device):
+            return NetworkDeviceIO(device)
+        return SerialDeviceIO(device)
+
+    def _get_driver(
+        self,
+        device: Optional[str],
+        mock: bool
+    ):
+        """Get the pooled driver for communicating with the rs109m device"""
+        return self.session_pool.session(device, mock)
+
+    def close(self) -> None:
+        """Close every open device session."""
+        self.session_pool.close_all()
+
+    def __enter__(self) -> "RS109mConfigurationService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def read_config(
         self,
         request: RS109mReadConfigRequest,
     ) -> RS109mConfig:
         """
-        Read the configuration from the device.
+        Read the configuration from the device (or the read cache, see read_config_with_result).
         """
-        driver = self._get_driver(request.device, request.mock)
+        return self.read_config_with_result(request).config
 
-        # Re-read the configuration to confirm the new configuration has been applied
-        config = driver.read_config(
-            password=request.password,
-            extended=request.extended,
-        )
+    def read_config_with_result(
+        self,
+        request: RS109mReadConfigRequest,
+        *,
+        max_age: Optional[float] = None,
+    ) -> RS109mReadConfigResult:
+        """
+        Read the configuration, from the read cache if there is one holding a
+        recent enough read and request.fresh is not set.
+        max_age: oldest cached read (seconds) to accept, the cache ttl if None.
+        Returns:
+            The configuration, tagged as cached or fresh
+        """
+        cache = self.read_cache
+        key = RS109mReadCache.key(request.device, request.mock, request.extended, request.password)
+        if cache is not None and not request.fresh:
+            entry = cache.get(key, max_age)
+            if entry is not None:
+                age = cache.clock() - entry.read_at
+                logger.debug(f"Configuration of {request.device!r} from the read cache ({age:.1f}s old)")
+                return RS109mReadConfigResult(config=entry.config.model_copy(), cached=True, age=age)
+
+        try:
+            with self._get_driver(request.device, request.mock) as driver:
+                # Re-read the configuration to confirm the new configuration has been applied
+                config = driver.read_config(
+                    password=request.password,
+                    extended=request.extended,
+                )
+        except Exception:
+            # the buoy may have been unplugged or swapped
+            if cache is not None:
+                cache.invalidate(request.device, request.mock)
+            raise
 
         # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
         logger.info(
             f"Read configuration:\n{config.get_config_str(request.extended)}"
         )
 
-        return driver_config_to_rs109m_config(config)
+        result = driver_config_to_rs109m_config(config)
+        if cache is not None:
+            cache.put(key, result.model_copy())
+        return RS109mReadConfigResult(config=result, cached=False)
 
     def write_config(
         self,
@@ -54,45 +139,70 @@ class RS109mConfigurationService:
         Returns:
             Latest configuration read from the device
         """
-        driver = self._get_driver(request.device, request.mock)
-
-        # read the current configuration from the device into config
-        config = driver.read_config(
-            password=request.password,
-            extended=request.extended,
-        )
+        return self.write_config_with_result(request).config
 
-        # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
-        logger.info(
-            f"Old configuration:\n{config.get_config_str(request.extended)}"
-        )
-
-        # apply request config values to the existing driver configuration
-        apply_rs109m_config_to_driver_config(
-            request.config, config,
-        )
-
-        # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
-        logger.info(
-            f"Desired configuration:\n{config.get_config_str(request.extended)}"
-        )
-
-        # Write the configuration back to the device if requested.
-        driver.write_config(
-            config,
-            password=request.password,
-            extended=request.extended,
-        )
-
-        # Re-read the configuration to confirm the new configuration has been applied
-        updated_config = driver.read_config(
-            password=request.password,
-            extended=request.extended,
-        )
-
-        # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
-        logger.info(
-            f"Written configuration:\n{updated_config.get_config_str(request.extended)}"
+    def write_config_with_result(
+        self,
+        request: RS109mWriteConfigRequest,
+    ) -> RS109mWriteConfigResult:
+        """
+        Write the configuration to the device.
+        Returns:
+            Latest configuration read from the device, whether it matches
+            what was written and the time spent per phase
+        """
+        def patch(config: RS109mRawConfig) -> None:
+            # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
+            logger.info(
+                f"Old configuration:\n{config.get_config_str(request.extended)}"
+            )
+
+            original = config.copy()
+
+            # apply request config values to the existing driver configuration
+            apply_rs109m_config_to_driver_config(
+                request.config, config,
+            )
+
+            # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
+            logger.info(
+                f"Desired configuration:\n{config.get_config_str(request.extended)}"
+            )
+            logger.info(f"Changes:\n{diff_configs(original, config) or '  none'}")
+
+        # read, patch, write and re-read the configuration under a single handshake,
+        # the write and re-read are skipped if the device already has the configuration
+        try:
+            with self._get_driver(request.device, request.mock) as driver:
+                result = driver.read_modify_write(
+                    patch,
+                    password=request.password,
+                    extended=request.extended,
+                )
+        finally:
+            # whatever happened, earlier reads of the device are stale
+            if self.read_cache is not None:
+                self.read_cache.invalidate(request.device, request.mock)
+
+        updated_config = result.verified_config
+
+        if result.changed:
+            # Print the current configuration (the hexadecimal dump is built inside DeviceConfigIO)
+            logger.info(
+                f"Written configuration:\n{updated_config.get_config_str(request.extended)}"
+            )
+        logger.debug(f"Write timings (s): {result.timings}")
+
+        config = driver_config_to_rs109m_config(updated_config)
+        if self.read_cache is not None and result.verified:
+            # refresh the cache from the verified read back
+            self.read_cache.invalidate_buoy(config.mmsi, config.sernum)
+            key = RS109mReadCache.key(request.device, request.mock, request.extended, request.password)
+            self.read_cache.put(key, config.model_copy())
+
+        return RS109mWriteConfigResult(
+            config=config,
+            status=RS109mWriteStatus.WRITTEN if result.changed else RS109mWriteStatus.UNCHANGED,
+            verified=result.verified,
+            timings=result.timings,
         )
-
-        return driver_config_to_rs109m_config(updated_config)
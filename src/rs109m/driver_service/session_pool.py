@@ -0,0 +1,189 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io.base import DeviceIO
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, bool]
+
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+
+class RS109mSession:
+    """
+    An open connection to a single device, shared between operations.
+    The session lock serialises access, as the device can only take part
+    in one handshake at a time.
+    """
+
+    def __init__(self, key: SessionKey):
+        self.key = key
+        self.lock = threading.Lock()
+        self.driver: Optional[RS109mDriver] = None
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+    @property
+    def device_io(self) -> Optional[DeviceIO]:
+        return self.driver.device_io if self.driver is not None else None
+
+    def is_healthy(self) -> bool:
+        device_io = self.device_io
+        if device_io is None:
+            return False
+        try:
+            return device_io.is_open()
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        device_io = self.device_io
+        self.driver = None
+        if device_io is None:
+            return
+        try:
+            device_io.close()
+        except Exception:
+            logger.exception(f"Failed to close session for {self.key[0]!r}")
+
+
+class RS109mSessionPool:
+    """
+    Keeps one open RS109mDriver per device path, so repeated operations on the
+    same buoy reuse the port instead of paying the open/drain cost every time.
+
+    - Sessions idle for longer than `idle_timeout` seconds are closed on the
+      next acquire (or explicitly via evict_idle()).
+    - Sessions are health checked before reuse and reopened if the port was closed.
+    - A session whose operation raises is discarded, as the port state is unknown.
+    - With `pipeline`, drivers pipeline their reads (see RS109mDriver). Whether a
+      device supports it is remembered per device, across reopened sessions.
+    - Mock sessions are closed after each use unless `keep_mock_sessions`, so
+      every operation gets a fresh mock device. Keeping them makes the mock
+      state (e.g. a written config) persist between operations.
+    """
+
+    def __init__(
+        self,
+        device_io_factory: Callable[[Optional[str], bool], DeviceIO],
+        *,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        pipeline: bool = False,
+        keep_mock_sessions: bool = False,
+    ):
+        """
+        device_io_factory: called with (device, mock) to open a new DeviceIO.
+        idle_timeout: seconds after which unused sessions are closed, None to keep them forever.
+        pipeline: enable pipelined reads on the pooled drivers.
+        keep_mock_sessions: pool mock sessions too, so the mock device keeps its state between operations.
+        """
+        self.device_io_factory = device_io_factory
+        self.idle_timeout = idle_timeout
+        self.pipeline = pipeline
+        self.keep_mock_sessions = keep_mock_sessions
+        self.pipeline_support: Dict[SessionKey, bool] = {}
+        self._sessions: Dict[SessionKey, RS109mSession] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(device: Optional[str], mock: bool) -> SessionKey:
+        return (device or "", bool(mock))
+
+    @contextmanager
+    def session(
+        self,
+        device: Optional[str],
+        mock: bool,
+    ) -> Iterator[RS109mDriver]:
+        """Context manager yielding the pooled driver for the given device."""
+        key = self._key(device, mock)
+        self.evict_idle()
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = RS109mSession(key)
+                self._sessions[key] = session
+            session.in_use += 1
+
+        try:
+            with session.lock:
+                if session.driver is not None and not session.is_healthy():
+                    logger.info(f"Session for {key[0]!r} failed health check, reopening")
+                    session.close()
+                if session.driver is None:
+                    session.driver = RS109mDriver(
+                        self.device_io_factory(device, mock),
+                        pipeline=self.pipeline,
+                        pipeline_supported=self.pipeline_support.get(key),
+                    )
+
+                driver = session.driver
+                try:
+                    yield driver
+                except Exception:
+                    session.close()
+                    raise
+                finally:
+                    session.last_used = time.monotonic()
+                    if driver.pipeline_supported is not None:
+                        self.pipeline_support[key] = driver.pipeline_supported
+                    if mock and not self.keep_mock_sessions:
+                        session.close()
+        finally:
+            with self._lock:
+                session.in_use -= 1
+                if session.driver is None and session.in_use == 0 and self._sessions.get(key) is session:
+                    del self._sessions[key]
+
+    def evict_idle(self) -> int:
+        """Close sessions which have been idle for longer than idle_timeout. Returns the number closed."""
+        if self.idle_timeout is None:
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                session for session in self._sessions.values()
+                if session.in_use == 0 and now - session.last_used > self.idle_timeout
+            ]
+            for session in expired:
+                del self._sessions[session.key]
+
+        for session in expired:
+            logger.debug(f"Closing idle session for {session.key[0]!r}")
+            session.close()
+        return len(expired)
+
+    def close(
+        self,
+        device: Optional[str],
+        mock: bool = False,
+    ) -> None:
+        """Close the session for a single device, if one is open."""
+        key = self._key(device, mock)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            with session.lock:
+                session.close()
+
+    def close_all(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            with session.lock:
+                session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, device: object) -> bool:
+        return any(key[0] == device for key in self._sessions)
@@ -0,0 +1,17 @@
+from .store import RS109mFleetStore, FleetStoreError, parse_hex_dump
+from .conflicts import (
+    RS109mConflictChecker,
+    FleetConflict,
+    FleetConflictError,
+    FleetEntry,
+    manifest_entries,
+    image_entries,
+    store_entries,
+)
+from .allocator import (
+    RS109mIdAllocator,
+    RS109mIdReservation,
+    AllocatorError,
+    sernum_allocator,
+    mmsi_allocator,
+)
@@ -0,0 +1,315 @@
+"""
+Persistent allocation of unit serial numbers and MMSIs.
+
+An RS109mIdAllocator is a bitmap of one or more id ranges (the 20-bit
+sernum space, or the MMSI blocks we are licensed for) kept in a memory
+mapped file, one bit per id. Every operation holds an exclusive lock on
+the file, so any number of provisioning processes (and threads) can
+reserve ids from the same file at once without a central server, and a
+bulk reservation either gets all its ids or none.
+
+    allocator = sernum_allocator("sernums.alloc")
+    with allocator.reservation(50) as reservation:
+        for sernum, ok in zip(reservation.ids, provision(reservation.ids)):
+            if not ok:
+                reservation.release([sernum])
+    # on an exception every id still held by the reservation is released
+
+File layout: header, the ranges as (start, stop) pairs, then the bitmap.
+Each range starts on a byte boundary, its padding bits are always set.
+"""
+import mmap
+import os
+import re
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SERNUM_RANGE = (0, 1 << 20)
+
+ALLOCATOR_MAGIC = b"RS9ALLOC"
+VERSION = 1
+
+# magic, version, number of ranges, bitmap bytes
+ALLOCATOR_HEADER = struct.Struct("<8sHHI")
+RANGE_ENTRY = struct.Struct("<QQ")  # start, stop (exclusive)
+
+_NOT_FULL = re.compile(rb"[^\xff]")
+# byte -> positions of its clear bits
+_FREE_BITS = tuple(tuple(bit for bit in range(8) if not byte & (1 << bit)) for byte in range(256))
+
+
+class AllocatorError(Exception):
+    pass
+
+
+@contextmanager
+def _file_lock(fh) -> Iterator[None]:
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    else:
+        os.lseek(fh.fileno(), 0, os.SEEK_SET)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            os.lseek(fh.fileno(), 0, os.SEEK_SET)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RS109mIdAllocator:
+    """
+    Reserves and releases ids of a set of ranges, persisted in a memory
+    mapped bitmap shared between processes.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ranges: Optional[Sequence[Tuple[int, int]]] = None,
+    ):
+        """
+        path: the bitmap file, created if missing.
+        ranges: the (start, stop) id ranges, stop exclusive. Required to create
+                the file, if given for an existing file they must match it.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.fh = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666), "r+b")
+        try:
+            with _file_lock(self.fh):
+                if os.fstat(self.fh.fileno()).st_size == 0:
+                    if not ranges:
+                        raise AllocatorError(f"{self.path} does not exist, ranges are needed to create it")
+                    self._create(ranges)
+                self._open(ranges)
+        except Exception:
+            self.fh.close()
+            raise
+
+    def _layout(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        self.ranges: Tuple[Tuple[int, int], ...] = tuple((int(start), int(stop)) for start, stop in ranges)
+        # bit offset of every range in the bitmap, byte aligned
+        self.offsets: List[int] = []
+        bits = 0
+        for start, stop in self.ranges:
+            if stop <= start:
+                raise AllocatorError(f"Empty id range {start}..{stop}")
+            self.offsets.append(bits)
+            bits += (stop - start + 7) // 8 * 8
+        self.bitmap_offset = ALLOCATOR_HEADER.size + RANGE_ENTRY.size * len(self.ranges)
+        self.bitmap_bytes = bits // 8
+
+    def _create(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        ordered = sorted(ranges)
+        for (_, stop), (start, _) in zip(ordered, ordered[1:]):
+            if start < stop:
+                raise AllocatorError("Id ranges overlap")
+        self._layout(ranges)
+        header = ALLOCATOR_HEADER.pack(ALLOCATOR_MAGIC, VERSION, len(self.ranges), self.bitmap_bytes)
+        header += b"".join(RANGE_ENTRY.pack(start, stop) for start, stop in self.ranges)
+        bitmap = bytearray(self.bitmap_bytes)
+        for (start, stop), offset in zip(self.ranges, self.offsets):
+            # padding bits up to the next byte are never free
+            for bit in range(offset + stop - start, (offset + stop - start + 7) // 8 * 8):
+                bitmap[bit >> 3] |= 1 << (bit & 7)
+        self.fh.write(header + bitmap)
+        self.fh.flush()
+
+    def _open(self, ranges: Optional[Sequence[Tuple[int, int]]]) -> None:
+        self.mm = mmap.mmap(self.fh.fileno(), 0)
+        magic, version, count, bitmap_bytes = ALLOCATOR_HEADER.unpack_from(self.mm, 0)
+        if magic != ALLOCATOR_MAGIC or version != VERSION:
+            raise AllocatorError(f"{self.path} is not an id allocator")
+        stored = [RANGE_ENTRY.unpack_from(self.mm, ALLOCATOR_HEADER.size + RANGE_ENTRY.size * i) for i in range(count)]
+        if ranges is not None and [tuple(r) for r in ranges] != stored:
+            raise AllocatorError(f"{self.path} holds the ranges {stored}, not {list(ranges)}")
+        self._layout(stored)
+        if bitmap_bytes != self.bitmap_bytes or len(self.mm) < self.bitmap_offset + bitmap_bytes:
+            raise AllocatorError(f"{self.path} is truncated")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock, _file_lock(self.fh):
+            yield
+
+    def _bit(self, id_: int) -> int:
+        for (start, stop), offset in zip(self.ranges, self.offsets):
+            if start <= id_ < stop:
+                return offset + id_ - start
+        raise ValueError(f"{id_} is outside the ranges of {self.path}")
+
+    def _id(self, bit: int) -> int:
+        for (start, stop), offset in zip(self.ranges, self.offsets):
+            if offset <= bit < offset + stop - start:
+                return start + bit - offset
+        raise AllocatorError(f"Bit {bit} of {self.path} is not in a range")
+
+    def _set(self, bits: Iterable[int], value: bool) -> None:
+        mm, base = self.mm, self.bitmap_offset
+        for bit in bits:
+            if value:
+                mm[base + (bit >> 3)] |= 1 << (bit & 7)
+            else:
+                mm[base + (bit >> 3)] &= ~(1 << (bit & 7)) & 0xff
+
+    def _is_set(self, bit: int) -> bool:
+        return bool(self.mm[self.bitmap_offset + (bit >> 3)] & (1 << (bit & 7)))
+
+    def _find_free(self, count: int) -> List[int]:
+        bits: List[int] = []
+        end = self.bitmap_offset + self.bitmap_bytes
+        for match in _NOT_FULL.finditer(self.mm, self.bitmap_offset, end):
+            byte = match.start() - self.bitmap_offset
+            bits += [(byte << 3) + bit for bit in _FREE_BITS[match.group()[0]]]
+            if len(bits) >= count:
+                return bits[:count]
+        return bits
+
+    def _find_run(self, count: int) -> Optional[int]:
+        for (start, stop), offset in zip(self.ranges, self.offsets):
+            size = stop - start
+            if size < count:
+                continue
+            first = self.bitmap_offset + offset // 8
+            used = int.from_bytes(self.mm[first:first + (size + 7) // 8], "little")
+            free = ~used & ((1 << size) - 1)
+            # bit i of free stays set iff bits i .. i + count - 1 are all free
+            run = 1
+            while run < count and free:
+                step = min(run, count - run)
+                free &= free >> step
+                run += step
+            if free:
+                return offset + (free & -free).bit_length() - 1
+        return None
+
+    def reserve(self, count: int, *, contiguous: bool = False) -> List[int]:
+        """
+        Atomically reserve `count` free ids, the lowest available ones.
+        contiguous: the ids must be consecutive (and within one range).
+        Raises AllocatorError, reserving nothing, if there are not enough.
+        """
+        if count < 1:
+            return []
+        with self._locked():
+            if contiguous:
+                first = self._find_run(count)
+                if first is None:
+                    raise AllocatorError(f"No {count} contiguous free ids in {self.path}")
+                bits = list(range(first, first + count))
+            else:
+                bits = self._find_free(count)
+                if len(bits) < count:
+                    raise AllocatorError(f"Only {len(bits)} of {count} ids free in {self.path}")
+            self._set(bits, True)
+            self.mm.flush()
+        ids = [self._id(bit) for bit in bits]
+        logger.debug(f"Reserved {count} ids from {self.path}: {ids[0]}..{ids[-1]}")
+        return ids
+
+    def reserve_ids(self, ids: Iterable[int]) -> List[int]:
+        """
+        Atomically reserve specific ids (e.g. hand picked ones).
+        Raises AllocatorError, reserving nothing, if any of them is taken.
+        """
+        ids = list(ids)
+        bits = [self._bit(id_) for id_ in ids]
+        with self._locked():
+            taken = [id_ for id_, bit in zip(ids, bits) if self._is_set(bit)]
+            if taken:
+                raise AllocatorError(f"Ids already reserved: {taken[:10]}")
+            self._set(bits, True)
+            self.mm.flush()
+        return ids
+
+    def release(self, ids: Iterable[int]) -> int:
+        """Release reserved ids (e.g. those of failed writes). Returns the number which were reserved."""
+        bits = [self._bit(id_) for id_ in ids]
+        with self._locked():
+            released = [bit for bit in bits if self._is_set(bit)]
+            self._set(released, False)
+            self.mm.flush()
+        return len(released)
+
+    def is_reserved(self, id_: int) -> bool:
+        bit = self._bit(id_)
+        with self._locked():
+            return self._is_set(bit)
+
+    @property
+    def free(self) -> int:
+        """Number of free ids."""
+        with self._locked():
+            used = int.from_bytes(self.mm[self.bitmap_offset:self.bitmap_offset + self.bitmap_bytes], "little")
+        return self.bitmap_bytes * 8 - used.bit_count()
+
+    @contextmanager
+    def reservation(self, count: int, *, contiguous: bool = False) -> Iterator["RS109mIdReservation"]:
+        """
+        reserve() as a context manager: every id still held by the
+        reservation is released if the block raises.
+        """
+        reservation = RS109mIdReservation(self, self.reserve(count, contiguous=contiguous))
+        try:
+            yield reservation
+        except BaseException:
+            reservation.release()
+            raise
+
+    def close(self) -> None:
+        self.mm.close()
+        self.fh.close()
+
+    def __enter__(self) -> "RS109mIdAllocator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RS109mIdReservation:
+    """Ids reserved together, some of which may be handed back."""
+
+    def __init__(self, allocator: RS109mIdAllocator, ids: List[int]):
+        self.allocator = allocator
+        self.ids = list(ids)
+
+    def release(self, ids: Optional[Iterable[int]] = None) -> int:
+        """Release some (by default all) of the ids still held."""
+        held = set(self.ids)
+        ids = list(self.ids) if ids is None else [id_ for id_ in ids if id_ in held]
+        released = set(ids)
+        self.ids = [id_ for id_ in self.ids if id_ not in released]
+        return self.allocator.release(ids)
+
+
+def sernum_allocator(path: Union[str, Path]) -> RS109mIdAllocator:
+    """An allocator of the whole 20-bit unit serial number space."""
+    return RS109mIdAllocator(path, [SERNUM_RANGE])
+
+
+def mmsi_allocator(path: Union[str, Path], ranges: Optional[Sequence[Tuple[int, int]]] = None) -> RS109mIdAllocator:
+    """
+    An allocator of licensed MMSI blocks.
+    ranges: the (first, last + 1) MMSI blocks, needed when creating the file.
+    """
+    for start, stop in ranges or ():
+        if not (100000000 <= start < stop <= 1000000000):
+            raise ValueError(f"MMSI range {start}..{stop} is not within the 9-digit MMSIs")
+    return RS109mIdAllocator(path, ranges)
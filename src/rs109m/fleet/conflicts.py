@@ -0,0 +1,307 @@
+"""
+Fleet wide detection of duplicate MMSIs, serial numbers and callsigns.
+
+Two buoys sharing an MMSI (or a unit serial number, or a callsign) is an
+operational problem no single device can notice. RS109mConflictChecker
+streams any number of sources (manifest rows, a fleet store, raw images)
+and reports every value held by more than one unit.
+
+Memory stays bounded whatever the number of rows:
+
+- sernum: a dense bitmap of the whole 20-bit space (128 KiB),
+- mmsi: a sparse bitmap, allocated in 8 KiB chunks as values are seen,
+- callsign: a set of the normalised callsigns (at most 6 bytes each).
+
+The first pass only marks values as seen and collects those seen twice,
+the second pass (only run if there are any) gathers where each duplicate
+occurs. Sources are therefore given as callables returning a fresh
+iterator of FleetEntry, e.g. lambda: store_entries(store).
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Union
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver.layout import DECODERS
+from rs109m.driver.xbitconverter import CALLSIGN_CHARS
+
+from .store import RS109mFleetStore
+
+logger = logging.getLogger(__name__)
+
+KEY_FIELDS = ("mmsi", "sernum", "callsign")
+
+SERNUM_BITS = 20
+CHUNK_BITS = 16
+
+_decode_mmsi = DECODERS["mmsi"]
+_decode_sernum = DECODERS["sernum"]
+_decode_callsign = DECODERS["callsign"]
+
+
+class Bitmap:
+    """A fixed size set of the integers 0 <= value < size."""
+
+    __slots__ = ("size", "bits", "count")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+        self.count = 0
+
+    def add(self, value: int) -> bool:
+        """Add a value, returns False if it was already present."""
+        byte, bit = value >> 3, 1 << (value & 7)
+        if self.bits[byte] & bit:
+            return False
+        self.bits[byte] |= bit
+        self.count += 1
+        return True
+
+    def __contains__(self, value: int) -> bool:
+        return 0 <= value < self.size and bool(self.bits[value >> 3] & (1 << (value & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SparseBitmap:
+    """A set of non negative integers, stored as bitmap chunks of 2**CHUNK_BITS values allocated on demand."""
+
+    __slots__ = ("chunks", "count")
+
+    def __init__(self):
+        self.chunks: Dict[int, bytearray] = {}
+        self.count = 0
+
+    def add(self, value: int) -> bool:
+        """Add a value, returns False if it was already present."""
+        chunk = self.chunks.get(value >> CHUNK_BITS)
+        if chunk is None:
+            chunk = self.chunks[value >> CHUNK_BITS] = bytearray(1 << (CHUNK_BITS - 3))
+        low = value & ((1 << CHUNK_BITS) - 1)
+        byte, bit = low >> 3, 1 << (low & 7)
+        if chunk[byte] & bit:
+            return False
+        chunk[byte] |= bit
+        self.count += 1
+        return True
+
+    def __contains__(self, value: int) -> bool:
+        chunk = self.chunks.get(value >> CHUNK_BITS)
+        low = value & ((1 << CHUNK_BITS) - 1)
+        return chunk is not None and bool(chunk[low >> 3] & (1 << (low & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class _SeenSet(set):
+    """set with the add() of the bitmaps."""
+
+    def add(self, value: int) -> bool:
+        if value in self:
+            return False
+        super().add(value)
+        return True
+
+
+class FleetEntry(NamedTuple):
+    """The identifying fields of one unit, None where a field is not set."""
+    source: str  # manifest path, store path, ...
+    index: int  # row or slot within the source
+    device: Optional[str]  # port the unit is written through, for reporting (one port flashes many units)
+    mmsi: Optional[int]
+    sernum: Optional[int]
+    callsign: Optional[str]
+
+
+@dataclass
+class FleetConflict:
+    """A value held by more than one unit."""
+    field: str
+    value: Union[int, str]
+    entries: List[FleetEntry] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        where = ", ".join(
+            f"{entry.source}[{entry.index}]" + (f" ({entry.device})" if entry.device else "")
+            for entry in self.entries
+        )
+        return f"Duplicate {self.field} {self.value}: {where}"
+
+
+class FleetConflictError(Exception):
+    def __init__(self, conflicts: Sequence[FleetConflict]):
+        self.conflicts = list(conflicts)
+        lines = [str(conflict) for conflict in self.conflicts[:10]]
+        if len(self.conflicts) > 10:
+            lines.append(f"... and {len(self.conflicts) - 10} more")
+        super().__init__(f"{len(self.conflicts)} fleet conflict(s):\n" + "\n".join(lines))
+
+
+_NOT_ALNUM = bytes(code for code in range(256) if code >= 128 or not chr(code).isalnum())
+
+
+def callsign_key(callsign: str) -> Optional[bytes]:
+    """
+    A callsign as the device would store it: letters and digits only, upper
+    case, the last CALLSIGN_CHARS of them (so "ab-12" and "AB12" are equal).
+    None for a callsign with nothing left.
+    """
+    key = str(callsign).encode("ascii", "ignore").translate(None, _NOT_ALNUM).upper()[-CALLSIGN_CHARS:]
+    return key or None
+
+
+def _mmsi_key(mmsi: int) -> Optional[int]:
+    return mmsi if mmsi >= 0 else None
+
+
+def _sernum_key(sernum: int) -> Optional[int]:
+    return sernum if 0 <= sernum < (1 << SERNUM_BITS) else None
+
+
+_KEYS: Dict[str, Callable[[Any], Any]] = {"mmsi": _mmsi_key, "sernum": _sernum_key, "callsign": callsign_key}
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def manifest_entries(rows: Iterable[Any], source: str = "manifest") -> Iterator[FleetEntry]:
+    """
+    The entries of provisioning manifest rows: dicts shaped like a write
+    request (see iter_manifest) or RS109mWriteConfigRequest models.
+    Values which do not parse are skipped, validation reports them later.
+    """
+    for index, row in enumerate(rows):
+        if isinstance(row, dict):
+            device = row.get("device")
+            config = row.get("config", row)
+        else:
+            device = getattr(row, "device", None)
+            config = getattr(row, "config", row)
+        if not isinstance(config, dict):
+            config = {name: getattr(config, name, None) for name in KEY_FIELDS}
+        callsign = config.get("callsign")
+        yield FleetEntry(
+            source,
+            index,
+            device,
+            _int_or_none(config.get("mmsi")),
+            _int_or_none(config.get("sernum")),
+            str(callsign) if callsign not in (None, "") else None,
+        )
+
+
+def image_entries(images: Iterable[Union[RS109mRawConfig, bytes]], source: str = "images") -> Iterator[FleetEntry]:
+    """The entries of configuration images, each image a different unit."""
+    for index, image in enumerate(images):
+        buf = image.view() if isinstance(image, RS109mRawConfig) else image
+        yield FleetEntry(source, index, None, _decode_mmsi(buf), _decode_sernum(buf), _decode_callsign(buf) or None)
+
+
+def store_entries(store: RS109mFleetStore) -> Iterator[FleetEntry]:
+    """The entries of every record of a fleet store, each record a different unit."""
+    return image_entries(store, str(store.path))
+
+
+EntrySource = Callable[[], Iterable[FleetEntry]]
+
+
+class RS109mConflictChecker:
+    """
+    Finds the MMSIs, serial numbers and callsigns held by more than one unit
+    across any number of sources.
+
+        checker = RS109mConflictChecker()
+        conflicts = checker.check(
+            lambda: manifest_entries(iter_manifest(path), str(path)),
+            lambda: store_entries(store),
+        )
+
+    Every entry is a different unit, unless `same_unit` says otherwise. The
+    device path is not an identity: the provisioning engine flashes buoy
+    after buoy through the same port.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str] = KEY_FIELDS,
+        *,
+        same_unit: Optional[Callable[[FleetEntry], Any]] = None,
+    ):
+        """
+        fields: the fields to check, any of mmsi, sernum and callsign.
+        same_unit: the identity of the physical unit of an entry, None if not
+                   known, e.g. lambda entry: entry.sernum when the sernums were
+                   read back from the units. A value held only by entries of one
+                   unit is not a conflict (so neither is a sernum, with the example).
+        """
+        unknown = set(fields) - set(KEY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        self.fields = tuple(fields)
+        self.same_unit = same_unit
+
+    def _plan(self, seen: Dict) -> List:
+        return [(name, FleetEntry._fields.index(name), _KEYS[name], seen.get(name)) for name in self.fields]
+
+    def find_duplicates(self, sources: Iterable[EntrySource]) -> Dict[str, Set]:
+        """First pass: {field: keys seen more than once} (callsigns as callsign_key values)."""
+        seen = {
+            "mmsi": SparseBitmap(),
+            "sernum": Bitmap(1 << SERNUM_BITS),
+            "callsign": _SeenSet(),
+        }
+        duplicates: Dict[str, Set] = {name: set() for name in self.fields}
+        plan = [(position, key_of, bitmap.add, duplicates[name]) for name, position, key_of, bitmap in self._plan(seen)]
+        rows = 0
+        for source in sources:
+            for entry in source():
+                rows += 1
+                for position, key_of, add, found in plan:
+                    value = entry[position]
+                    if value is not None:
+                        key = key_of(value)
+                        if key is not None and not add(key):
+                            found.add(key)
+        logger.debug(f"Checked {rows} entries for conflicts")
+        return duplicates
+
+    def check(self, *sources: EntrySource) -> List[FleetConflict]:
+        """
+        Every conflict across the sources, each source a callable returning
+        a fresh iterable of FleetEntry (sources are read twice if duplicates
+        are found).
+        """
+        duplicates = self.find_duplicates(sources)
+        if not any(duplicates.values()):
+            return []
+
+        found: Dict = {}
+        plan = [(name, position, key_of, duplicates[name]) for name, position, key_of, _ in self._plan({})]
+        for source in sources:
+            for entry in source():
+                for name, position, key_of, keys in plan:
+                    value = entry[position]
+                    if value is not None:
+                        key = key_of(value)
+                        if key in keys:
+                            found.setdefault((name, key), []).append(entry)
+
+        conflicts = []
+        for (name, key), entries in found.items():
+            if self.same_unit is not None:
+                units = {self.same_unit(entry) for entry in entries}
+                if len(units) == 1 and None not in units:
+                    continue
+            value = key.decode("ascii") if name == "callsign" else key
+            conflicts.append(FleetConflict(name, value, entries))
+        return conflicts
+
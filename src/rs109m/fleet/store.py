@@ -0,0 +1,375 @@
+"""
+On-disk fleet of configuration images, memory mapped.
+
+    <path>             header + fixed size slots of one 255-byte record each
+    <path>.mmsi.idx    hash index MMSI -> slot (unique)
+    <path>.sernum.idx  hash index sernum -> slots (not unique)
+
+The indexes are open addressing hash tables with linear probing, stored in
+their own memory mapped files, so lookups, appends and updates are O(1)
+and nothing is loaded up front. They can always be rebuilt from the
+records, which happens automatically if they are missing or out of date.
+
+A store has a single writer at a time.
+"""
+import mmap
+import os
+import re
+import struct
+import logging
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Union
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver.layout import DECODERS
+
+logger = logging.getLogger(__name__)
+
+RECORD_SIZE = 0xff
+SLOT_SIZE = 0x100  # one spare byte, keeps records aligned
+
+STORE_MAGIC = b"RS9FLEET"
+INDEX_MAGIC = b"RS9INDEX"
+VERSION = 1
+
+# magic, version, record size, count, capacity
+STORE_HEADER = struct.Struct("<8sHHII")
+# magic, version, count, capacity
+INDEX_HEADER = struct.Struct("<8sHII")
+INDEX_ENTRY = struct.Struct("<II")  # key, slot + 1 (0 = empty)
+
+HEADER_SIZE = SLOT_SIZE
+INDEX_HEADER_SIZE = 64
+MAX_LOAD = 0.7
+
+_decode_mmsi = DECODERS["mmsi"]
+_decode_sernum = DECODERS["sernum"]
+
+
+class FleetStoreError(Exception):
+    pass
+
+
+def parse_hex_dump(text: str) -> bytes:
+    """The bytes of a hex dump like bin/default-config.txt or RS109mRawConfig's repr."""
+    return bytes(int(byte, 16) for byte in re.findall(r"0x([0-9a-fA-F]{2})", text))
+
+
+def _map(fh, size: int) -> mmap.mmap:
+    if os.fstat(fh.fileno()).st_size < size:
+        fh.truncate(size)
+    return mmap.mmap(fh.fileno(), size)
+
+
+class _HashIndex:
+    """A persistent uint32 -> slot multimap (open addressing, linear probing)."""
+
+    def __init__(self, path: Path, initial_capacity: int = 1024):
+        self.path = path
+        new = not path.exists() or path.stat().st_size < INDEX_HEADER_SIZE
+        self.fh = open(path, "w+b" if new else "r+b")
+        if new:
+            self._create(initial_capacity)
+        else:
+            size = os.fstat(self.fh.fileno()).st_size
+            self.mm = _map(self.fh, size)
+            magic, version, self.count, self.capacity = INDEX_HEADER.unpack_from(self.mm, 0)
+            if magic != INDEX_MAGIC or version != VERSION:
+                raise FleetStoreError(f"{path} is not a fleet index")
+            self._set_capacity(self.capacity)
+
+    def _set_capacity(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.shift = 32 - (capacity.bit_length() - 1)
+
+    def _create(self, capacity: int) -> None:
+        self._set_capacity(1 << max(4, (capacity - 1).bit_length()))
+        self.count = 0
+        self.fh.truncate(0)
+        self.mm = _map(self.fh, INDEX_HEADER_SIZE + self.capacity * INDEX_ENTRY.size)
+        self._write_header()
+
+    def _write_header(self) -> None:
+        INDEX_HEADER.pack_into(self.mm, 0, INDEX_MAGIC, VERSION, self.count, self.capacity)
+
+    def _hash(self, key: int) -> int:
+        # Fibonacci hashing, spreads sequential MMSIs and serials
+        return ((key * 0x9E3779B1) & 0xffffffff) >> self.shift
+
+    def _entry(self, position: int):
+        return INDEX_ENTRY.unpack_from(self.mm, INDEX_HEADER_SIZE + position * INDEX_ENTRY.size)
+
+    def _set(self, position: int, key: int, slot1: int) -> None:
+        INDEX_ENTRY.pack_into(self.mm, INDEX_HEADER_SIZE + position * INDEX_ENTRY.size, key, slot1)
+
+    def find(self, key: int) -> Iterator[int]:
+        """Slots stored under key."""
+        position = self._hash(key)
+        while True:
+            entry_key, slot1 = self._entry(position)
+            if slot1 == 0:
+                return
+            if entry_key == key:
+                yield slot1 - 1
+            position = (position + 1) & self.mask
+
+    def first(self, key: int) -> Optional[int]:
+        return next(self.find(key), None)
+
+    def add(self, key: int, slot: int) -> None:
+        if (self.count + 1) > self.capacity * MAX_LOAD:
+            self._grow()
+        self._insert(key, slot + 1)
+        self.count += 1
+        self._write_header()
+
+    def _insert(self, key: int, slot1: int) -> None:
+        position = self._hash(key)
+        while self._entry(position)[1] != 0:
+            position = (position + 1) & self.mask
+        self._set(position, key, slot1)
+
+    def remove(self, key: int, slot: int) -> None:
+        position = self._hash(key)
+        while True:
+            entry_key, slot1 = self._entry(position)
+            if slot1 == 0:
+                return
+            if entry_key == key and slot1 == slot + 1:
+                break
+            position = (position + 1) & self.mask
+
+        # backward shift deletion, no tombstones needed
+        hole = position
+        position = (position + 1) & self.mask
+        while True:
+            entry_key, slot1 = self._entry(position)
+            if slot1 == 0:
+                break
+            home = self._hash(entry_key)
+            # move the entry into the hole unless its home lies cyclically in (hole, position]
+            if (position - home) & self.mask >= (position - hole) & self.mask:
+                self._set(hole, entry_key, slot1)
+                hole = position
+            position = (position + 1) & self.mask
+        self._set(hole, 0, 0)
+        self.count -= 1
+        self._write_header()
+
+    def entries(self) -> List:
+        return [entry for entry in (self._entry(i) for i in range(self.capacity)) if entry[1]]
+
+    def _grow(self) -> None:
+        entries = self.entries()
+        self.mm.close()
+        self._create(self.capacity * 2)
+        for key, slot1 in entries:
+            self._insert(key, slot1)
+        self.count = len(entries)
+        self._write_header()
+
+    def clear(self, capacity: int) -> None:
+        self.mm.close()
+        self._create(capacity)
+
+    def flush(self) -> None:
+        self.mm.flush()
+
+    def close(self) -> None:
+        self.mm.close()
+        self.fh.close()
+
+
+class RS109mFleetStore:
+    """
+    A memory mapped store of configuration images, indexed by MMSI (unique)
+    and sernum.
+
+    Records are returned as RS109mRawConfig views of the mapped file, without
+    copying. They are read-only views (writing a field detaches a private
+    copy); use update() to change a stored record so the indexes follow.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        initial_capacity: int = 1024,
+    ):
+        """
+        path: the records file, created if missing. The index files sit next to it.
+        initial_capacity: records (and index entries) to allocate room for up front.
+        """
+        self.path = Path(path)
+        new = not self.path.exists() or self.path.stat().st_size < HEADER_SIZE
+        self.fh = open(self.path, "w+b" if new else "r+b")
+        # mappings replaced by a bigger one stay open while views of them may be alive
+        self._old_maps: List[mmap.mmap] = []
+
+        if new:
+            self.count = 0
+            self.capacity = max(1, initial_capacity)
+            self.mm = _map(self.fh, HEADER_SIZE + self.capacity * SLOT_SIZE)
+            self._write_header()
+        else:
+            self.mm = _map(self.fh, os.fstat(self.fh.fileno()).st_size)
+            magic, version, record_size, self.count, self.capacity = STORE_HEADER.unpack_from(self.mm, 0)
+            if magic != STORE_MAGIC or version != VERSION or record_size != RECORD_SIZE:
+                raise FleetStoreError(f"{path} is not a fleet store")
+
+        self.mmsi_index = _HashIndex(self.path.with_name(self.path.name + ".mmsi.idx"), initial_capacity)
+        self.sernum_index = _HashIndex(self.path.with_name(self.path.name + ".sernum.idx"), initial_capacity)
+        if self.mmsi_index.count != self.count or self.sernum_index.count != self.count:
+            logger.info(f"Rebuilding indexes of {self.path}")
+            self.rebuild_indexes()
+
+    def _write_header(self) -> None:
+        STORE_HEADER.pack_into(self.mm, 0, STORE_MAGIC, VERSION, RECORD_SIZE, self.count, self.capacity)
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT_SIZE
+
+    def _record(self, slot: int) -> memoryview:
+        offset = self._offset(slot)
+        return memoryview(self.mm)[offset:offset + RECORD_SIZE]
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        self._old_maps.append(self.mm)
+        self.mm = _map(self.fh, HEADER_SIZE + self.capacity * SLOT_SIZE)
+        self._write_header()
+
+    @staticmethod
+    def _image(config: Union[RS109mRawConfig, bytes]) -> bytes:
+        data = config.view() if isinstance(config, RS109mRawConfig) else memoryview(config)
+        return bytes(data[:RECORD_SIZE]).ljust(RECORD_SIZE, b"\xff")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, mmsi: object) -> bool:
+        return isinstance(mmsi, int) and self.mmsi_index.first(mmsi) is not None
+
+    def __iter__(self) -> Iterator[RS109mRawConfig]:
+        for slot in range(self.count):
+            yield self.record(slot)
+
+    def record(self, slot: int) -> RS109mRawConfig:
+        """The record in a slot, as a read-only view."""
+        if not 0 <= slot < self.count:
+            raise IndexError(slot)
+        return RS109mRawConfig.wrap(self._record(slot).toreadonly())
+
+    def slot(self, mmsi: int) -> Optional[int]:
+        """The slot of the record with this MMSI, None if there is none."""
+        return self.mmsi_index.first(mmsi)
+
+    def get(self, mmsi: int) -> Optional[RS109mRawConfig]:
+        """The record with this MMSI (as a read-only view), None if there is none."""
+        slot = self.mmsi_index.first(mmsi)
+        return None if slot is None else self.record(slot)
+
+    def find_sernum(self, sernum: int) -> List[RS109mRawConfig]:
+        """Every record with this serial number."""
+        return [self.record(slot) for slot in sorted(self.sernum_index.find(sernum))]
+
+    def append(self, config: Union[RS109mRawConfig, bytes]) -> int:
+        """Add a record, returning its slot. Raises KeyError if its MMSI is already stored."""
+        image = self._image(config)
+        mmsi = _decode_mmsi(image)
+        if self.mmsi_index.first(mmsi) is not None:
+            raise KeyError(f"MMSI {mmsi} already in the store")
+
+        if self.count == self.capacity:
+            self._grow()
+        slot = self.count
+        offset = self._offset(slot)
+        self.mm[offset:offset + RECORD_SIZE] = image
+        self.count += 1
+        self._write_header()
+        self.mmsi_index.add(mmsi, slot)
+        self.sernum_index.add(_decode_sernum(image), slot)
+        return slot
+
+    def put(self, config: Union[RS109mRawConfig, bytes]) -> int:
+        """Insert or replace the record with the config's MMSI, returning its slot."""
+        image = self._image(config)
+        slot = self.mmsi_index.first(_decode_mmsi(image))
+        if slot is None:
+            return self.append(image)
+        self._replace(slot, image)
+        return slot
+
+    def update(self, mmsi: int, patch: Callable[[RS109mRawConfig], None]) -> RS109mRawConfig:
+        """
+        Apply patch to the stored record with this MMSI, in place, keeping the
+        indexes in step (the patch may change the MMSI or sernum).
+        Raises KeyError if there is no such record.
+        """
+        slot = self.mmsi_index.first(mmsi)
+        if slot is None:
+            raise KeyError(f"MMSI {mmsi} not in the store")
+        config = RS109mRawConfig(bytes(self._record(slot)))
+        patch(config)
+        self._replace(slot, self._image(config))
+        return self.record(slot)
+
+    def _replace(self, slot: int, image: bytes) -> None:
+        record = self._record(slot)
+        old_mmsi, old_sernum = _decode_mmsi(record), _decode_sernum(record)
+        new_mmsi, new_sernum = _decode_mmsi(image), _decode_sernum(image)
+        if new_mmsi != old_mmsi:
+            other = self.mmsi_index.first(new_mmsi)
+            if other is not None and other != slot:
+                raise KeyError(f"MMSI {new_mmsi} already in the store")
+
+        record[:] = image
+        if new_mmsi != old_mmsi:
+            self.mmsi_index.remove(old_mmsi, slot)
+            self.mmsi_index.add(new_mmsi, slot)
+        if new_sernum != old_sernum:
+            self.sernum_index.remove(old_sernum, slot)
+            self.sernum_index.add(new_sernum, slot)
+
+    def rebuild_indexes(self) -> None:
+        """Recreate both indexes from the records."""
+        capacity = max(1024, int(self.count / MAX_LOAD) + 1)
+        self.mmsi_index.clear(capacity)
+        self.sernum_index.clear(capacity)
+        for slot in range(self.count):
+            record = self._record(slot)
+            self.mmsi_index.add(_decode_mmsi(record), slot)
+            self.sernum_index.add(_decode_sernum(record), slot)
+
+    def import_hex_dumps(self, paths) -> int:
+        """put() the images of hex dump files (like bin/default-config.txt). Returns the number imported."""
+        imported = 0
+        for path in paths:
+            self.put(parse_hex_dump(Path(path).read_text()))
+            imported += 1
+        return imported
+
+    def flush(self) -> None:
+        self.mm.flush()
+        self.mmsi_index.flush()
+        self.sernum_index.flush()
+
+    def close(self) -> None:
+        self.flush()
+        for mm in self._old_maps + [self.mm]:
+            try:
+                mm.close()
+            except BufferError:
+                # views of the mapping are still alive, it is unmapped once they are gone
+                pass
+        self._old_maps = []
+        self.mmsi_index.close()
+        self.sernum_index.close()
+        self.fh.close()
+
+    def __enter__(self) -> "RS109mFleetStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,2 @@
+from .pty_simulator import RS109mPtySimulator
+from .virtual_time import VirtualClock, SimulatedDeviceIO, FleetSimulation, FleetSimulationResult, SimulatedJob
@@ -0,0 +1,40 @@
+import time
+import argparse
+from pathlib import Path
+
+from rs109m.driver.constants import BAUDRATE
+
+from .pty_simulator import RS109mPtySimulator, DEFAULT_LATENCY
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m rs109m.simulator",
+        description="Simulate RS-109M buoys on pseudo terminals for load testing.",
+    )
+    parser.add_argument("--count", "-n", type=int, default=10, help="number of buoys")
+    parser.add_argument("--baudrate", type=int, default=BAUDRATE, help="simulated line speed, 0 for no pacing")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="seconds before a buoy answers")
+    parser.add_argument("--password", default=None, help="password the buoys expect (default: accept any)")
+    parser.add_argument("--link-dir", type=Path, default=None, help="create rs109m-NNN symlinks to the ptys here")
+    args = parser.parse_args()
+
+    simulator = RS109mPtySimulator(
+        args.count,
+        baudrate=args.baudrate,
+        latency=args.latency,
+        password=args.password,
+        link_dir=args.link_dir,
+    )
+    with simulator:
+        for path in simulator.paths:
+            print(path, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
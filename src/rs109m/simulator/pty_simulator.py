@@ -0,0 +1,183 @@
+import os
+import tty
+import time
+import logging
+import selectors
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver.constants import BAUDRATE
+from rs109m.driver.emulator import RS109mDeviceEmulator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY = 0.002
+DEFAULT_MMSI_BASE = 111000000
+# Bytes written to the pty at once when pacing a response at the baud rate
+CHUNK_SIZE = 16
+# 8N1: a start bit, 8 data bits and a stop bit per byte
+BITS_PER_BYTE = 10
+
+
+class SimulatedBuoy:
+    """One emulated RS-109M behind a pseudo terminal pair."""
+
+    def __init__(
+        self,
+        index: int,
+        emulator: RS109mDeviceEmulator,
+        link: Optional[Path] = None,
+    ):
+        self.index = index
+        self.emulator = emulator
+        self.master_fd, self.slave_fd = os.openpty()
+        # No echo or line discipline, the client sees exactly what the buoy sends
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.path = os.ttyname(self.slave_fd)
+        self.link = link
+        if link is not None:
+            if link.is_symlink():
+                link.unlink()
+            link.symlink_to(self.path)
+        self.outbox: Deque[Tuple[float, bytes]] = deque()
+
+    def close(self) -> None:
+        if self.link is not None and self.link.is_symlink():
+            self.link.unlink()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+
+class RS109mPtySimulator:
+    """
+    Simulates many RS-109M buoys on pseudo terminals, so the real
+    SerialDeviceIO/pyserial path can be load tested without hardware.
+    Each buoy answers the handshake/0x51/0x55 protocol after `latency` seconds,
+    with its request and response paced at `baudrate`. Linux/POSIX only.
+
+    All buoys are serviced from one thread with a selector.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        *,
+        baudrate: int = BAUDRATE,
+        latency: float = DEFAULT_LATENCY,
+        password: Optional[str] = None,
+        link_dir: Optional[Path] = None,
+        mmsi_base: int = DEFAULT_MMSI_BASE,
+    ):
+        """
+        count: number of buoys.
+        baudrate: simulated line speed, 0 for no pacing.
+        latency: seconds the buoy takes to start answering a command.
+        password: password the buoys expect, None to accept any.
+        link_dir: if set, symlinks rs109m-000, rs109m-001, ... to the ptys are created there.
+        mmsi_base: buoy i gets MMSI mmsi_base + i and serial number i.
+        """
+        self.byte_time = BITS_PER_BYTE / baudrate if baudrate else 0.0
+        self.latency = latency
+        self.buoys: List[SimulatedBuoy] = []
+        self._selector = selectors.DefaultSelector()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if link_dir is not None:
+            link_dir = Path(link_dir)
+            link_dir.mkdir(parents=True, exist_ok=True)
+
+        for index in range(count):
+            config = RS109mRawConfig()
+            config.mmsi = mmsi_base + index
+            config.sernum = index
+            buoy = SimulatedBuoy(
+                index,
+                RS109mDeviceEmulator(config, password),
+                link_dir / f"rs109m-{index:03d}" if link_dir is not None else None,
+            )
+            self._selector.register(buoy.master_fd, selectors.EVENT_READ, buoy)
+            self.buoys.append(buoy)
+
+    @property
+    def paths(self) -> List[str]:
+        """Device paths to open, the symlinks if a link_dir was given."""
+        return [str(buoy.link) if buoy.link is not None else buoy.path for buoy in self.buoys]
+
+    def start(self) -> "RS109mPtySimulator":
+        """Run the simulator in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="rs109m-pty-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the simulator and close every pty."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._selector.close()
+        for buoy in self.buoys:
+            buoy.close()
+
+    def __enter__(self) -> "RS109mPtySimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def run(self) -> None:
+        """Service the buoys until stop() is called."""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            timeout = 0.05
+            for buoy in self.buoys:
+                if buoy.outbox:
+                    timeout = min(timeout, max(0.0, buoy.outbox[0][0] - now))
+
+            for key, _ in self._selector.select(timeout):
+                self._receive(key.data)
+
+            now = time.monotonic()
+            for buoy in self.buoys:
+                self._send_due(buoy, now)
+
+    def _receive(self, buoy: SimulatedBuoy) -> None:
+        try:
+            data = os.read(buoy.master_fd, 4096)
+        except (BlockingIOError, OSError):
+            return
+        if not data:
+            return
+
+        response = buoy.emulator.feed(data)
+        if not response:
+            return
+
+        # The request takes len(data) byte times to arrive, then the buoy thinks,
+        # then answers in chunks paced at the baud rate.
+        start = max(time.monotonic(), buoy.outbox[-1][0] if buoy.outbox else 0.0)
+        start += len(data) * self.byte_time + self.latency
+        for offset in range(0, len(response), CHUNK_SIZE):
+            chunk = response[offset:offset + CHUNK_SIZE]
+            start += len(chunk) * self.byte_time
+            buoy.outbox.append((start, chunk))
+
+    def _send_due(self, buoy: SimulatedBuoy, now: float) -> None:
+        while buoy.outbox and buoy.outbox[0][0] <= now:
+            due, chunk = buoy.outbox[0]
+            try:
+                written = os.write(buoy.master_fd, chunk)
+            except BlockingIOError:
+                return
+            except OSError:
+                buoy.outbox.clear()
+                return
+            if written < len(chunk):
+                buoy.outbox[0] = (due, chunk[written:])
+                return
+            buoy.outbox.popleft()
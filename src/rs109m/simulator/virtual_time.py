@@ -0,0 +1,325 @@
+import heapq
+import random
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, override
+from collections import deque
+
+from rs109m.driver import RS109mDriver, RS109mRawConfig
+from rs109m.driver.constants import BAUDRATE, SERIAL_TIMEOUT
+from rs109m.driver.device_io.base import DeviceIO
+from rs109m.driver.emulator import RS109mDeviceEmulator
+from rs109m.driver_service.config_util import apply_rs109m_config_to_driver_config
+from rs109m.driver_service.models import RS109mConfig
+
+from .pty_simulator import BITS_PER_BYTE, DEFAULT_LATENCY, DEFAULT_MMSI_BASE
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualClock:
+    """
+    Simulated monotonic time in seconds. Callable, so it can be passed as the
+    clock of RS109mDriver/Deadline.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+    def advance_to(self, when: float) -> None:
+        if when > self.now:
+            self.now = when
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+
+class SimulatedDeviceIO(DeviceIO):
+    """
+    A DeviceIO whose reads and writes advance a VirtualClock instead of
+    sleeping. The device is an RS109mDeviceEmulator (the MockDeviceIO protocol
+    logic), with serial timing modelled from the baud rate and a response
+    latency, and optional seeded jitter and dropped responses.
+    """
+
+    def __init__(
+        self,
+        clock: VirtualClock,
+        *,
+        emulator: Optional[RS109mDeviceEmulator] = None,
+        baudrate: int = BAUDRATE,
+        latency: float = DEFAULT_LATENCY,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        clock: the virtual clock advanced by every operation.
+        emulator: the simulated device, a default one if None.
+        baudrate: simulated line speed, 0 for instant transfers.
+        latency: seconds the device takes to start answering.
+        jitter: up to this many seconds are randomly added to each latency.
+        drop_rate: probability that the device does not answer a command.
+        rng: source of randomness, seed it for reproducible runs.
+        """
+        self.clock = clock
+        self.emulator = emulator if emulator is not None else RS109mDeviceEmulator()
+        self.byte_time = BITS_PER_BYTE / baudrate if baudrate else 0.0
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.rng = rng if rng is not None else random.Random(0)
+        # Response segments as (arrival time of the first byte, bytes)
+        self._inbox: Deque[List] = deque()
+
+    @property
+    def device_config(self) -> RS109mRawConfig:
+        return self.emulator.device_config
+
+    @override
+    def write(self, data) -> None:
+        data = bytes(data)
+        self.clock.advance(len(data) * self.byte_time)
+        response = self.emulator.feed(data)
+        if not response:
+            return
+        if self.drop_rate and self.rng.random() < self.drop_rate:
+            return
+        latency = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        start = self.clock.now + latency
+        if self._inbox:
+            # the line is busy until the previous response has been sent
+            last_start, last = self._inbox[-1]
+            start = max(start, last_start + len(last) * self.byte_time)
+        self._inbox.append([start + self.byte_time, response])
+
+    @override
+    def read(self, num_bytes: int) -> bytes:
+        return self.read_frame(num_bytes, SERIAL_TIMEOUT)
+
+    @override
+    def read_frame(self, num_bytes: int, timeout: Optional[float]) -> bytes:
+        deadline = None if timeout is None else self.clock.now + timeout
+        data = bytearray()
+        while len(data) < num_bytes and self._inbox:
+            segment = self._inbox[0]
+            first_arrival, payload = segment
+            wanted = min(num_bytes - len(data), len(payload))
+            arrival = first_arrival + (wanted - 1) * self.byte_time
+            if deadline is not None and arrival > deadline:
+                # only the bytes which arrived before the deadline
+                wanted = max(0, int((deadline - first_arrival) / self.byte_time) + 1) if self.byte_time else 0
+                wanted = min(wanted, len(payload))
+                data += payload[:wanted]
+                self._consume(segment, wanted)
+                self.clock.advance_to(deadline)
+                return bytes(data)
+            data += payload[:wanted]
+            self._consume(segment, wanted)
+            self.clock.advance_to(arrival)
+
+        if len(data) < num_bytes and deadline is not None:
+            self.clock.advance_to(deadline)
+        return bytes(data)
+
+    def _consume(self, segment: List, count: int) -> None:
+        segment[1] = segment[1][count:]
+        segment[0] += count * self.byte_time
+        if not segment[1]:
+            self._inbox.popleft()
+
+    @override
+    def reset(self) -> None:
+        # stale bytes which have already arrived are discarded, later ones still arrive
+        while self._inbox and self._inbox[0][0] <= self.clock.now:
+            segment = self._inbox[0]
+            arrived = int((self.clock.now - segment[0]) / self.byte_time) + 1 if self.byte_time else len(segment[1])
+            self._consume(segment, min(arrived, len(segment[1])))
+        self.emulator.reset()
+
+
+@dataclass
+class SimulatedJob:
+    """The outcome of provisioning one simulated buoy."""
+    buoy: int
+    port: int
+    start: float
+    end: float
+    attempts: int
+    success: bool
+    changed: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class FleetSimulationResult:
+    jobs: List[SimulatedJob] = field(default_factory=list)
+    ports: int = 0
+
+    @property
+    def makespan(self) -> float:
+        """Simulated seconds from the first job starting to the last one finishing."""
+        return max((job.end for job in self.jobs), default=0.0)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(job.success for job in self.jobs)
+
+    @property
+    def failed(self) -> int:
+        return len(self.jobs) - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Buoys provisioned per simulated hour."""
+        return self.succeeded / self.makespan * 3600 if self.makespan else 0.0
+
+    @property
+    def utilisation(self) -> float:
+        """Fraction of port time spent on jobs."""
+        busy = sum(job.end - job.start for job in self.jobs)
+        return busy / (self.makespan * self.ports) if self.makespan and self.ports else 0.0
+
+
+class FleetSimulation:
+    """
+    Discrete-event simulation of provisioning a fleet over a number of serial
+    ports, in virtual time. Every job runs the real RS109mDriver
+    read_modify_write against a SimulatedDeviceIO, so protocol timing,
+    deadlines and retries behave as they would on the bench, but a day of
+    provisioning takes seconds. Results are deterministic for a given seed.
+
+    scheduling:
+    - "shared": a free port takes the next buoy (a work queue).
+    - "pinned": buoy i is provisioned on port i % ports, like
+      RS109mProvisioningEngine pins each device to one worker.
+    """
+
+    def __init__(
+        self,
+        buoys: int,
+        ports: int,
+        config: RS109mConfig,
+        *,
+        seed: int = 0,
+        scheduling: str = "shared",
+        handling_time: float = 30.0,
+        handling_jitter: float = 0.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 1.0,
+        operation_timeout: Optional[float] = None,
+        baudrate: int = BAUDRATE,
+        latency: float = DEFAULT_LATENCY,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        password: Optional[str] = None,
+        device_config_factory: Optional[Callable[[int], RS109mRawConfig]] = None,
+    ):
+        """
+        buoys: number of buoys to provision.
+        ports: number of serial ports (workers).
+        config: configuration written to every buoy.
+        seed: seed for every random choice.
+        scheduling: "shared" or "pinned", see above.
+        handling_time: seconds to plug a buoy in and out of a port.
+        handling_jitter: up to this many seconds are randomly added to the handling time.
+        max_attempts: attempts per buoy before giving up.
+        retry_backoff: seconds waited before a retry.
+        operation_timeout: driver deadline per transaction, the driver default if None.
+        baudrate, latency, jitter, drop_rate: serial line model, see SimulatedDeviceIO.
+        password: password used by the driver.
+        device_config_factory: builds the initial config of buoy i, by default a
+                               distinct MMSI and serial number per buoy.
+        """
+        if scheduling not in ("shared", "pinned"):
+            raise ValueError("scheduling must be 'shared' or 'pinned'")
+        if ports < 1:
+            raise ValueError("ports must be >= 1")
+        self.buoys = buoys
+        self.ports = ports
+        self.config = config
+        self.seed = seed
+        self.scheduling = scheduling
+        self.handling_time = handling_time
+        self.handling_jitter = handling_jitter
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.operation_timeout = operation_timeout
+        self.baudrate = baudrate
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.password = password
+        self.device_config_factory = device_config_factory or self._default_device_config
+
+    @staticmethod
+    def _default_device_config(index: int) -> RS109mRawConfig:
+        config = RS109mRawConfig()
+        config.mmsi = DEFAULT_MMSI_BASE + index
+        config.sernum = index % (1 << 20)
+        return config
+
+    def _patch(self, config: RS109mRawConfig) -> None:
+        apply_rs109m_config_to_driver_config(self.config, config)
+
+    def run_job(self, buoy: int, port: int, start: float) -> SimulatedJob:
+        """Provision a single buoy on a port starting at `start` (virtual seconds)."""
+        # Seeded per buoy, so a buoy behaves the same whatever port/time it is scheduled on
+        rng = random.Random(f"{self.seed}:{buoy}")
+        clock = VirtualClock(start)
+        clock.advance(self.handling_time + (rng.uniform(0, self.handling_jitter) if self.handling_jitter else 0.0))
+
+        device_io = SimulatedDeviceIO(
+            clock,
+            emulator=RS109mDeviceEmulator(self.device_config_factory(buoy)),
+            baudrate=self.baudrate,
+            latency=self.latency,
+            jitter=self.jitter,
+            drop_rate=self.drop_rate,
+            rng=rng,
+        )
+        driver = RS109mDriver(device_io, clock=clock)
+
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = driver.read_modify_write(self._patch, password=self.password, timeout=self.operation_timeout)
+                return SimulatedJob(buoy, port, start, clock.now, attempt, result.verified, result.changed)
+            except Exception as e:
+                error = str(e)
+                clock.sleep(self.retry_backoff)
+
+        return SimulatedJob(buoy, port, start, clock.now, self.max_attempts, False, error=error)
+
+    def run(self) -> FleetSimulationResult:
+        """Run the whole simulation."""
+        result = FleetSimulationResult(ports=self.ports)
+
+        if self.scheduling == "pinned":
+            queues: Dict[int, Deque[int]] = {port: deque() for port in range(self.ports)}
+            for buoy in range(self.buoys):
+                queues[buoy % self.ports].append(buoy)
+        else:
+            shared: Deque[int] = deque(range(self.buoys))
+            queues = {port: shared for port in range(self.ports)}
+
+        # Events are (time a port becomes free, port), processed in time order
+        events = [(0.0, port) for port in range(self.ports)]
+        heapq.heapify(events)
+        while events:
+            now, port = heapq.heappop(events)
+            pending = queues[port]
+            if not pending:
+                continue
+            job = self.run_job(pending.popleft(), port, now)
+            result.jobs.append(job)
+            heapq.heappush(events, (job.end, port))
+
+        return result
@@ -0,0 +1,113 @@
+import os
+import asyncio
+
+import pytest
+
+from rs109m.driver import AsyncRS109mDriver
+from rs109m.driver.device_io import AsyncMockDeviceIO, AsyncSerialDeviceIO, MockDeviceIO
+
+
+def test_async_read_config():
+    async def run():
+        driver = AsyncRS109mDriver(AsyncMockDeviceIO())
+        return await driver.read_config(password="123")
+
+    config = asyncio.run(run())
+    assert config.mmsi == MockDeviceIO().device_config.mmsi
+
+
+def test_async_read_modify_write():
+    device_io = AsyncMockDeviceIO()
+
+    def patch(config):
+        config.interval = 300
+
+    async def run():
+        driver = AsyncRS109mDriver(device_io)
+        return await driver.read_modify_write(patch, password=None)
+
+    result = asyncio.run(run())
+    assert result.verified
+    assert device_io.device_config.interval == 300
+
+
+def test_async_drivers_run_concurrently():
+    async def run():
+        drivers = [AsyncRS109mDriver(AsyncMockDeviceIO()) for _ in range(50)]
+        return await asyncio.gather(*(d.read_config(password=None) for d in drivers))
+
+    configs = asyncio.run(run())
+    assert len(configs) == 50
+
+
+class NoPipeliningDeviceIO(MockDeviceIO):
+    """A device which discards anything sent along with a handshake."""
+
+    def write(self, data) -> None:
+        data = bytes(data)
+        if data[:1] == b"\x59":
+            data = data[:4 + data[3]]
+        super().write(data)
+
+
+def test_async_pipelining_falls_back_like_sync_driver():
+    device_io = AsyncMockDeviceIO(mock=NoPipeliningDeviceIO())
+
+    async def run():
+        driver = AsyncRS109mDriver(device_io, pipeline=True)
+        result = await driver.read_modify_write(lambda config: setattr(config, "mmsi", 123456789), password=None)
+        return driver, result
+
+    driver, result = asyncio.run(run())
+    assert result.verified
+    assert driver.pipeline_supported is False
+    assert device_io.get_written_data().count(bytes([0x59, 0x01, 0x42])) == 2
+
+
+def test_async_handshake_context():
+    device_io = AsyncMockDeviceIO()
+
+    async def run():
+        driver = AsyncRS109mDriver(device_io)
+        async with driver.handshake(None):
+            assert driver.handshook
+            # operations within the context reuse its handshake
+            config = await driver.read_config(password=None)
+        return driver, config
+
+    driver, config = asyncio.run(run())
+    assert not driver.handshook
+    assert config.mmsi == device_io.device_config.mmsi
+    assert device_io.get_written_data().count(bytes([0x59, 0x01, 0x42])) == 1
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires a pseudo terminal")
+def test_async_serial_device_io_over_pty():
+    master, slave = os.openpty()
+    device = MockDeviceIO()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        def on_master_readable():
+            # Play the device: answer whatever the driver sent.
+            device.write(os.read(master, 1024))
+            pending = device.read(len(device.read_buffer) - device.read_cursor)
+            if pending:
+                os.write(master, pending)
+
+        loop.add_reader(master, on_master_readable)
+        device_io = AsyncSerialDeviceIO(os.ttyname(slave))
+        try:
+            return await AsyncRS109mDriver(device_io).read_config(password=None)
+        finally:
+            loop.remove_reader(master)
+            await device_io.close()
+
+    try:
+        config = asyncio.run(run())
+    finally:
+        os.close(master)
+        os.close(slave)
+
+    assert config.config[:0x40] == device.device_config.config[:0x40]
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from rs109m.driver import RS109mPatch, RS109mRawConfig, changed_fields
+from rs109m.driver.batch_codec import apply_patch, changed_field_columns, decode_images, encode_images
+from rs109m.driver.layout import FIELD_NAMES
+
+
+def random_images(count, width, seed=0):
+    rng = random.Random(seed)
+    return np.array([[rng.randrange(256) for _ in range(width)] for _ in range(count)], dtype=np.uint8)
+
+
+@pytest.mark.parametrize("width", [64, 255])
+def test_decode_matches_properties(width):
+    images = random_images(300, width)
+    columns = decode_images(images)
+
+    for row, image in enumerate(images):
+        cfg = RS109mRawConfig()
+        cfg.config = bytearray(image.tobytes())
+        for name in FIELD_NAMES:
+            assert columns[name][row] == getattr(cfg, name), name
+
+
+@pytest.mark.parametrize("name", [
+    b"AB C1".ljust(20),
+    b"AB\x00\x00".ljust(20, b"\x00"),
+    b"\x00 AB \x00  ".ljust(20),
+    b"\tAB\x1f\xff\x80 ".ljust(20),
+])
+def test_decode_name_edge_cases(name):
+    images = random_images(3, 64)
+    images[1, 5:25] = np.frombuffer(name, dtype=np.uint8)
+
+    cfg = RS109mRawConfig()
+    cfg.config = bytearray(images[1].tobytes())
+    assert decode_images(images)["name"][1] == cfg.name
+
+
+def test_encode_matches_setters():
+    columns = {
+        "mmsi": [123456789, 1],
+        "name": ["Buoy {one} ~ü", "A VERY LONG NAME FOR A BUOY"],
+        "interval": [10, 95],
+        "sernum": [5, (1 << 20) - 1],
+        "unitmodel": [2, 15],
+        "vendorid": ["ab", "XYZW"],
+        "shipncargo": [30, 255],
+        "callsign": ["CALL123", "C@LL#1"],
+        "refa": [100, 511],
+        "refb": [200, 0],
+        "refc": [64, 63],
+        "refd": [1, 30],
+    }
+    images = encode_images(columns)
+    assert images.shape == (2, 64)
+
+    for row in range(2):
+        cfg = RS109mRawConfig()
+        for name, values in columns.items():
+            setattr(cfg, name, values[row])
+        assert images[row].tobytes() == bytes(cfg.config[:64])
+
+
+def test_encode_partial_columns_in_place():
+    images = random_images(10, 64)
+    original = images.copy()
+    encode_images({"sernum": np.arange(10)}, images)
+
+    assert list(decode_images(images)["sernum"]) == list(range(10))
+    assert (decode_images(images)["unitmodel"] == decode_images(original)["unitmodel"]).all()
+    assert (images[:, :25] == original[:, :25]).all()
+
+
+def test_encode_validates():
+    with pytest.raises(ValueError):
+        encode_images({"unitmodel": [1, 16]})
+
+
+def test_changed_field_columns():
+    old = np.tile(np.frombuffer(bytes(RS109mRawConfig().view(64)), dtype=np.uint8), (3, 1))
+    new = encode_images({"sernum": [1, 2, 3], "refd": [0, 0, 9]}, old.copy())
+    new[1, 37] ^= 1
+
+    changed = changed_field_columns(old, new)
+
+    assert changed["sernum"].tolist() == [False, True, True]
+    assert changed["refd"].tolist() == [False, False, True]
+    assert changed["unmapped"].tolist() == [False, True, False]
+    for i in range(3):
+        names = tuple(name for name in FIELD_NAMES if changed[name][i])
+        assert names == changed_fields(old[i].tobytes(), new[i].tobytes())
+
+
+def test_apply_patch():
+    images = random_images(20, 64, seed=3)
+    patch = RS109mPatch.compile({"interval": 90, "refb": 7})
+    expected = [patch.apply(RS109mRawConfig(image.tobytes())).view(64).tobytes() for image in images]
+
+    apply_patch(images, patch)
+
+    assert [image.tobytes() for image in images] == expected
@@ -188,3 +188,37 @@ def test_repr():
     # The repr should start with "[ 0x" and include hex bytes separated by ", 0x".
     assert rep.startswith("[ 0x")
     assert ", 0x" in rep
+
+def test_default_image_shared_until_written():
+    a = RS109mRawConfig()
+    b = RS109mRawConfig()
+    assert a.config is b.config
+
+    a.mmsi = 123456789
+    assert b.mmsi != 123456789
+    assert b.config == RS109mRawConfig.default_config
+
+def test_copy_is_independent():
+    a = RS109mRawConfig(bytes(range(64)))
+    b = a.copy()
+    b.sernum = 42
+    assert a.sernum != 42
+    assert b.view(64)[:25] == a.view(64)[:25]
+
+def test_wrap_external_buffer():
+    buffer = bytearray(RS109mRawConfig.default_config)
+    cfg = RS109mRawConfig.wrap(buffer)
+    cfg.mmsi = 123456789
+    # written straight into the external buffer
+    assert RS109mRawConfig(buffer).mmsi == 123456789
+
+    readonly = RS109mRawConfig.wrap(bytes(RS109mRawConfig.default_config))
+    readonly.mmsi = 1
+    assert readonly.mmsi == 1
+
+    with pytest.raises(ValueError):
+        RS109mRawConfig.wrap(bytearray(10))
+
+def test_slots():
+    with pytest.raises(AttributeError):
+        RS109mRawConfig().unknown = 1
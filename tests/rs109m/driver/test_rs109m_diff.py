@@ -0,0 +1,66 @@
+import pytest
+
+from rs109m.driver import RS109mRawConfig, changed_fields, diff_configs
+from rs109m.driver.diff import FIELD_MASKS, MAPPED_MASK, diff_many
+from rs109m.driver.layout import FIELD_NAMES
+
+
+def test_identical_images():
+    config = RS109mRawConfig()
+    assert not diff_configs(config, config.copy())
+    assert changed_fields(config, bytes(config.view())) == ()
+
+
+def test_packed_fields_told_apart():
+    old = RS109mRawConfig()
+    new = old.copy()
+    new.sernum = 42
+    new.refc = 5
+    new.vendorid = "XYZ"
+
+    diff = diff_configs(old, new)
+
+    assert diff.changed == ("sernum", "vendorid", "refc")
+    assert diff["sernum"] == ("sernum", old.sernum, 42)
+    assert diff["refc"].new == 5
+    assert "unitmodel" not in diff
+    assert diff.unmapped == ()
+    assert changed_fields(old, new) == diff.changed
+
+
+@pytest.mark.parametrize("name", FIELD_NAMES)
+def test_every_field_detected_alone(name):
+    # flip every bit of the image, one at a time
+    image = bytes(RS109mRawConfig().view(64))
+    mask = dict((n, m) for n, m, _ in FIELD_MASKS)[name]
+    for bit in range(64 * 8):
+        if mask >> bit & 1:
+            changed = bytearray(image)
+            changed[bit >> 3] ^= 1 << (bit & 7)
+            assert changed_fields(image, changed) == (name,)
+
+
+def test_masks_disjoint_and_unmapped():
+    seen = 0
+    for _, mask, _ in FIELD_MASKS:
+        assert not seen & mask
+        seen |= mask
+    assert seen == MAPPED_MASK
+
+    old = bytes(RS109mRawConfig().view(64))
+    new = bytearray(old)
+    new[37] ^= 0xff
+    new[60] = 0
+    diff = diff_configs(old, new)
+    assert diff.deltas == ()
+    assert diff.unmapped == (37, 60)
+    assert "unmapped bytes: 37, 60" in str(diff)
+
+
+def test_diff_many_and_length():
+    old = RS109mRawConfig()
+    new = old.copy()
+    new.mmsi = 123456789
+    diffs = list(diff_many([(old, new), (new, new)], num_bytes=0x40))
+    assert [d.changed for d in diffs] == [("mmsi",), ()]
+    assert diffs[0]["mmsi"].new == 123456789
@@ -0,0 +1,150 @@
+import os
+import time
+
+import pytest
+import serial.urlhandler.protocol_loop
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import MockDeviceIO, SerialDeviceIO
+
+
+def test_read_config_from_mock():
+    driver = RS109mDriver(MockDeviceIO())
+    config = driver.read_config(password=None)
+    assert config.mmsi == MockDeviceIO().device_config.mmsi
+
+
+def test_read_modify_write_single_handshake():
+    device_io = MockDeviceIO()
+    driver = RS109mDriver(device_io)
+
+    def patch(config):
+        config.mmsi = 123456789
+
+    result = driver.read_modify_write(patch, password="123")
+
+    written = device_io.get_written_data()
+    # Only one password handshake for read, write and verify.
+    assert written.count(bytes([0x59, 0x01, 0x42])) == 1
+    assert result.verified
+    assert result.original.mmsi != 123456789
+    assert result.verified_config.mmsi == 123456789
+    assert device_io.device_config.mmsi == 123456789
+    assert set(result.timings) == {"handshake", "read", "write", "verify", "total"}
+
+
+def test_handshake_repeated_per_operation():
+    device_io = MockDeviceIO()
+    driver = RS109mDriver(device_io)
+
+    driver.read_config(password=None)
+    driver.read_config(password=None)
+
+    assert device_io.get_written_data().count(bytes([0x59, 0x01, 0x42])) == 2
+
+
+def test_read_modify_write_skips_unchanged():
+    device_io = MockDeviceIO()
+    driver = RS109mDriver(device_io)
+
+    result = driver.read_modify_write(lambda config: None, password=None)
+
+    assert not result.changed
+    assert result.verified
+    assert 0x55 not in device_io.get_written_data()[4:]
+    assert "write" not in result.timings
+
+
+def test_read_modify_write_force():
+    device_io = MockDeviceIO()
+    driver = RS109mDriver(device_io)
+
+    result = driver.read_modify_write(lambda config: None, password=None, force=True)
+
+    assert result.changed
+    assert "write" in result.timings
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires a pseudo terminal")
+def test_silent_device_times_out_within_deadline():
+    master, slave = os.openpty()
+    try:
+        start = time.monotonic()
+        device_io = SerialDeviceIO(os.ttyname(slave))
+        opened = time.monotonic()
+        with pytest.raises(TimeoutError):
+            RS109mDriver(device_io).read_config(password=None, timeout=0.2)
+        failed = time.monotonic()
+        device_io.close()
+    finally:
+        os.close(master)
+        os.close(slave)
+
+    # No blocking drain on open, and the whole operation is bounded by its deadline
+    assert opened - start < 0.5
+    assert failed - opened < 0.5
+
+
+class CountingLoopSerial(serial.urlhandler.protocol_loop.Serial):
+    reconfigured = 0
+
+    def _reconfigure_port(self):
+        self.reconfigured += 1
+        super()._reconfigure_port()
+
+
+class LoopbackDeviceIO(SerialDeviceIO):
+    def _create_serial(self, port):
+        ser = CountingLoopSerial()
+        ser.port = "loop://"
+        return ser
+
+
+def test_frame_reads_within_a_deadline_keep_the_port_timeout():
+    device_io = LoopbackDeviceIO("loop")
+    device_io.ser.reconfigured = 0
+
+    device_io.write(b"\x95\x20\x25\x40")
+    # the remaining time of one deadline, as passed by the driver
+    for timeout in (0.93, 0.92, 0.91, 0.905):
+        assert device_io.read_frame(1, timeout)
+
+    assert device_io.ser.reconfigured == 1
+    assert 0.905 <= device_io.ser.timeout < 0.905 + 0.05
+    device_io.close()
+
+
+class NoPipeliningDeviceIO(MockDeviceIO):
+    """A device which discards anything sent along with a handshake."""
+
+    def write(self, data) -> None:
+        data = bytes(data)
+        if data[:1] == b"\x59":
+            data = data[:4 + data[3]]
+        super().write(data)
+
+
+def test_pipelined_read_saves_a_turnaround():
+    device_io = MockDeviceIO()
+    driver = RS109mDriver(device_io, pipeline=True)
+
+    config = driver.read_config(password="123")
+
+    assert config.mmsi == device_io.device_config.mmsi
+    assert driver.pipeline_supported is True
+    # handshake and read command went out together
+    assert device_io.get_written_data() == bytes([0x59, 0x01, 0x42, 0x06]) + b"123000" + bytes([0x51, 0x40])
+
+
+def test_pipelining_falls_back_once_per_device():
+    device_io = NoPipeliningDeviceIO()
+    driver = RS109mDriver(device_io, pipeline=True)
+
+    result = driver.read_modify_write(lambda config: setattr(config, "mmsi", 123456789), password=None)
+    assert result.verified
+    assert driver.pipeline_supported is False
+    assert device_io.get_written_data().count(bytes([0x59, 0x01, 0x42])) == 2
+
+    driver.read_config(password=None)
+    # the cached decision skips the probe
+    assert device_io.get_written_data().count(bytes([0x59, 0x01, 0x42])) == 3
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver.layout import DECODERS, FIELD_NAMES, decode_config, encode_config
+
+
+def test_decode_config_matches_properties():
+    rng = random.Random(0)
+    for _ in range(200):
+        cfg = RS109mRawConfig()
+        data = bytearray(rng.randrange(256) for _ in range(64))
+        data[5:25] = b"SHIP".ljust(20)
+        cfg.config = data
+        values = decode_config(cfg.config)
+        assert values == tuple(getattr(cfg, name) for name in FIELD_NAMES)
+        assert values == tuple(DECODERS[name](cfg.config) for name in FIELD_NAMES)
+
+
+def test_encode_config_round_trip():
+    cfg = RS109mRawConfig()
+    values = cfg.fields._replace(
+        mmsi=123456789, name="BUOY 7", interval=90, sernum=1234, unitmodel=3,
+        vendorid="ABC", shipncargo=55, callsign="AB12", refa=100, refb=200, refc=50, refd=30,
+    )
+    before = bytes(cfg.config)
+    cfg.fields = values
+
+    assert cfg.fields == values
+    # bytes outside the fields are untouched
+    assert cfg.config[42:] == before[42:]
+    assert cfg.config[37] == before[37]
+
+    # encode_config writes the same bytes as the field setters, one by one
+    expected = RS109mRawConfig()
+    for name in FIELD_NAMES:
+        setattr(expected, name, getattr(values, name))
+    buf = bytearray(before)
+    encode_config(buf, values)
+    assert bytes(buf) == bytes(expected.config)
+
+
+def test_encode_config_validates():
+    cfg = RS109mRawConfig()
+    with pytest.raises(ValueError):
+        cfg.fields = cfg.fields._replace(sernum=1 << 20)
+
+
+def test_shared_bytes_are_independent():
+    cfg = RS109mRawConfig()
+    cfg.sernum = 0xABCDE
+    cfg.unitmodel = 7
+    assert cfg.sernum == 0xABCDE
+    assert cfg.unitmodel == 7
+
+    cfg.refa = 511
+    cfg.refb = 0
+    cfg.refc = 63
+    cfg.refd = 0
+    assert (cfg.refa, cfg.refb, cfg.refc, cfg.refd) == (511, 0, 63, 0)
+
+
+def test_fixed_width_text_fields():
+    cfg = RS109mRawConfig()
+    cfg.callsign = ""
+    cfg.name = "A VERY LONG NAME FOR A BUOY"
+    assert len(cfg.config) == len(RS109mRawConfig.default_config)
+    assert cfg.callsign == ""
+    assert cfg.name == "A VERY LONG NAME FOR"
@@ -0,0 +1,82 @@
+import socket
+import threading
+
+import pytest
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import NetworkDeviceIO, is_network_url
+from rs109m.driver.emulator import RS109mDeviceEmulator
+from rs109m.driver_service.models import RS109mConfig, RS109mReadConfigRequest, RS109mWriteConfigRequest
+from rs109m.driver_service.service import RS109mConfigurationService
+
+
+class LoopbackBridge:
+    """A raw TCP serial bridge on localhost with an emulated buoy behind it."""
+
+    def __init__(self):
+        self.emulator = RS109mDeviceEmulator()
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.connections = 0
+        self.segments = []
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"socket://127.0.0.1:{self.port}"
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn:
+                while True:
+                    data = conn.recv(4096)
+                    if not data:
+                        break
+                    self.segments.append(data)
+                    conn.sendall(self.emulator.feed(data))
+
+    def close(self):
+        self.server.close()
+
+
+@pytest.fixture
+def bridge():
+    bridge = LoopbackBridge()
+    yield bridge
+    bridge.close()
+
+
+def test_is_network_url():
+    assert is_network_url("socket://localhost:4000")
+    assert is_network_url("rfc2217://localhost:4000")
+    assert not is_network_url("/dev/ttyUSB0")
+
+
+def test_read_modify_write_over_tcp(bridge):
+    device_io = NetworkDeviceIO(bridge.url)
+
+    def patch(config):
+        config.mmsi = 123456789
+
+    result = RS109mDriver(device_io).read_modify_write(patch, password="42")
+    device_io.close()
+
+    assert result.verified
+    assert bridge.emulator.device_config.mmsi == 123456789
+    # The write command and its payload are pipelined into one segment
+    assert any(segment[0] == 0x55 and len(segment) == 2 + 0x40 for segment in bridge.segments)
+
+
+def test_service_pools_network_connection(bridge):
+    with RS109mConfigurationService() as service:
+        service.write_config(RS109mWriteConfigRequest(device=bridge.url, mock=False, config=RS109mConfig(interval=300)))
+        config = service.read_config(RS109mReadConfigRequest(device=bridge.url, mock=False))
+
+    assert config.interval == 300
+    assert bridge.connections == 1
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from rs109m.driver import RS109mPatch, RS109mRawConfig
+
+
+def random_values(rng):
+    values = {
+        "mmsi": rng.randrange(100000000, 1000000000),
+        "name": "".join(rng.choice("AB c1-") for _ in range(rng.randrange(25))),
+        "interval": rng.randrange(0, 700),
+        "shipncargo": rng.randrange(256),
+        "callsign": "".join(rng.choice("XY9 z") for _ in range(rng.randrange(8))),
+        "vendorid": "".join(rng.choice("ABC") for _ in range(3)),
+        "unitmodel": rng.randrange(16),
+        "sernum": rng.randrange(1 << 20),
+        "refa": rng.randrange(512),
+        "refb": rng.randrange(512),
+        "refc": rng.randrange(64),
+        "refd": rng.randrange(64),
+    }
+    return {name: value for name, value in values.items() if rng.random() < 0.5}
+
+
+def test_patch_matches_setters():
+    rng = random.Random(7)
+    for _ in range(300):
+        values = random_values(rng)
+        image = bytes(rng.randrange(256) for _ in range(RS109mRawConfig.max_len))
+
+        expected = RS109mRawConfig(image)
+        for name, value in values.items():
+            setattr(expected, name, value)
+
+        patched = RS109mPatch.compile(values).apply(RS109mRawConfig(image))
+
+        assert bytes(patched.view()) == bytes(expected.view()), values
+
+
+def test_patch_bounds_and_copy_on_write():
+    patch = RS109mPatch.compile({"sernum": 5, "unitmodel": None})
+    assert patch.fields == ("sernum",)
+    assert (patch.start, patch.stop) == (25, 28)
+
+    shared = RS109mRawConfig()
+    config = shared.copy()
+    patch.apply(config)
+    assert config.sernum == 5
+    assert shared.sernum == 1
+
+    buffer = bytearray(shared.view())
+    assert patch.changes(buffer)
+    patch.apply_to_buffer(buffer)
+    assert not patch.changes(buffer)
+    assert RS109mRawConfig.wrap(buffer).sernum == 5
+
+    wrapped = RS109mRawConfig.wrap(bytearray(shared.view()))
+    patch.apply(wrapped)
+    assert wrapped.sernum == 5
+
+
+def test_empty_and_invalid_patches():
+    patch = RS109mPatch.compile({})
+    assert not patch
+    config = RS109mRawConfig()
+    assert patch.apply(config).view() == RS109mRawConfig().view()
+
+    with pytest.raises(ValueError):
+        RS109mPatch.compile({"sernum": 1 << 20})
+    with pytest.raises(ValueError):
+        RS109mPatch.compile({"colour": "red"})
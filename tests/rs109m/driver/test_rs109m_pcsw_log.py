@@ -0,0 +1,92 @@
+from datetime import datetime
+from pathlib import Path
+
+from rs109m.driver.pcsw_log import PcswEventKind, PcswLogIndex, iter_pcsw_log
+
+LOGS = Path(__file__).parents[3] / "bin" / "logs"
+
+SPLIT_CAPTURE = b"""\
+[01/02/2023 10:00:00] - Open port COM3 (RS_10xM_SETTING.exe)
+
+[01/02/2023 10:00:00] Written data (COM3)
+    51 40                                             Q@
+[01/02/2023 10:00:01] Read data (COM3)
+    25 40 08 2f d2 7f 06 42 4c 41 48 20 20 20 20 20   %@./..BLAH
+[01/02/2023 10:00:02] Read data (COM3)
+    20 20 20 20 20 20 20 20 20 20 20 00 00 00 59 26              ...Y&
+    00 01 f4 2c c7 b0 16 00 08 a0 a0 82 ff ff ff ff   ..........
+    ff ff ff ff ff ff ff ff ff ff ff ff ff ff ff ff   ..........
+    ff ff                                             ..
+[01/02/2023 10:00:03] Written data (COM3)
+    42 42                                             BB
+[01/02/2023 10:00:04] Written data (COM3)
+    51 40                                             Q@
+[01/02/2023 10:00:05] - Close port COM3
+"""
+
+
+def test_parse_vendor_capture():
+    events = list(iter_pcsw_log(LOGS / "rs101.txt"))
+
+    kinds = [event.kind for event in events]
+    assert kinds[:4] == [PcswEventKind.OPEN, PcswEventKind.HANDSHAKE, PcswEventKind.HANDSHAKE_REPLY, PcswEventKind.CLOSE]
+    assert PcswEventKind.UNKNOWN not in kinds
+
+    read = next(event for event in events if event.kind == PcswEventKind.READ_REPLY)
+    assert read.timestamp == datetime(2021, 8, 6, 0, 7, 56)
+    assert read.arg == 0x40
+    assert read.config.mmsi == 109040175
+    assert read.config.name == "BLAH"
+
+    write = next(event for event in events if event.kind == PcswEventKind.WRITE_REQUEST)
+    assert write.config.view(0x40) == read.config.view(0x40)
+    assert events[-2].kind == PcswEventKind.WRITE_ACK
+
+
+def test_set_password_handshake():
+    events = list(iter_pcsw_log(LOGS / "rs107.txt"))
+    handshake = events[1]
+    assert handshake.kind == PcswEventKind.HANDSHAKE
+    assert handshake.arg == 3
+    assert handshake.data[4:] == b"123456789321"
+
+
+def test_frames_split_across_blocks(tmp_path):
+    path = tmp_path / "capture.txt"
+    path.write_bytes(SPLIT_CAPTURE)
+
+    events = list(iter_pcsw_log(path))
+
+    assert [event.kind for event in events] == [
+        PcswEventKind.OPEN,
+        PcswEventKind.READ_REQUEST,
+        PcswEventKind.READ_REPLY,
+        PcswEventKind.UNKNOWN,
+        PcswEventKind.READ_REQUEST,
+        PcswEventKind.CLOSE,
+    ]
+    reply = events[2]
+    assert reply.timestamp == datetime(2023, 2, 1, 10, 0, 1)
+    assert reply.config.mmsi == 109040175
+    # the reply offset points at the block it started in
+    assert SPLIT_CAPTURE[reply.offset:].startswith(b"[01/02/2023 10:00:01] Read data")
+
+
+def test_index_random_access(tmp_path):
+    path = tmp_path / "capture.txt"
+    path.write_bytes(SPLIT_CAPTURE)
+
+    index = PcswLogIndex.build(path)
+    # the second read block continues a frame, so it cannot be a restart point
+    assert len(index) == 6
+    assert index.offset(datetime(2000, 1, 1)) == 0
+
+    events = list(index.events(datetime(2023, 2, 1, 10, 0, 3), datetime(2023, 2, 1, 10, 0, 5)))
+    assert [event.kind for event in events] == [PcswEventKind.UNKNOWN, PcswEventKind.READ_REQUEST]
+
+    index.save(tmp_path / "capture.idx")
+    loaded = PcswLogIndex.load(tmp_path / "capture.idx", path)
+    assert list(loaded.offsets) == list(index.offsets)
+    assert list(loaded.events(datetime(2023, 2, 1, 10, 0, 4))) == events[1:] + [
+        event for event in iter_pcsw_log(path) if event.kind == PcswEventKind.CLOSE
+    ]
@@ -0,0 +1,60 @@
+import pytest
+
+from rs109m.driver import RS109mDriver, RS109mProtocol, RS109mProtocolError
+from rs109m.driver.device_io import MockDeviceIO
+from rs109m.driver.emulator import RS109mDeviceEmulator
+from rs109m.driver.protocol import RS109mReplyKind
+
+
+class CountingDeviceIO(MockDeviceIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data) -> None:
+        self.writes.append(bytes(data))
+        super().write(data)
+
+
+def test_frames_are_coalesced():
+    device_io = CountingDeviceIO()
+    driver = RS109mDriver(device_io)
+
+    driver.read_modify_write(lambda config: setattr(config, "mmsi", 123456789), password="123")
+
+    # handshake, read, write, verify: one write call each
+    assert len(device_io.writes) == 4
+    assert device_io.writes[0] == bytes([0x59, 0x01, 0x42, 0x06]) + b"123000"
+    assert device_io.writes[2][:2] == bytes([0x55, 0x40]) and len(device_io.writes[2]) == 2 + 0x40
+
+
+def test_replies_parsed_byte_by_byte():
+    emulator = RS109mDeviceEmulator()
+    protocol = RS109mProtocol()
+    response = emulator.feed(protocol.send_handshake(None) + protocol.send_read(64))
+    assert protocol.pending == 2
+
+    replies = []
+    for byte in response:
+        assert protocol.bytes_needed > 0
+        protocol.receive_data(bytes([byte]))
+        reply = protocol.next_reply()
+        if reply is not None:
+            replies.append(reply)
+
+    assert [reply.kind for reply in replies] == [RS109mReplyKind.HANDSHAKE, RS109mReplyKind.READ]
+    assert replies[1].data == emulator.device_config.config[:64]
+    assert protocol.bytes_needed == 0
+
+
+def test_unexpected_header_raises():
+    protocol = RS109mProtocol()
+    protocol.send_read(64)
+    protocol.receive_data(b"\x00\x00")
+    with pytest.raises(RS109mProtocolError, match="config header"):
+        protocol.next_reply()
+
+
+def test_invalid_password():
+    with pytest.raises(ValueError):
+        RS109mProtocol().send_handshake("abc")
@@ -0,0 +1,51 @@
+import pytest
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import MockDeviceIO, RecordingDeviceIO, ReplayDeviceIO, TraceMismatchError
+from rs109m.driver.device_io.trace import TraceOp, iter_trace
+
+
+def record_session(path, mmsi):
+    device_io = RecordingDeviceIO(MockDeviceIO(), path)
+
+    def patch(config):
+        config.mmsi = mmsi
+
+    RS109mDriver(device_io).read_modify_write(patch, password="1234")
+    device_io.close()
+
+
+def test_recording_is_appendable(tmp_path):
+    path = tmp_path / "session.trace"
+    record_session(path, 123456789)
+    record_session(path, 223456789)
+
+    ops = [record.op for record in iter_trace(path)]
+    assert ops.count(TraceOp.SESSION) == 2
+    assert TraceOp.WRITE in ops and TraceOp.READ in ops and TraceOp.RESET in ops
+
+
+def test_replay_reproduces_session(tmp_path):
+    path = tmp_path / "session.trace"
+    record_session(path, 123456789)
+    record_session(path, 223456789)
+
+    device_io = ReplayDeviceIO(path, session=1)
+
+    def patch(config):
+        config.mmsi = 223456789
+
+    result = RS109mDriver(device_io).read_modify_write(patch, password="1234")
+    device_io.close()
+
+    assert result.verified_config.mmsi == 223456789
+    assert device_io.exhausted
+
+
+def test_replay_detects_diverging_writes(tmp_path):
+    path = tmp_path / "session.trace"
+    record_session(path, 123456789)
+
+    driver = RS109mDriver(ReplayDeviceIO(path))
+    with pytest.raises(TraceMismatchError):
+        driver.read_config(password="9999")
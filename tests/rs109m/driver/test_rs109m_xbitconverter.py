@@ -80,3 +80,58 @@ def test_toxbit_conversion_x7():
     result = toxbit("A", x=7, digitalphaencoding=True)
     expected = bytearray([65])
     assert result == expected
+
+# ----------------------------
+# Tests for the 6-bit field helpers
+# ----------------------------
+
+from rs109m.driver.xbitconverter import (
+    decode_callsigns, encode_callsigns, encode_names, pack_sixbit, sanitize, unpack_sixbit,
+)
+
+
+def test_toxbit_does_not_mutate_input():
+    data = bytearray([0xff, 0x41])
+    toxbit(data, x=6, digitalphaencoding=False)
+    assert data == bytearray([0xff, 0x41])
+
+
+def test_toxbit_fromxbit_round_trip():
+    packed = toxbit("AB12CD", x=6)
+    assert bytes(fromxbit(packed, x=6)) == b"AB12CD"
+
+
+def test_pack_unpack_sixbit():
+    assert unpack_sixbit(pack_sixbit("call-123", 6, keep="tail", alnum=True), 6) == "ALL123"
+    assert unpack_sixbit(pack_sixbit("XY", 3), 3, alpha=True) == "XY"
+
+
+def test_bulk_callsigns():
+    fields = encode_callsigns(["HELLO", "CALL123", ""])
+    assert all(len(field) == 5 for field in fields)
+    assert decode_callsigns(fields) == ["HELLO", "ALL123", ""]
+
+
+def test_sanitize_names():
+    assert sanitize("Buoy {7} ~ü") == "BUOY 7 "
+    assert encode_names(["ab", "x" * 30], size=4) == [b"AB  ", b"XXXX"]
+
+
+@pytest.mark.parametrize("x", range(1, 8))
+def test_toxbit_matches_per_character_packing(x):
+    for length in range(1, 40):
+        data = bytes((i * 37 + length) & 0xff for i in range(length))
+        expected = 0
+        for byte in reversed(data):
+            expected = (expected << x) | (byte & ((1 << x) - 1))
+        n = (length * x + 7) // 8
+        assert toxbit(data, x=x, digitalphaencoding=False) == bytearray(expected.to_bytes(n, "little"))
+
+
+def test_pack_sixbit_matches_per_character_packing():
+    for chars in range(1, 25):
+        text = "A1B2C3D4E5F6G7H8I9J0KLMNOP"[:chars]
+        expected = 0
+        for char in text:
+            expected = (expected << 6) | (ord(char) & 0x3f)
+        assert pack_sixbit(text, chars) == expected
@@ -0,0 +1,80 @@
+import pytest
+from pydantic import ValidationError
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver_service.bulk import (
+    RS109mConfigView,
+    iter_validate_write_requests,
+    lazy_configs,
+    trusted_configs,
+    validate_configs,
+    validate_write_requests,
+)
+from rs109m.driver_service.config_util import driver_config_to_rs109m_config
+from rs109m.driver_service.models import RS109mConfig, RS109mReadConfigRequest
+from rs109m.driver_service.ship_type import ShipType
+
+
+def make_image(sernum: int) -> RS109mRawConfig:
+    config = RS109mRawConfig()
+    config.mmsi = 503000000 + sernum
+    config.name = f"BUOY{sernum}"
+    config.interval = 60
+    config.shipncargo = 36
+    config.sernum = sernum
+    return config
+
+
+def test_connection_defaults():
+    request = RS109mReadConfigRequest(device="/dev/ttyUSB0")
+    assert request.mock is False
+    with pytest.raises(ValidationError):
+        RS109mReadConfigRequest()
+
+
+def test_validate_rows():
+    configs = validate_configs([{"mmsi": 503000001, "interval": 60}, {"ship_type": 36}])
+    assert configs == [RS109mConfig(mmsi=503000001, interval=60), RS109mConfig(ship_type=ShipType(36))]
+
+    with pytest.raises(ValidationError) as info:
+        validate_configs([{"interval": 60}, {"interval": 5}])
+    assert info.value.errors()[0]["loc"][0] == 1
+
+
+def test_validate_write_requests_in_chunks():
+    rows = [{"device": f"/dev/ttyUSB{i}", "config": {"sernum": i}} for i in range(5)]
+    requests = list(iter_validate_write_requests(rows, chunk_size=2))
+    assert requests == validate_write_requests(rows)
+    assert [request.config.sernum for request in requests] == list(range(5))
+    assert all(request.mock is False for request in requests)
+
+
+def test_trusted_configs_match_validated():
+    images = [make_image(i) for i in range(3)]
+    assert trusted_configs(images) == [driver_config_to_rs109m_config(image) for image in images]
+    assert trusted_configs([images[0].config])[0].ship_type is ShipType(36)
+
+
+def test_lazy_view():
+    image = make_image(7)
+    view = RS109mConfigView(image)
+    assert view._values == {}
+    assert view.sernum == 7
+    assert list(view._values) == ["sernum"]
+    assert view.ship_type is ShipType(36)
+    assert view.model() == driver_config_to_rs109m_config(image)
+    assert view.model_dump() == view.model().model_dump()
+    with pytest.raises(AttributeError):
+        view.shipncargo
+
+    views = lazy_configs([make_image(i) for i in range(3)])
+    assert [view.mmsi for view in views] == [503000000, 503000001, 503000002]
+
+
+def test_trusted_config_is_a_model():
+    image = make_image(3)
+    config = trusted_configs([image])[0]
+    assert config.model_fields_set == set(RS109mConfig.model_fields)
+    assert config.model_copy(update={"interval": 120}).interval == 120
+    assert RS109mConfig.model_validate(config.model_dump()) == config
+
@@ -0,0 +1,28 @@
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver_service.config_util import (
+    apply_rs109m_config_to_driver_config,
+    compile_rs109m_config_patch,
+)
+from rs109m.driver_service.models import RS109mConfig
+from rs109m.driver_service.ship_type import ShipType
+
+
+def test_apply_partial_config():
+    config = RS109mConfig(interval=120, ship_type=ShipType(36), callsign="ab12")
+    driver_config = RS109mRawConfig()
+    original = driver_config.copy()
+
+    apply_rs109m_config_to_driver_config(config, driver_config)
+
+    assert driver_config.interval == 120
+    assert driver_config.shipncargo == 36
+    assert driver_config.callsign == "AB12"
+    assert driver_config.mmsi == original.mmsi
+    assert driver_config.sernum == original.sernum
+
+
+def test_patch_compiled_once():
+    first = compile_rs109m_config_patch(RS109mConfig(interval=60, sernum=9))
+    second = compile_rs109m_config_patch(RS109mConfig(interval=60, sernum=9))
+    assert first is second
+    assert first.fields == ("interval", "sernum")
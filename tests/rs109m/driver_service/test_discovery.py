@@ -0,0 +1,84 @@
+from rs109m.driver.device_io import MockDeviceIO
+from rs109m.driver_service.discovery import RS109mDeviceDiscovery, RS109mPortInfo
+
+
+class FakeBench:
+    """Ports with buoys attached, keyed by device path."""
+
+    def __init__(self, buoys):
+        self.buoys = buoys
+        self.probed = []
+
+    def ports(self):
+        return [
+            RS109mPortInfo(device=device, serial_number=f"SN{device[-1]}")
+            for device in sorted(self.buoys)
+        ]
+
+    def open(self, device):
+        self.probed.append(device)
+        mmsi = self.buoys[device]
+        if mmsi is None:
+            raise OSError("no buoy")
+        device_io = MockDeviceIO()
+        device_io.device_config.mmsi = mmsi
+        return device_io
+
+
+def test_scan_probes_every_port(tmp_path):
+    bench = FakeBench({"/dev/ttyUSB0": 123456789, "/dev/ttyUSB1": None})
+    discovery = RS109mDeviceDiscovery(
+        cache_path=tmp_path / "cache.json",
+        port_lister=bench.ports,
+        device_io_factory=bench.open,
+    )
+
+    found = {result.port.device: result for result in discovery.scan()}
+
+    assert found["/dev/ttyUSB0"].identity.mmsi == 123456789
+    assert found["/dev/ttyUSB1"].identity is None
+    assert found["/dev/ttyUSB1"].error
+
+
+def test_find_uses_cache_after_replug(tmp_path):
+    bench = FakeBench({"/dev/ttyUSB0": 123456789, "/dev/ttyUSB1": 223456789})
+    cache_path = tmp_path / "cache.json"
+    discovery = RS109mDeviceDiscovery(cache_path=cache_path, port_lister=bench.ports, device_io_factory=bench.open)
+    assert discovery.find(mmsi=223456789) == "/dev/ttyUSB1"
+
+    # Same adapter (serial number SN1) now shows up under another device path
+    bench.probed.clear()
+    bench.buoys["/dev/ttyUSB7"] = bench.buoys.pop("/dev/ttyUSB1")
+    replugged = lambda: [
+        RS109mPortInfo(device="/dev/ttyUSB0", serial_number="SN0"),
+        RS109mPortInfo(device="/dev/ttyUSB7", serial_number="SN1"),
+    ]
+    discovery = RS109mDeviceDiscovery(cache_path=cache_path, port_lister=replugged, device_io_factory=bench.open)
+
+    assert discovery.find(mmsi=223456789) == "/dev/ttyUSB7"
+    # only the cached port is probed, to confirm the buoy is still there
+    assert bench.probed == ["/dev/ttyUSB7"]
+
+
+def test_find_rescans_when_cached_port_holds_another_buoy(tmp_path):
+    bench = FakeBench({"/dev/ttyUSB0": 123456789, "/dev/ttyUSB1": 223456789})
+    discovery = RS109mDeviceDiscovery(
+        cache_path=tmp_path / "cache.json",
+        port_lister=bench.ports,
+        device_io_factory=bench.open,
+    )
+    discovery.scan()
+
+    # the buoys were swapped between the cradles
+    bench.buoys = {"/dev/ttyUSB0": 223456789, "/dev/ttyUSB1": 123456789}
+    bench.probed.clear()
+
+    assert discovery.find(mmsi=223456789) == "/dev/ttyUSB0"
+    assert bench.probed == ["/dev/ttyUSB1", "/dev/ttyUSB0"]
+    assert discovery.cache["usb-serial:SN1"].mmsi == 123456789
+    assert discovery.cache["usb-serial:SN0"].mmsi == 223456789
+
+    # a stale entry is not returned without a rescan either
+    bench.buoys["/dev/ttyUSB0"] = None
+    assert discovery.find(mmsi=223456789, rescan=False) is None
+    assert "usb-serial:SN0" not in discovery.cache
@@ -0,0 +1,72 @@
+import json
+
+from rs109m.driver_service.models import RS109mWriteStatus
+from rs109m.driver_service.provisioning import RS109mProvisioningEngine, iter_manifest
+from rs109m.driver_service.service import RS109mConfigurationService
+
+
+def test_iter_manifest_csv(tmp_path):
+    manifest = tmp_path / "fleet.csv"
+    manifest.write_text(
+        "device,mock,mmsi,name,ship_type\n"
+        "port0,true,123456789,BUOY A,36\n"
+        "port1,true,223456789,,\n"
+    )
+
+    rows = list(iter_manifest(manifest))
+
+    assert rows[0]["device"] == "port0"
+    assert rows[0]["config"] == {"mmsi": "123456789", "name": "BUOY A", "ship_type": "36"}
+    assert rows[1]["config"] == {"mmsi": "223456789"}
+
+
+def test_provision_manifest_jsonl(tmp_path):
+    manifest = tmp_path / "fleet.jsonl"
+    with manifest.open("w") as fh:
+        for i in range(20):
+            fh.write(json.dumps({"device": f"port{i % 4}", "mock": True, "mmsi": 100000000 + i}) + "\n")
+
+    engine = RS109mProvisioningEngine(max_workers=4, queue_size=2)
+    results = sorted(engine.run_manifest(manifest), key=lambda r: r.index)
+
+    assert len(results) == 20
+    assert all(r.success and r.verified for r in results)
+    assert [r.config.mmsi for r in results] == [100000000 + i for i in range(20)]
+    assert "total" in results[0].timings
+
+
+def test_invalid_row_reported_as_failure():
+    engine = RS109mProvisioningEngine(max_workers=2)
+    rows = [
+        {"device": "port0", "mock": True, "config": {"mmsi": 123456789}},
+        {"device": "port1", "mock": True, "config": {"mmsi": 1}},
+    ]
+
+    results = sorted(engine.run(rows), key=lambda r: r.index)
+
+    assert results[0].success
+    assert not results[1].success
+    assert results[1].error
+
+
+def test_stop_iterating_early():
+    engine = RS109mProvisioningEngine(max_workers=2, queue_size=1)
+    rows = ({"device": f"port{i % 2}", "mock": True, "config": {}} for i in range(1000))
+
+    results = engine.run(rows)
+    first = next(results)
+    results.close()
+
+    assert first.success
+
+
+def test_unchanged_rows_reported():
+    engine = RS109mProvisioningEngine(max_workers=1, service=RS109mConfigurationService(keep_mock_state=True))
+    rows = [
+        {"device": "port0", "mock": True, "config": {"mmsi": 123456789}},
+        {"device": "port0", "mock": True, "config": {"mmsi": 123456789}},
+    ]
+
+    results = sorted(engine.run(rows), key=lambda r: r.index)
+
+    assert [r.status for r in results] == [RS109mWriteStatus.WRITTEN, RS109mWriteStatus.UNCHANGED]
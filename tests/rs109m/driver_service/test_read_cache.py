@@ -0,0 +1,89 @@
+from rs109m.driver.device_io import MockDeviceIO
+from rs109m.driver_service.models import RS109mConfig, RS109mReadConfigRequest, RS109mWriteConfigRequest
+from rs109m.driver_service.read_cache import RS109mReadCache
+from rs109m.driver_service.service import RS109mConfigurationService
+from rs109m.driver_service.session_pool import RS109mSessionPool
+from rs109m.simulator.virtual_time import VirtualClock
+
+
+class CountingDeviceIO(MockDeviceIO):
+    reads = 0
+
+    def write(self, data):
+        if bytes(data[:1]) == b"\x51":
+            CountingDeviceIO.reads += 1
+        return super().write(data)
+
+
+def make_service(clock, **cache_args):
+    CountingDeviceIO.reads = 0
+    pool = RS109mSessionPool(lambda device, mock: CountingDeviceIO())
+    return RS109mConfigurationService(pool, read_cache=RS109mReadCache(clock=clock, **cache_args))
+
+
+def read(service, device="dev0", **kwargs):
+    return service.read_config_with_result(RS109mReadConfigRequest(device=device, mock=True, **kwargs))
+
+
+def test_cached_until_ttl():
+    clock = VirtualClock()
+    service = make_service(clock, ttl=5.0)
+
+    first = read(service)
+    clock.advance(2.0)
+    second = read(service)
+
+    assert not first.cached
+    assert second.cached and second.age == 2.0
+    assert second.config == first.config
+    assert CountingDeviceIO.reads == 1
+
+    assert not read(service, fresh=True).cached
+    assert read(service).cached
+    assert read(service, password="123").cached is False
+    clock.advance(6.0)
+    assert not read(service).cached
+    assert CountingDeviceIO.reads == 4
+
+
+def test_max_age_and_lru_bound():
+    clock = VirtualClock()
+    service = make_service(clock, max_entries=2)
+
+    read(service, "dev0")
+    clock.advance(1.0)
+    assert not service.read_config_with_result(
+        RS109mReadConfigRequest(device="dev0", mock=True), max_age=0.5
+    ).cached
+
+    read(service, "dev1")
+    read(service, "dev0")
+    read(service, "dev2")  # evicts dev1, the least recently used
+    assert len(service.read_cache) == 2
+    assert read(service, "dev0").cached
+    assert not read(service, "dev1").cached
+
+
+def test_write_refreshes_cache():
+    clock = VirtualClock()
+    service = make_service(clock)
+    read(service)
+
+    service.write_config(RS109mWriteConfigRequest(device="dev0", mock=True, config=RS109mConfig(mmsi=223456789)))
+    reads = CountingDeviceIO.reads
+
+    result = read(service)
+    assert result.cached
+    assert result.config.mmsi == 223456789
+    assert CountingDeviceIO.reads == reads
+
+
+def test_invalidate_buoy():
+    cache = RS109mReadCache(clock=VirtualClock())
+    config = RS109mConfig(mmsi=123456789, sernum=7)
+    cache.put(RS109mReadCache.key("dev0", True, False, None), config)
+    cache.put(RS109mReadCache.key("dev1", True, True, None), config)
+    cache.put(RS109mReadCache.key("dev2", True, False, None), RS109mConfig(mmsi=223456789, sernum=7))
+
+    assert cache.invalidate_buoy(123456789, 7) == 2
+    assert len(cache) == 1
@@ -0,0 +1,161 @@
+import pytest
+import serial
+import serial.urlhandler.protocol_loop
+
+from rs109m.driver.device_io import MockDeviceIO, SerialDeviceIO
+from rs109m.driver_service.models import RS109mConfig, RS109mReadConfigRequest, RS109mWriteConfigRequest
+from rs109m.driver_service.service import RS109mConfigurationService
+from rs109m.driver_service.session_pool import RS109mSessionPool
+
+
+class CountingFactory:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, device, mock):
+        device_io = MockDeviceIO()
+        self.opened.append(device_io)
+        return device_io
+
+
+def test_session_reused_for_same_device():
+    factory = CountingFactory()
+    pool = RS109mSessionPool(factory)
+
+    with pool.session("dev0", False) as first:
+        pass
+    with pool.session("dev0", False) as second:
+        pass
+
+    assert first is second
+    assert len(factory.opened) == 1
+    assert "dev0" in pool
+
+
+def test_separate_sessions_per_device():
+    factory = CountingFactory()
+    pool = RS109mSessionPool(factory)
+
+    with pool.session("dev0", False):
+        pass
+    with pool.session("dev1", False):
+        pass
+
+    assert len(factory.opened) == 2
+    assert len(pool) == 2
+
+
+def test_idle_sessions_are_evicted():
+    factory = CountingFactory()
+    pool = RS109mSessionPool(factory, idle_timeout=0)
+
+    with pool.session("dev0", False):
+        pass
+
+    assert pool.evict_idle() == 1
+    assert len(pool) == 0
+
+
+def test_unhealthy_session_is_reopened():
+    factory = CountingFactory()
+    pool = RS109mSessionPool(factory)
+
+    with pool.session("dev0", False):
+        pass
+    factory.opened[0].is_open = lambda: False
+    with pool.session("dev0", False):
+        pass
+
+    assert len(factory.opened) == 2
+
+
+def test_session_discarded_on_error():
+    factory = CountingFactory()
+    pool = RS109mSessionPool(factory)
+
+    with pytest.raises(RuntimeError):
+        with pool.session("dev0", True):
+            raise RuntimeError("port vanished")
+
+    assert len(pool) == 0
+
+
+def test_service_remembers_mock_device_between_calls():
+    with RS109mConfigurationService(keep_mock_state=True) as service:
+        service.write_config(
+            RS109mWriteConfigRequest(
+                device="dummy_device",
+                mock=True,
+                config=RS109mConfig(mmsi=123456789),
+            )
+        )
+        config = service.read_config(
+            RS109mReadConfigRequest(device="dummy_device", mock=True)
+        )
+
+    assert config.mmsi == 123456789
+    assert len(service.session_pool) == 0
+
+
+def test_pipeline_support_remembered_across_sessions():
+    pool = RS109mSessionPool(CountingFactory(), pipeline=True)
+
+    with pool.session("dev0", True) as driver:
+        driver.read_config(password=None)
+    assert pool.pipeline_support[("dev0", True)] is True
+
+    pool.close("dev0", True)
+    with pool.session("dev0", True) as driver:
+        assert driver.pipeline and driver.pipeline_supported is True
+
+
+def test_service_gives_fresh_mock_device_by_default():
+    with RS109mConfigurationService() as service:
+        service.write_config(
+            RS109mWriteConfigRequest(
+                device="dummy_device",
+                mock=True,
+                config=RS109mConfig(mmsi=123456789),
+            )
+        )
+        config = service.read_config(
+            RS109mReadConfigRequest(device="dummy_device", mock=True)
+        )
+
+    assert config.mmsi == MockDeviceIO().device_config.mmsi
+
+
+class UnpluggableSerial(serial.urlhandler.protocol_loop.Serial):
+    """Loopback port which, once unplugged, still reports open but fails queries, like a removed USB adapter."""
+    unplugged = False
+
+    @property
+    def in_waiting(self):
+        if self.unplugged:
+            raise serial.SerialException("device reports readiness to read but returned no data")
+        return super().in_waiting
+
+
+class LoopbackDeviceIO(SerialDeviceIO):
+    def _create_serial(self, port):
+        ser = UnpluggableSerial()
+        ser.port = "loop://"
+        return ser
+
+
+def test_unplugged_serial_session_is_reopened():
+    opened = []
+
+    def factory(device, mock):
+        opened.append(LoopbackDeviceIO(device))
+        return opened[-1]
+
+    pool = RS109mSessionPool(factory)
+    with pool.session("dev0", False):
+        pass
+    assert opened[0].is_open()
+
+    opened[0].ser.unplugged = True
+    assert opened[0].ser.is_open and not opened[0].is_open()
+    with pool.session("dev0", False) as driver:
+        assert driver.device_io is opened[1]
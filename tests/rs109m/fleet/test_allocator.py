@@ -0,0 +1,80 @@
+import multiprocessing
+
+import pytest
+
+from rs109m.fleet import AllocatorError, RS109mIdAllocator, mmsi_allocator, sernum_allocator
+
+
+def test_reserve_lowest_free_and_persist(tmp_path):
+    path = tmp_path / "sernums.alloc"
+    with sernum_allocator(path) as allocator:
+        assert allocator.free == 1 << 20
+        assert allocator.reserve(3) == [0, 1, 2]
+        allocator.release([1])
+        assert allocator.reserve(2) == [1, 3]
+
+    with RS109mIdAllocator(path) as allocator:
+        assert allocator.free == (1 << 20) - 4
+        assert allocator.is_reserved(3)
+        assert not allocator.is_reserved(4)
+
+
+def test_contiguous_and_ranges(tmp_path):
+    ranges = [(992000000, 992000010), (992500000, 992500100)]
+    with mmsi_allocator(tmp_path / "mmsi.alloc", ranges) as allocator:
+        allocator.reserve_ids([992000005])
+        # the first block has no run of 6 left, the second one has
+        assert allocator.reserve(6, contiguous=True) == list(range(992500000, 992500006))
+        assert allocator.reserve(5, contiguous=True) == list(range(992000000, 992000005))
+        assert allocator.reserve(6) == [992000006, 992000007, 992000008, 992000009, 992500006, 992500007]
+        assert allocator.free == 100 - 8
+
+        with pytest.raises(AllocatorError):
+            allocator.reserve(200)
+        with pytest.raises(AllocatorError):
+            allocator.reserve_ids([992500050, 992000005])
+        # all or nothing
+        assert not allocator.is_reserved(992500050)
+        with pytest.raises(ValueError):
+            allocator.release([123456789])
+
+    with pytest.raises(AllocatorError):
+        mmsi_allocator(tmp_path / "mmsi.alloc", [(992000000, 992000020)])
+
+
+def test_reservation_released_on_error(tmp_path):
+    with sernum_allocator(tmp_path / "sernums.alloc") as allocator:
+        with allocator.reservation(10) as reservation:
+            assert reservation.release([3, 4, 99]) == 2
+        assert allocator.free == (1 << 20) - 8
+
+        with pytest.raises(RuntimeError):
+            with allocator.reservation(5, contiguous=True) as reservation:
+                assert reservation.ids == list(range(10, 15))
+                raise RuntimeError("write failed")
+        assert allocator.free == (1 << 20) - 8
+
+
+def _reserve_many(path, queue):
+    with RS109mIdAllocator(path) as allocator:
+        ids = []
+        for _ in range(50):
+            ids += allocator.reserve(7)
+        queue.put(ids)
+
+
+def test_concurrent_processes(tmp_path):
+    path = tmp_path / "sernums.alloc"
+    sernum_allocator(path).close()
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=_reserve_many, args=(path, queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    reserved = [queue.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    everything = sorted(id_ for ids in reserved for id_ in ids)
+    assert everything == list(range(4 * 50 * 7))
@@ -0,0 +1,113 @@
+import pytest
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.driver_service.provisioning import RS109mProvisioningEngine
+from rs109m.fleet import (
+    FleetConflictError,
+    RS109mConflictChecker,
+    RS109mFleetStore,
+    manifest_entries,
+    store_entries,
+)
+from rs109m.fleet.conflicts import Bitmap, SparseBitmap
+
+
+def make_config(mmsi, sernum, callsign="A1"):
+    config = RS109mRawConfig()
+    config.mmsi = mmsi
+    config.sernum = sernum
+    config.callsign = callsign
+    return config
+
+
+def test_bitmaps():
+    dense = Bitmap(1 << 20)
+    sparse = SparseBitmap()
+    for bitmap in (dense, sparse):
+        assert bitmap.add(5)
+        assert not bitmap.add(5)
+        assert bitmap.add((1 << 20) - 1)
+        assert 5 in bitmap and 6 not in bitmap
+        assert len(bitmap) == 2
+    assert sparse.add(999999999)
+    assert len(sparse.chunks) == 3
+
+
+def test_manifest_conflicts():
+    rows = [
+        {"device": "port0", "config": {"mmsi": "123456789", "sernum": "1", "callsign": "ab-12"}},
+        {"device": "port1", "config": {"mmsi": "223456789", "sernum": "1"}},
+        {"device": "port2", "config": {"mmsi": "123456789", "callsign": "AB12"}},
+        # same port again, but another buoy
+        {"device": "port0", "config": {"mmsi": "123456789"}},
+        {"device": "port3", "config": {"mmsi": "not a number"}},
+    ]
+
+    conflicts = RS109mConflictChecker().check(lambda: manifest_entries(rows))
+
+    found = {(c.field, c.value): [e.index for e in c.entries] for c in conflicts}
+    assert found == {
+        ("mmsi", 123456789): [0, 2, 3],
+        ("sernum", 1): [0, 1],
+        ("callsign", "AB12"): [0, 2],
+    }
+
+
+def test_buoys_flashed_through_one_port_conflict():
+    rows = [
+        {"device": "port0", "config": {"mmsi": 123456789, "sernum": 1}},
+        {"device": "port0", "config": {"mmsi": 123456789, "sernum": 2}},
+    ]
+
+    conflicts = RS109mConflictChecker().check(lambda: manifest_entries(rows))
+
+    assert [(c.field, c.value, [e.index for e in c.entries]) for c in conflicts] == [("mmsi", 123456789, [0, 1])]
+    by_sernum = RS109mConflictChecker(same_unit=lambda entry: entry.sernum)
+    assert len(by_sernum.check(lambda: manifest_entries(rows))) == 1
+
+
+def test_same_unit_is_not_a_conflict():
+    rows = [{"device": f"port{i}", "config": {"mmsi": 123456789, "sernum": 7}} for i in range(3)]
+    rows.append({"device": "port0", "config": {"mmsi": 223456789}})
+    rows.append({"device": "port0", "config": {"mmsi": 223456789}})
+
+    checker = RS109mConflictChecker(same_unit=lambda entry: entry.sernum)
+    conflicts = checker.check(lambda: manifest_entries(rows))
+
+    # units without a sernum are never taken to be the same
+    assert [(c.field, c.value) for c in conflicts] == [("mmsi", 223456789)]
+
+
+def test_manifest_against_store(tmp_path):
+    with RS109mFleetStore(tmp_path / "fleet.rs9") as store:
+        for i in range(100):
+            store.append(make_config(200000000 + i, i, f"C{i}"))
+        rows = [{"device": "port0", "config": {"mmsi": 300000000, "sernum": 42}}]
+
+        conflicts = RS109mConflictChecker(fields=("mmsi", "sernum")).check(
+            lambda: manifest_entries(rows),
+            lambda: store_entries(store),
+        )
+
+        assert len(conflicts) == 1
+        assert conflicts[0].field == "sernum"
+        assert [(e.source, e.index) for e in conflicts[0].entries] == [("manifest", 0), (str(store.path), 42)]
+
+
+def test_preflight_blocks_batch_write(tmp_path):
+    manifest = tmp_path / "fleet.csv"
+    manifest.write_text(
+        "device,mock,mmsi\n"
+        "port0,true,123456789\n"
+        "port1,true,123456789\n"
+    )
+    engine = RS109mProvisioningEngine(max_workers=2)
+
+    with pytest.raises(FleetConflictError) as e:
+        engine.run_manifest(manifest, preflight=True)
+    assert e.value.conflicts[0].value == 123456789
+
+    rows = [{"device": "port0", "mock": True, "config": {"mmsi": 123456789}}]
+    assert [r.success for r in engine.run(rows, preflight=True)] == [True]
+    with pytest.raises(ValueError):
+        engine.run(iter(rows), preflight=True)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+from rs109m.driver import RS109mRawConfig
+from rs109m.fleet import RS109mFleetStore, parse_hex_dump
+
+DEFAULT_DUMP = Path(__file__).parents[3] / "bin" / "default-config.txt"
+
+
+def make_config(mmsi, sernum):
+    config = RS109mRawConfig()
+    config.mmsi = mmsi
+    config.sernum = sernum
+    return config
+
+
+def test_append_lookup_and_reopen(tmp_path):
+    path = tmp_path / "fleet.rs9"
+    with RS109mFleetStore(path, initial_capacity=4) as store:
+        for i in range(500):
+            store.append(make_config(200000000 + i, i % 100))
+        assert len(store) == 500
+        assert store.get(200000123).sernum == 23
+        assert store.get(1) is None
+
+    with RS109mFleetStore(path) as store:
+        assert len(store) == 500
+        assert 200000499 in store
+        assert sorted(c.mmsi for c in store.find_sernum(7)) == [200000000 + i for i in range(7, 500, 100)]
+
+
+def test_duplicate_mmsi_rejected(tmp_path):
+    with RS109mFleetStore(tmp_path / "fleet.rs9") as store:
+        store.append(make_config(1, 1))
+        with pytest.raises(KeyError):
+            store.append(make_config(1, 2))
+        # put replaces instead
+        store.put(make_config(1, 2))
+        assert len(store) == 1
+        assert store.get(1).sernum == 2
+        assert store.find_sernum(1) == []
+
+
+def test_update_reindexes(tmp_path):
+    with RS109mFleetStore(tmp_path / "fleet.rs9") as store:
+        for i in range(50):
+            store.append(make_config(300000000 + i, i))
+
+        def patch(config):
+            config.mmsi = 399999999
+            config.sernum = 1000
+
+        store.update(300000010, patch)
+        assert store.get(300000010) is None
+        assert store.get(399999999).sernum == 1000
+        assert [c.mmsi for c in store.find_sernum(1000)] == [399999999]
+        # every other record still found
+        assert all(store.get(300000000 + i) is not None for i in range(50) if i != 10)
+
+
+def test_records_are_views(tmp_path):
+    with RS109mFleetStore(tmp_path / "fleet.rs9") as store:
+        store.append(make_config(5, 5))
+        record = store.get(5)
+        assert isinstance(record.config, memoryview)
+        # writes to a view do not bypass the indexes
+        record.mmsi = 6
+        assert store.get(5) is not None
+
+
+def test_indexes_rebuilt_when_missing(tmp_path):
+    path = tmp_path / "fleet.rs9"
+    with RS109mFleetStore(path) as store:
+        for i in range(20):
+            store.append(make_config(400000000 + i, i))
+    Path(str(path) + ".mmsi.idx").unlink()
+
+    with RS109mFleetStore(path) as store:
+        assert store.get(400000019).sernum == 19
+
+
+def test_import_hex_dump(tmp_path):
+    assert parse_hex_dump(DEFAULT_DUMP.read_text())[:64] == bytes(RS109mRawConfig.default_config[:64])
+    with RS109mFleetStore(tmp_path / "fleet.rs9") as store:
+        assert store.import_hex_dumps([DEFAULT_DUMP]) == 1
+        assert store.get(RS109mRawConfig().mmsi).name == RS109mRawConfig().name
@@ -0,0 +1,49 @@
+import os
+import time
+
+import pytest
+
+if os.name != "posix":
+    pytest.skip("requires pseudo terminals", allow_module_level=True)
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver.device_io import SerialDeviceIO
+from rs109m.driver_service.provisioning import RS109mProvisioningEngine
+from rs109m.simulator import RS109mPtySimulator
+
+
+def test_read_config_over_pty():
+    with RS109mPtySimulator(2, latency=0) as simulator:
+        device_io = SerialDeviceIO(simulator.paths[1])
+        config = RS109mDriver(device_io).read_config(password=None)
+        device_io.close()
+
+    assert config.mmsi == simulator.buoys[1].emulator.device_config.mmsi
+    assert config.sernum == 1
+
+
+def test_response_latency_is_simulated():
+    with RS109mPtySimulator(1, latency=0.05) as simulator:
+        device_io = SerialDeviceIO(simulator.paths[0])
+        start = time.monotonic()
+        RS109mDriver(device_io).read_config(password=None)
+        elapsed = time.monotonic() - start
+        device_io.close()
+
+    # handshake and read command each wait for the latency
+    assert elapsed >= 0.1
+
+
+def test_provision_simulated_fleet(tmp_path):
+    with RS109mPtySimulator(8, latency=0, link_dir=tmp_path) as simulator:
+        rows = [
+            {"device": path, "mock": False, "config": {"interval": 300}}
+            for path in simulator.paths
+        ]
+        engine = RS109mProvisioningEngine(max_workers=8)
+        results = list(engine.run(rows))
+        engine.service.close()
+
+    assert len(results) == 8
+    assert all(result.success and result.verified for result in results)
+    assert all(buoy.emulator.device_config.interval == 300 for buoy in simulator.buoys)
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from rs109m.driver import RS109mDriver
+from rs109m.driver_service.models import RS109mConfig
+from rs109m.simulator import FleetSimulation, SimulatedDeviceIO, VirtualClock
+
+
+def test_reads_advance_virtual_time():
+    clock = VirtualClock()
+    device_io = SimulatedDeviceIO(clock, baudrate=9600, latency=0.01)
+    config = RS109mDriver(device_io, clock=clock).read_config(password=None)
+
+    assert config.mmsi == device_io.device_config.mmsi
+    # handshake + read command and 66 response bytes at ~1ms per byte, plus two latencies
+    assert 0.08 < clock.now < 0.2
+
+
+def test_silent_device_times_out_in_virtual_time():
+    clock = VirtualClock()
+    device_io = SimulatedDeviceIO(clock, drop_rate=1.0)
+    driver = RS109mDriver(device_io, timeout=5.0, clock=clock)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        driver.read_config(password=None)
+    assert time.monotonic() - start < 1.0
+    assert clock.now == pytest.approx(5.0, abs=0.01)
+
+
+def test_fleet_simulation_is_fast_and_deterministic():
+    config = RS109mConfig(name="FLEET", interval=60)
+
+    def simulate(seed):
+        return FleetSimulation(1000, 8, config, seed=seed, handling_jitter=10.0, jitter=0.01, drop_rate=0.05).run()
+
+    start = time.monotonic()
+    result = simulate(seed=1)
+    assert time.monotonic() - start < 30
+
+    assert len(result.jobs) == 1000
+    assert result.succeeded >= 990
+    assert result.makespan > 1000 / 8 * 30
+    assert any(job.attempts > 1 for job in result.jobs)
+
+    again = simulate(seed=1)
+    assert [(job.port, job.end, job.attempts) for job in again.jobs] == [(job.port, job.end, job.attempts) for job in result.jobs]
+    assert simulate(seed=2).makespan != result.makespan
+
+
+def test_pinned_scheduling_uses_fixed_ports():
+    result = FleetSimulation(10, 3, RS109mConfig(name="FLEET"), scheduling="pinned").run()
+    assert all(job.port == job.buoy % 3 for job in result.jobs)
+    assert result.succeeded == 10